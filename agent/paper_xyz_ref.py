@@ -6,6 +6,7 @@ Examples:
   pixi run -e default python agent/paper_xyz_ref.py agent/demo.pdf --start_page 0 --end_page 1
   pixi run -e default python agent/paper_xyz_ref.py agent/demo.pdf -o md/demo.paper_xyz.md --concurrency 8
   pixi run -e default python agent/paper_xyz_ref.py agent/demo.pdf -o md/demo.md --include_page_numbers --extract_images
+  pixi run -e default python agent/paper_xyz_ref.py agent/demo.pdf -o md/demo.md --raw_responses spill
   pixi run -e default python agent/paper_xyz_ref.py --list_model_services
   pixi run -e default python agent/paper_xyz_ref.py agent/demo.pdf --model_service baidu/Unlimited-OCR
   pixi run -e default python agent/paper_xyz_ref.py agent/demo.pdf --model_service rednote-hilab/dots.mocr --model third_party/dots.mocr-8bit
@@ -17,9 +18,13 @@ Notes:
   - Uses the focused implementation in src/paper_xyz.
   - Renders PDF pages locally with PyMuPDF and calls an OpenAI-compatible
     `chat/completions` endpoint page by page.
+  - Markdown is streamed in page order to a temporary file next to the output
+    and renamed into place once every page has finished.
   - A page that exhausts retries is kept as a Markdown placeholder by default;
     use --fail_fast to restore all-or-nothing behavior.
   - Use scripts/extract_pdf_images.py to extract images without calling a VLM.
+  - Use scripts/reparse_markdown.py to rebuild Markdown from responses saved
+    with --raw_responses spill after a parser fix, without calling a VLM.
   - The CLI exposes only shared runtime controls. Model-specific defaults live
     in src/paper_xyz/model_services.py.
 """
@@ -43,7 +48,7 @@ from paper_xyz import (
     PdfToMarkdownConverter,
     iter_model_service_profiles,
 )
-from paper_xyz.converter import summarize_results
+from paper_xyz.converter import summarize_page_results
 from paper_xyz.pdf import get_page_count, resolve_page_range
 
 HELP_EPILOG = "\n".join((__doc__ or "").strip().splitlines()[2:]).strip()
@@ -73,7 +78,7 @@ def format_model_services() -> str:
     lines = ["Available model services:"]
     for profile in iter_model_service_profiles():
         lines.append(
-            f"  {profile.name}: model={profile.model} parser={profile.response_parser}"
+            f"  {profile.name}: model={profile.model} parser={profile.response_parser.name}"
         )
         lines.append(f"    {profile.description}")
     return "\n".join(lines)
@@ -150,6 +155,63 @@ def parse_args() -> argparse.Namespace:
         default=4,
         help="Maximum number of pages processed concurrently.",
     )
+    parser.add_argument(
+        "--token_budget",
+        type=int,
+        default=None,
+        help=(
+            "Admit pages by estimated prompt tokens plus the preset's max_tokens "
+            "against this server KV budget, still capped by --concurrency. "
+            "Default: admit by page count only."
+        ),
+    )
+    parser.add_argument(
+        "--memory_budget_mb",
+        type=float,
+        default=None,
+        help=(
+            "Bound the estimated memory of rendered pages that are waiting on "
+            "or inside a request, in MiB. Default: unbounded."
+        ),
+    )
+    parser.add_argument(
+        "--parse_executor",
+        choices=("inline", "thread", "process"),
+        default="inline",
+        help=(
+            "Where model responses are parsed: on the event loop, in a thread "
+            "pool, or in a process pool. Default: inline."
+        ),
+    )
+    parser.add_argument(
+        "--parse_workers",
+        type=int,
+        default=None,
+        help="Worker count for --parse_executor thread/process. Default: executor default.",
+    )
+    parser.add_argument(
+        "--stream",
+        action="store_true",
+        help=(
+            "Stream model responses. Layout JSON and SVG presets then parse "
+            "the response as it arrives and keep what was received if a "
+            "stream breaks off."
+        ),
+    )
+    parser.add_argument(
+        "--svg_max_bytes",
+        type=int,
+        default=None,
+        help=(
+            "Cut SVG responses to at most this many bytes, closing any open "
+            "elements. Default: unlimited."
+        ),
+    )
+    parser.add_argument(
+        "--svg_minify_paths",
+        action="store_true",
+        help="Rewrite SVG path data without redundant separators or zeros.",
+    )
     parser.add_argument(
         "--max_page_retries",
         type=int,
@@ -198,6 +260,60 @@ def parse_args() -> argparse.Namespace:
         default=32,
         help="Skip extracted images shorter than this many pixels. Default: 32.",
     )
+    parser.add_argument(
+        "--native_image_format",
+        action="store_true",
+        help=(
+            "Write JPEG and JPEG 2000 images in their original encoding, as "
+            ".jpeg or .jpx, when no mask or colorspace conversion is needed. "
+            "Other images are still written as PNG."
+        ),
+    )
+    parser.add_argument(
+        "--lazy_images",
+        action="store_true",
+        help=(
+            "Only extract images for pages whose model output has an image "
+            "placeholder or is marked as a diagram."
+        ),
+    )
+    parser.add_argument(
+        "--lazy_image_min_pixels",
+        type=int,
+        default=None,
+        help=(
+            "With --lazy_images, also extract pages that list an image of at "
+            "least this many pixels. Default: off."
+        ),
+    )
+    parser.add_argument(
+        "--image_store",
+        default=None,
+        help=(
+            "Content-addressed image store shared across documents. Each "
+            "distinct image is written once under <dir>/blobs/ and extracted "
+            "image files are hardlinks to it. Default: off."
+        ),
+    )
+    parser.add_argument(
+        "--image_workers",
+        type=int,
+        default=2,
+        help=(
+            "Threads extracting images while pages are converted by the model. "
+            "Default: 2."
+        ),
+    )
+    parser.add_argument(
+        "--raw_responses",
+        choices=("keep", "drop", "spill"),
+        default="keep",
+        help=(
+            "What to do with raw model responses after parsing: keep them in "
+            "memory, drop them, or spill them to <output-stem>.raw.jsonl.gz next "
+            "to the Markdown output. Default: keep."
+        ),
+    )
     parser.add_argument(
         "--verbose",
         "-v",
@@ -219,6 +335,17 @@ def build_config(args: argparse.Namespace) -> ConversionConfig:
         api_key=parse_api_key(args.api_key),
         timeout=args.timeout,
         concurrency=args.concurrency,
+        token_budget=args.token_budget,
+        memory_budget_bytes=(
+            int(args.memory_budget_mb * 1024 * 1024)
+            if args.memory_budget_mb is not None
+            else None
+        ),
+        parse_executor=args.parse_executor,
+        parse_workers=args.parse_workers,
+        stream=args.stream,
+        svg_max_bytes=args.svg_max_bytes,
+        svg_minify_paths=args.svg_minify_paths,
         max_page_retries=args.max_page_retries,
         allow_page_failures=not args.fail_fast,
         include_page_numbers=args.include_page_numbers,
@@ -227,7 +354,17 @@ def build_config(args: argparse.Namespace) -> ConversionConfig:
             bbox_tolerance=args.image_bbox_tolerance,
             min_width=args.min_image_width,
             min_height=args.min_image_height,
+            native_format=args.native_image_format,
+            lazy=args.lazy_images,
+            lazy_min_pixels=args.lazy_image_min_pixels,
+            store_dir=(
+                str(Path(args.image_store).expanduser().resolve())
+                if args.image_store
+                else None
+            ),
         ),
+        image_workers=args.image_workers,
+        raw_response_policy=args.raw_responses,
     )
 
 
@@ -266,8 +403,8 @@ def main() -> int:
     start = time.time()
     try:
         converter = PdfToMarkdownConverter(config)
-        markdown, page_results = asyncio.run(
-            converter.convert(
+        chars, page_results = asyncio.run(
+            converter.convert_to_file(
                 input_path,
                 start_page=start_page,
                 end_page=end_page,
@@ -287,8 +424,7 @@ def main() -> int:
         logging.error("%s", exc)
         return 2
 
-    output_path.write_text(markdown, encoding="utf-8")
-    stats = summarize_results(markdown, page_results)
+    stats = summarize_page_results(page_results, chars=chars)
     elapsed = time.time() - start
 
     logging.info("[paper_xyz] input: %s", input_path)
@@ -306,6 +442,25 @@ def main() -> int:
         stats.completion_tokens,
         elapsed,
     )
+    logging.info(
+        "[paper_xyz] cached_prompt_tokens=%s server_prefill_time=%.2fs prefill_tokens_per_s=%.1f server_decode_time=%.2fs decode_tokens_per_s=%.1f",
+        stats.cached_prompt_tokens,
+        stats.prefill_seconds,
+        stats.prefill_tokens_per_second,
+        stats.decode_seconds,
+        stats.decode_tokens_per_second,
+    )
+    logging.info("[paper_xyz] parser=%s", config.response_parser().name)
+    for stage in stats.stage_timings:
+        logging.info(
+            "[paper_xyz] stage=%s total=%.2fs p50=%.3fs p90=%.3fs p99=%.3fs max=%.3fs",
+            stage.stage,
+            stage.total_seconds,
+            stage.p50_seconds,
+            stage.p90_seconds,
+            stage.p99_seconds,
+            stage.max_seconds,
+        )
     failed_page_indexes = [
         str(page.page_index) for page in page_results if page.error is not None
     ]
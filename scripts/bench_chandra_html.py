@@ -0,0 +1,353 @@
+#!/usr/bin/env python3
+"""Benchmark the chandra_html parser against the markdownify-based conversion.
+
+Pages come from a seeded synthetic corpus of Chandra layout HTML, plus any
+raw Chandra responses given as inputs: `.html` files or
+`<output-stem>.raw.jsonl.gz` sidecars written with `--raw_responses spill`.
+Every page is converted with markdownify and with each HTML backend. Any
+output difference is reported, and a difference on html.parser, which the
+markdownify path also uses, makes the script exit non-zero. lxml repairs
+malformed markup differently, so its differences are only reported.
+
+Examples:
+  pixi run -e default python scripts/bench_chandra_html.py
+  pixi run -e default python scripts/bench_chandra_html.py --pages 500 --repeat 5
+  pixi run -e default python scripts/bench_chandra_html.py --backends html.parser
+  pixi run -e default python scripts/bench_chandra_html.py md/demo.raw.jsonl.gz
+"""
+
+from __future__ import annotations
+
+import argparse
+import difflib
+import functools
+import importlib.util
+import logging
+import random
+import statistics
+import time
+from collections.abc import Callable
+from pathlib import Path
+from typing import Any
+
+from bs4 import BeautifulSoup
+
+from paper_xyz.parsing import (
+    CHANDRA_HTML_BACKENDS,
+    chandra_html_backend,
+    chandra_html_metadata,
+    normalize_markdown_body,
+    parse_chandra_html_response,
+    strip_outer_code_fence,
+)
+from paper_xyz.raw_store import RAW_RESPONSE_SUFFIX, iter_raw_response_records
+from paper_xyz.types import ChandraHtmlBackend, PageMetadata
+
+HELP_EPILOG = "\n".join((__doc__ or "").strip().splitlines()[2:]).strip()
+LOG_FORMAT = "%(asctime)s\t%(levelname)s\t%(name)s: %(message)s"
+
+WORDS = (
+    "model",
+    "layer",
+    "token_count",
+    "a*b",
+    "results",
+    "figure",
+    "x_1",
+    "table",
+    "we",
+    "show",
+    "that",
+    "the",
+    "loss",
+    "&",
+    "<",
+    "converges",
+)
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Benchmark and cross-check chandra_html Markdown conversion.",
+        epilog=HELP_EPILOG or None,
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    parser.add_argument(
+        "inputs",
+        nargs="*",
+        help="Optional raw Chandra .html files or .raw.jsonl.gz sidecars.",
+    )
+    parser.add_argument(
+        "--pages",
+        type=int,
+        default=200,
+        help="Number of synthetic pages. Default: 200.",
+    )
+    parser.add_argument(
+        "--seed", type=int, default=0, help="Synthetic corpus seed. Default: 0."
+    )
+    parser.add_argument(
+        "--repeat",
+        type=int,
+        default=3,
+        help="Timed passes over the corpus; the fastest is reported. Default: 3.",
+    )
+    parser.add_argument(
+        "--backends",
+        nargs="+",
+        choices=CHANDRA_HTML_BACKENDS,
+        default=None,
+        help="HTML backends to benchmark. Default: every installed backend.",
+    )
+    args = parser.parse_args()
+    if args.pages < 0 or args.repeat < 1:
+        parser.error("--pages must be >= 0 and --repeat must be >= 1")
+    return args
+
+
+def markdownify_chandra_response(text: str) -> tuple[PageMetadata, str]:
+    """The markdownify conversion the chandra_html parser used before."""
+    from markdownify import MarkdownConverter
+
+    class ChandraMarkdownConverter(MarkdownConverter):
+        def convert_math(self, el: Any, text: str, parent_tags: Any) -> str:
+            math = text.strip()
+            if not math:
+                return ""
+            if el.has_attr("display") and el["display"] == "block":
+                return f"\n\n$$\n{math}\n$$\n\n"
+            return f" ${math}$ "
+
+        def convert_table(self, el: Any, text: str, parent_tags: Any) -> str:
+            return f"\n\n{el}\n\n"
+
+    html = strip_outer_code_fence(text).strip()
+    if not html:
+        return chandra_html_metadata(BeautifulSoup("", "html.parser")), ""
+    soup = BeautifulSoup(html, "html.parser")
+    metadata = chandra_html_metadata(soup)
+
+    top_level_divs = soup.find_all("div", recursive=False)
+    chunks: list[str] = []
+    for div in top_level_divs:
+        label = str(div.get("data-label", "") or "").strip()
+        if label in {"Blank-Page", "Page-Header", "Page-Footer"}:
+            continue
+        for img in div.find_all("img"):
+            if not img.get("src"):
+                if label in {"Image", "Figure"}:
+                    img["src"] = ""
+                else:
+                    img.decompose()
+        for tag in [div, *div.find_all(True)]:
+            for attr in ("data-bbox", "data-label"):
+                tag.attrs.pop(attr, None)
+        chunk = str(div.decode_contents()).strip()
+        if chunk:
+            chunks.append(chunk)
+    content_html = "\n\n".join(chunks) if top_level_divs else str(soup)
+    if not content_html:
+        return metadata, ""
+
+    converter = ChandraMarkdownConverter(
+        heading_style="ATX",
+        bullets="-",
+        escape_misc=False,
+        escape_underscores=True,
+        escape_asterisks=True,
+    )
+    markdown = converter.convert(content_html).strip()
+    if not markdown.strip():
+        markdown = normalize_markdown_body(content_html)
+    return metadata, normalize_markdown_body(markdown)
+
+
+def synthetic_page(rng: random.Random) -> str:
+    def words(count: int) -> str:
+        return " ".join(rng.choice(WORDS) for _ in range(count))
+
+    def inline(count: int) -> str:
+        parts = []
+        for _ in range(count):
+            kind = rng.random()
+            if kind < 0.1:
+                parts.append(f"<b>{words(2)}</b>")
+            elif kind < 0.2:
+                parts.append(f"<i> {words(2)} </i>")
+            elif kind < 0.3:
+                parts.append(f"<math>x_{{{rng.randint(1, 9)}}}^2</math>")
+            elif kind < 0.35:
+                parts.append(f"H<sub>2</sub>O<sup>{rng.randint(1, 3)}</sup>")
+            elif kind < 0.4:
+                parts.append("<br>")
+            elif kind < 0.45:
+                parts.append(f"<code>{words(1)}</code>")
+            elif kind < 0.5:
+                parts.append('<a href="https://example.org/a_b">link</a>')
+            else:
+                parts.append(words(rng.randint(3, 12)))
+        return " ".join(parts)
+
+    def table() -> str:
+        rows = []
+        for row in range(rng.randint(2, 6)):
+            tag = "th" if row == 0 else "td"
+            cells = "".join(
+                f"<{tag}>{inline(1)}</{tag}>" for _ in range(rng.randint(2, 5))
+            )
+            rows.append(f"<tr>{cells}</tr>")
+        return f'<table border="1">{"".join(rows)}</table>'
+
+    def bullet_list(depth: int = 0) -> str:
+        tag = rng.choice(("ul", "ol"))
+        items = []
+        for _ in range(rng.randint(2, 5)):
+            nested = bullet_list(depth + 1) if depth < 2 and rng.random() < 0.2 else ""
+            items.append(f"<li>{inline(2)}{nested}</li>")
+        return f"<{tag}>\n{''.join(items)}\n</{tag}>"
+
+    blocks = []
+    for _ in range(rng.randint(6, 20)):
+        bbox = " ".join(str(rng.randint(0, 1000)) for _ in range(4))
+        kind = rng.random()
+        if kind < 0.1:
+            level = rng.randint(1, 4)
+            label, body = "Section-Header", f"<h{level}>{words(4)}</h{level}>"
+        elif kind < 0.2:
+            label = "Equation-Block"
+            body = f'<math display="block">\\sum_{{i}} a_i = {words(1)}</math>'
+        elif kind < 0.3:
+            label, body = "Table", table()
+        elif kind < 0.4:
+            label, body = "List-Group", bullet_list()
+        elif kind < 0.45:
+            label = "Image"
+            body = f'<img alt="{words(4)}"/><p>{words(6)}</p>'
+        elif kind < 0.5:
+            label = rng.choice(("Page-Header", "Page-Footer"))
+            body = f"<p>{words(3)}</p>"
+        elif kind < 0.55:
+            label, body = "Code-Block", f"<pre>\n  {words(5)}\n    {words(3)}\n</pre>"
+        elif kind < 0.6:
+            label, body = "Text", f"  {inline(3)} <hr> {words(3)}\n"
+        else:
+            label, body = "Text", f"<p>{inline(rng.randint(2, 8))}</p>"
+        blocks.append(f'<div data-bbox="{bbox}" data-label="{label}">{body}</div>')
+    return "\n".join(blocks)
+
+
+def load_pages(inputs: list[str]) -> list[str]:
+    pages: list[str] = []
+    for value in inputs:
+        path = Path(value)
+        if path.name.endswith(RAW_RESPONSE_SUFFIX):
+            pages.extend(
+                str(record.get("raw_response", ""))
+                for record in iter_raw_response_records(path)
+                if "page_index" in record
+                and record.get("response_parser") == "chandra_html"
+                and record.get("raw_response")
+            )
+        else:
+            pages.append(path.read_text(encoding="utf-8"))
+    return pages
+
+
+def time_pages(
+    convert: Callable[[str], tuple[PageMetadata, str]],
+    pages: list[str],
+    repeat: int,
+) -> list[float]:
+    best: list[float] | None = None
+    for _ in range(repeat):
+        timings = []
+        for page in pages:
+            started = time.perf_counter()
+            convert(page)
+            timings.append(time.perf_counter() - started)
+        if best is None or sum(timings) < sum(best):
+            best = timings
+    assert best is not None
+    return best
+
+
+def main() -> int:
+    args = parse_args()
+    logging.basicConfig(level=logging.INFO, format=LOG_FORMAT)
+
+    rng = random.Random(args.seed)
+    pages = [synthetic_page(rng) for _ in range(args.pages)]
+    pages.extend(load_pages(args.inputs))
+    if not pages:
+        logging.error("No pages to benchmark.")
+        return 1
+
+    backends: list[ChandraHtmlBackend] = args.backends or [
+        backend
+        for backend in CHANDRA_HTML_BACKENDS
+        if backend == "html.parser" or importlib.util.find_spec(backend)
+    ]
+    logging.info(
+        "pages=%s backends=%s default_backend=%s",
+        len(pages),
+        ",".join(backends),
+        chandra_html_backend(),
+    )
+    expected_pages = [markdownify_chandra_response(page) for page in pages]
+    total_bytes = sum(len(page.encode("utf-8")) for page in pages)
+    baseline = time_pages(markdownify_chandra_response, pages, args.repeat)
+    log_timings("markdownify", baseline, total_bytes)
+
+    failed = False
+    for backend in backends:
+        convert = functools.partial(parse_chandra_html_response, backend=backend)
+        mismatches = count_mismatches(convert, pages, expected_pages, backend)
+        timings = time_pages(convert, pages, args.repeat)
+        log_timings(f"paper_xyz[{backend}]", timings, total_bytes)
+        logging.info(
+            "backend=%s speedup=%.2fx mismatched_pages=%s",
+            backend,
+            sum(baseline) / sum(timings),
+            mismatches,
+        )
+        failed = failed or (backend == "html.parser" and mismatches > 0)
+    return 1 if failed else 0
+
+
+def count_mismatches(
+    convert: Callable[[str], tuple[PageMetadata, str]],
+    pages: list[str],
+    expected_pages: list[tuple[PageMetadata, str]],
+    backend: str,
+) -> int:
+    mismatches = 0
+    for index, (page, expected) in enumerate(zip(pages, expected_pages)):
+        actual = convert(page)
+        if actual == expected:
+            continue
+        mismatches += 1
+        if mismatches <= 3:
+            diff = difflib.unified_diff(
+                expected[1].splitlines(),
+                actual[1].splitlines(),
+                "markdownify",
+                f"paper_xyz[{backend}]",
+                lineterm="",
+            )
+            logging.warning("page=%s output differs:\n%s", index, "\n".join(diff))
+    return mismatches
+
+
+def log_timings(name: str, timings: list[float], total_bytes: int) -> None:
+    logging.info(
+        "%-22s mean=%.3fms median=%.3fms max=%.3fms MB/s=%.2f",
+        name,
+        statistics.fmean(timings) * 1000,
+        statistics.median(timings) * 1000,
+        max(timings) * 1000,
+        total_bytes / sum(timings) / 1e6,
+    )
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
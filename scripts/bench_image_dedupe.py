@@ -0,0 +1,188 @@
+#!/usr/bin/env python3
+"""Benchmark duplicate image-occurrence filtering against the pairwise scan.
+
+Each synthetic page is a mosaic of image fragments, as in scanned maps or
+tiled figures. A few sources are shared by many tiles, and some tiles are
+repeated with their bbox jittered around the tolerance. Every page is
+deduplicated with the grid index in paper_xyz.images and with the pairwise
+comparison it replaced. The script exits non-zero when the two disagree.
+
+Examples:
+  pixi run -e default python scripts/bench_image_dedupe.py
+  pixi run -e default python scripts/bench_image_dedupe.py --images 5000 --repeat 5
+  pixi run -e default python scripts/bench_image_dedupe.py --tolerance 0 --pages 200
+"""
+
+from __future__ import annotations
+
+import argparse
+import logging
+import random
+import time
+from collections.abc import Callable
+from typing import Any
+
+from paper_xyz.images import bbox_reading_order, unique_image_occurrences
+
+HELP_EPILOG = "\n".join((__doc__ or "").strip().splitlines()[2:]).strip()
+LOG_FORMAT = "%(asctime)s\t%(levelname)s\t%(name)s: %(message)s"
+
+Candidate = tuple[tuple[float, float, float, float], dict[str, Any]]
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Benchmark and cross-check duplicate image filtering.",
+        epilog=HELP_EPILOG or None,
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    parser.add_argument(
+        "--images",
+        type=int,
+        default=2000,
+        help="Image occurrences on the timed page. Default: 2000.",
+    )
+    parser.add_argument(
+        "--pages",
+        type=int,
+        default=50,
+        help="Smaller random pages that are only cross-checked. Default: 50.",
+    )
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=1.0,
+        help="bbox tolerance in PDF points. Default: 1.0.",
+    )
+    parser.add_argument(
+        "--seed", type=int, default=0, help="Synthetic page seed. Default: 0."
+    )
+    parser.add_argument(
+        "--repeat",
+        type=int,
+        default=3,
+        help="Timed runs per implementation; the fastest is reported. Default: 3.",
+    )
+    args = parser.parse_args()
+    if args.images < 0 or args.pages < 0 or args.repeat < 1:
+        parser.error("--images and --pages must be >= 0 and --repeat must be >= 1")
+    return args
+
+
+def pairwise_unique_occurrences(
+    candidates: list[Candidate], tolerance: float
+) -> list[dict[str, Any]]:
+    """The comparison against every earlier kept image used before."""
+    unique: list[Candidate] = []
+    for bbox, image_info in sorted(candidates, key=bbox_reading_order):
+        if any(
+            same_source(image_info, kept_info)
+            and all(
+                abs(coord - kept_coord) <= tolerance
+                for coord, kept_coord in zip(bbox, kept_bbox, strict=True)
+            )
+            for kept_bbox, kept_info in unique
+        ):
+            continue
+        unique.append((bbox, image_info))
+    return [image_info for _, image_info in unique]
+
+
+def same_source(left: dict[str, Any], right: dict[str, Any]) -> bool:
+    left_digest = left.get("digest")
+    right_digest = right.get("digest")
+    left_xref = int(left.get("xref", 0) or 0)
+    right_xref = int(right.get("xref", 0) or 0)
+    return (
+        left_digest is not None
+        and right_digest is not None
+        and left_digest == right_digest
+    ) or (left_xref > 0 and left_xref == right_xref)
+
+
+def mosaic_page(rng: random.Random, images: int, tolerance: float) -> list[Candidate]:
+    columns = max(1, int(images**0.5))
+    tile = 600 / columns
+    shared_sources = max(1, images // 20)
+    candidates: list[Candidate] = []
+    while len(candidates) < images:
+        index = len(candidates)
+        x0 = (index % columns) * tile
+        y0 = (index // columns) * tile
+        image_info: dict[str, Any]
+        if candidates and rng.random() < 0.15:
+            # A repeat of an earlier occurrence, near or just past tolerance.
+            (x0, y0, _, _), info = rng.choice(candidates)
+            jitter = tolerance * rng.choice((0.0, 0.5, 1.0, 1.5, 3.0))
+            x0 += rng.choice((-jitter, jitter))
+            y0 += rng.choice((-jitter, jitter))
+            image_info = dict(info)
+        else:
+            source = rng.randrange(shared_sources if rng.random() < 0.5 else images)
+            image_info = {"xref": source + 1 if rng.random() < 0.8 else 0}
+            if rng.random() < 0.9:
+                image_info["digest"] = source.to_bytes(4, "big")
+        bbox = (x0, y0, x0 + tile, y0 + tile)
+        image_info["bbox"] = bbox
+        candidates.append((bbox, image_info))
+    rng.shuffle(candidates)
+    return candidates
+
+
+def best_time(
+    dedupe: Callable[[list[Candidate], float], list[dict[str, Any]]],
+    candidates: list[Candidate],
+    tolerance: float,
+    repeat: int,
+) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        dedupe(candidates, tolerance)
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def main() -> int:
+    args = parse_args()
+    logging.basicConfig(level=logging.INFO, format=LOG_FORMAT)
+    rng = random.Random(args.seed)
+
+    mismatches = 0
+    for page_number in range(args.pages):
+        tolerance = rng.choice((0.0, 0.5, args.tolerance, 4.0))
+        candidates = mosaic_page(rng, rng.randint(1, 300), tolerance)
+        if unique_image_occurrences(
+            candidates, tolerance
+        ) != pairwise_unique_occurrences(candidates, tolerance):
+            mismatches += 1
+            logging.warning(
+                "page=%s tolerance=%s output differs", page_number, tolerance
+            )
+
+    candidates = mosaic_page(rng, args.images, args.tolerance)
+    expected = pairwise_unique_occurrences(candidates, args.tolerance)
+    if unique_image_occurrences(candidates, args.tolerance) != expected:
+        mismatches += 1
+        logging.warning("timed page output differs")
+    pairwise = best_time(
+        pairwise_unique_occurrences, candidates, args.tolerance, args.repeat
+    )
+    indexed = best_time(
+        unique_image_occurrences, candidates, args.tolerance, args.repeat
+    )
+    logging.info(
+        "images=%s kept=%s tolerance=%s pairwise=%.2fms indexed=%.2fms speedup=%.1fx",
+        len(candidates),
+        len(expected),
+        args.tolerance,
+        pairwise * 1000,
+        indexed * 1000,
+        pairwise / indexed,
+    )
+    logging.info("cross_checked_pages=%s mismatches=%s", args.pages + 1, mismatches)
+    return 1 if mismatches else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
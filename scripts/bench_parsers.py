@@ -0,0 +1,534 @@
+#!/usr/bin/env python3
+"""Benchmark every response parser over a corpus of model responses.
+
+The corpus is synthesized from a seed. It has clean, fenced, truncated and
+malformed responses for each parser, plus huge SVG documents and looping
+Unlimited-OCR output. Raw responses recorded in
+`<output-stem>.raw.jsonl.gz` sidecars, written with
+`--raw_responses spill`, can be added as inputs. Each case reports
+throughput, latency percentiles and the peak memory allocated per page.
+Damaged layout JSON with a known recovery is checked first, and every
+page is also fed to the parser's stream in random chunks, which must give
+the same result as parsing it whole. The run fails on any difference.
+
+Examples:
+  pixi run -e default python scripts/bench_parsers.py
+  pixi run -e default python scripts/bench_parsers.py --pages 100 --repeat 5
+  pixi run -e default python scripts/bench_parsers.py --parsers svg unlimited_ocr
+  pixi run -e default python scripts/bench_parsers.py md/demo.raw.jsonl.gz
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import logging
+import random
+import statistics
+import time
+import tracemalloc
+from collections.abc import Callable
+from pathlib import Path
+
+from paper_xyz.parsing import RESPONSE_PARSERS, PageParser
+from paper_xyz.raw_store import iter_raw_response_records
+
+HELP_EPILOG = "\n".join((__doc__ or "").strip().splitlines()[2:]).strip()
+LOG_FORMAT = "%(asctime)s\t%(levelname)s\t%(name)s: %(message)s"
+
+WORDS = (
+    "model",
+    "layer",
+    "token_count",
+    "results",
+    "figure",
+    "we",
+    "show",
+    "that",
+    "the",
+    "loss",
+    "converges",
+    "under",
+    "a*b",
+    "x_1",
+)
+DOTS_CATEGORIES = (
+    "Text",
+    "Title",
+    "Section-header",
+    "Formula",
+    "Table",
+    "Picture",
+    "Caption",
+    "List-item",
+    "Page-header",
+    "Page-footer",
+)
+INFINITY_CATEGORIES = (
+    "text",
+    "title",
+    "formula",
+    "table",
+    "figure",
+    "header",
+    "footer",
+    "page_footnote",
+)
+
+# Damaged responses and the Markdown that must be recovered from them.
+RECOVERY_CASES = (
+    (
+        "dots_layout_json",
+        '[{"category": "Text", "text": "one"}, '
+        '{"category": "Text", "text": "two" ]}, '
+        '{"category": "Text", "text": "three"}]',
+        "one\n\nthree",
+    ),
+    (
+        "dots_layout_json",
+        '[{"category": "Picture", "bbox": [1, 2, 3, 4]}, '
+        '{"category": ], "text": "x"}, '
+        '{"category": "Formula", "text": "a+b"}]',
+        "![Picture](page_1_2_2_2.png)\n\na+b",
+    ),
+    (
+        "infinity_layout_json",
+        '[{"category": "text", "text": "one"}, '
+        '{"category": "text", "text": "two" ]}, '
+        '{"category": "text", "text": "three"}]',
+        "one\n\nthree",
+    ),
+    (
+        "dots_layout_json",
+        '[{"category": "Text", "text": ["one ',
+        "['one']",
+    ),
+    (
+        "infinity_layout_json",
+        '[{"category": "text", "text": "one"}, {"category": "text", "text": "two\\ ',
+        "one\n\ntwo",
+    ),
+)
+
+Corpus = dict[tuple[str, str], list[str]]
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Benchmark paper_xyz response parsers.",
+        epilog=HELP_EPILOG or None,
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    parser.add_argument(
+        "inputs",
+        nargs="*",
+        help="Optional .raw.jsonl.gz sidecars with recorded responses.",
+    )
+    parser.add_argument(
+        "--pages",
+        type=int,
+        default=50,
+        help="Synthetic pages per parser and case. Default: 50.",
+    )
+    parser.add_argument(
+        "--seed", type=int, default=0, help="Synthetic corpus seed. Default: 0."
+    )
+    parser.add_argument(
+        "--repeat",
+        type=int,
+        default=3,
+        help="Timed passes over each case; the fastest is reported. Default: 3.",
+    )
+    parser.add_argument(
+        "--parsers",
+        nargs="+",
+        choices=tuple(RESPONSE_PARSERS),
+        default=None,
+        help="Parsers to benchmark. Default: every registered parser.",
+    )
+    parser.add_argument(
+        "--no_allocations",
+        action="store_true",
+        help="Skip the tracemalloc pass that measures peak allocation per page.",
+    )
+    args = parser.parse_args()
+    if args.pages < 0 or args.repeat < 1:
+        parser.error("--pages must be >= 0 and --repeat must be >= 1")
+    return args
+
+
+class SyntheticResponses:
+    """Seeded generators for the response formats each parser accepts."""
+
+    def __init__(self, seed: int) -> None:
+        self.rng = random.Random(seed)
+
+    def words(self, count: int) -> str:
+        return " ".join(self.rng.choice(WORDS) for _ in range(count))
+
+    def paragraph(self) -> str:
+        return self.words(self.rng.randint(20, 80))
+
+    def bbox(self) -> list[int]:
+        x1, y1 = self.rng.randint(0, 1500), self.rng.randint(0, 2000)
+        return [x1, y1, x1 + self.rng.randint(10, 400), y1 + self.rng.randint(10, 200)]
+
+    def markdown(self) -> str:
+        blocks = [
+            "---\nprimary_language: en\nis_rotation_valid: true\n"
+            "rotation_correction: 0\nis_table: false\nis_diagram: false\n---"
+        ]
+        for _ in range(self.rng.randint(8, 24)):
+            kind = self.rng.random()
+            if kind < 0.1:
+                blocks.append(f"## {self.words(4)}")
+            elif kind < 0.2:
+                blocks.append(f"$$\n\\sum_{{i}} a_i = {self.words(1)}\n$$")
+            elif kind < 0.3:
+                rows = [f"| {self.words(1)} | {self.words(2)} |" for _ in range(6)]
+                blocks.append("\n".join(["| a | b |", "| --- | --- |", *rows]))
+            else:
+                blocks.append(self.paragraph())
+        return "\n\n".join(blocks)
+
+    def dots_cells(self) -> list[dict[str, object]]:
+        cells: list[dict[str, object]] = []
+        for _ in range(self.rng.randint(10, 60)):
+            category = self.rng.choice(DOTS_CATEGORIES)
+            cell: dict[str, object] = {"bbox": self.bbox(), "category": category}
+            if category == "Formula":
+                cell["text"] = f"\\frac{{{self.words(1)}}}{{{self.words(1)}}}"
+            elif category == "Table":
+                cell["text"] = "<table><tr><td>1</td><td>2</td></tr></table>"
+            elif category != "Picture":
+                cell["text"] = self.paragraph()
+            cells.append(cell)
+        return cells
+
+    def dots_layout_json(self) -> str:
+        return json.dumps(self.dots_cells(), ensure_ascii=False)
+
+    def infinity_layout_json(self) -> str:
+        cells = [
+            {
+                "category": self.rng.choice(INFINITY_CATEGORIES),
+                "bbox": self.bbox(),
+                "text": self.paragraph(),
+            }
+            for _ in range(self.rng.randint(10, 60))
+        ]
+        return f"```json\n{json.dumps(cells, ensure_ascii=False)}\n```"
+
+    def chandra_html(self) -> str:
+        blocks = []
+        for _ in range(self.rng.randint(6, 20)):
+            bbox = " ".join(str(value) for value in self.bbox())
+            kind = self.rng.random()
+            if kind < 0.15:
+                label, body = "Section-Header", f"<h2>{self.words(4)}</h2>"
+            elif kind < 0.3:
+                label = "Equation-Block"
+                body = f'<math display="block">\\sum_i a_i = {self.words(1)}</math>'
+            elif kind < 0.45:
+                label = "Table"
+                body = "<table><tr><th>a</th><th>b</th></tr><tr><td>1</td><td>2</td></tr></table>"
+            elif kind < 0.55:
+                label = "List-Group"
+                items = "".join(f"<li>{self.words(6)}</li>" for _ in range(4))
+                body = f"<ul>{items}</ul>"
+            else:
+                label, body = (
+                    "Text",
+                    f"<p>{self.paragraph()} <b>{self.words(2)}</b></p>",
+                )
+            blocks.append(f'<div data-bbox="{bbox}" data-label="{label}">{body}</div>')
+        return "\n".join(blocks)
+
+    def deepseek_markdown(self) -> str:
+        blocks = []
+        for _ in range(self.rng.randint(8, 30)):
+            label = self.rng.choice(("text", "title", "image", "table", "text"))
+            box = self.bbox()
+            marker = f"<|ref|>{label}<|/ref|><|det|>[{box}]<|/det|>"
+            body = "" if label == "image" else self.paragraph()
+            blocks.append(f"{marker}\n{body}")
+        return "\n\n".join(blocks) + "<｜end▁of▁sentence｜>"
+
+    def unlimited_ocr_line(self) -> str:
+        label = self.rng.choice(("text", "title", "image", "table", "text"))
+        return f"<|det|>{label} {self.bbox()}<|/det|> {self.paragraph()}"
+
+    def unlimited_ocr(self) -> str:
+        return "\n".join(
+            self.unlimited_ocr_line() for _ in range(self.rng.randint(8, 30))
+        )
+
+    def looping_unlimited_ocr(self) -> str:
+        # A degenerate decode repeats the same block until max_tokens.
+        line = self.unlimited_ocr_line()
+        return "\n".join([self.unlimited_ocr(), *([line] * 2000)])
+
+    def svg(self, paths: int | None = None) -> str:
+        count = paths if paths is not None else self.rng.randint(20, 200)
+        elements = []
+        for _ in range(count):
+            points = " ".join(
+                f"L{self.rng.randint(0, 1000)} {self.rng.randint(0, 1000)}"
+                for _ in range(self.rng.randint(4, 24))
+            )
+            elements.append(f'<path d="M0 0 {points} Z" fill="none" stroke="#000"/>')
+        body = "\n".join(elements)
+        return (
+            '<svg xmlns="http://www.w3.org/2000/svg" viewBox="0 0 1000 1000">'
+            f"<g>{body}</g></svg>"
+        )
+
+    def huge_svg(self) -> str:
+        return self.svg(paths=20_000)
+
+    def truncate(self, text: str) -> str:
+        return text[
+            : self.rng.randint(len(text) // 4, max(len(text) // 4, len(text) - 1))
+        ]
+
+    def malform_json(self, text: str) -> str:
+        kind = self.rng.random()
+        if kind < 0.33:
+            return text.replace("}, {", "} {", 1)
+        if kind < 0.66:
+            return text.replace('", "', '" "', 1)
+        return text.replace("}]", "},]", 1)
+
+    def stray_closer(self, text: str) -> str:
+        # A closer with no opener, between two members of a cell.
+        index = text.find('", "', self.rng.randrange(max(1, len(text) // 2)))
+        if index < 0:
+            return f"{text}]"
+        return f"{text[: index + 1]} ]{text[index + 1 :]}"
+
+    def mismatched_closers(self) -> str:
+        # Openers answered only by closers of the other kind.
+        depth = self.rng.randint(10_000, 40_000)
+        return "{" * depth + "]" * depth
+
+
+def synthetic_corpus(parsers: list[str], pages: int, seed: int) -> Corpus:
+    source = SyntheticResponses(seed)
+    generators: dict[str, dict[str, Callable[[], str]]] = {
+        "markdown": {
+            "clean": source.markdown,
+            "fenced": lambda: f"```markdown\n{source.markdown()}\n```",
+            "truncated": lambda: source.truncate(source.markdown()),
+        },
+        "dots_layout_json": {
+            "clean": source.dots_layout_json,
+            "fenced": lambda: f"```json\n{source.dots_layout_json()}\n```",
+            "truncated": lambda: source.truncate(source.dots_layout_json()),
+            "malformed": lambda: source.malform_json(source.dots_layout_json()),
+            "stray_closer": lambda: source.stray_closer(source.dots_layout_json()),
+            "mismatched": source.mismatched_closers,
+        },
+        "infinity_layout_json": {
+            "clean": source.infinity_layout_json,
+            "truncated": lambda: source.truncate(source.infinity_layout_json()),
+            "malformed": lambda: source.malform_json(source.infinity_layout_json()),
+            "stray_closer": lambda: source.stray_closer(source.infinity_layout_json()),
+            "mismatched": source.mismatched_closers,
+        },
+        "chandra_html": {
+            "clean": source.chandra_html,
+            "fenced": lambda: f"```html\n{source.chandra_html()}\n```",
+            "truncated": lambda: source.truncate(source.chandra_html()),
+        },
+        "deepseek_markdown": {
+            "clean": source.deepseek_markdown,
+            "truncated": lambda: source.truncate(source.deepseek_markdown()),
+        },
+        "unlimited_ocr": {
+            "clean": source.unlimited_ocr,
+            "looping": source.looping_unlimited_ocr,
+        },
+        "svg": {
+            "clean": source.svg,
+            "fenced": lambda: f"```svg\n{source.svg()}\n```",
+            "truncated": lambda: source.truncate(source.svg()),
+            "huge": source.huge_svg,
+        },
+    }
+    corpus: Corpus = {}
+    for parser in parsers:
+        for case, generate in generators.get(parser, {}).items():
+            # Huge responses are few per page set in practice and slow to build.
+            count = (
+                max(1, pages // 10)
+                if case in {"huge", "looping", "mismatched"}
+                else pages
+            )
+            corpus[(parser, case)] = [generate() for _ in range(count)]
+    return corpus
+
+
+def load_recorded_responses(inputs: list[str], parsers: list[str]) -> Corpus:
+    corpus: Corpus = {}
+    for value in inputs:
+        for record in iter_raw_response_records(Path(value)):
+            parser = record.get("response_parser")
+            if "page_index" not in record or parser not in parsers:
+                continue
+            raw_response = record.get("raw_response")
+            if raw_response:
+                corpus.setdefault((parser, "recorded"), []).append(str(raw_response))
+    return corpus
+
+
+def check_recovery(parsers: list[str]) -> tuple[int, int]:
+    checked = failures = 0
+    for parser_name, response, expected in RECOVERY_CASES:
+        if parser_name not in parsers:
+            continue
+        checked += 1
+        _, markdown = RESPONSE_PARSERS[parser_name].parse(response)
+        if markdown != expected:
+            failures += 1
+            logging.warning(
+                "%s recovered %r from %r, expected %r",
+                parser_name,
+                markdown,
+                response,
+                expected,
+            )
+    return checked, failures
+
+
+def check_streams(corpus: Corpus, seed: int) -> tuple[int, int]:
+    """Feed pages to each parser's stream in random chunks and compare.
+
+    A stream may decline with None, but a result it returns must match
+    `parse` on the whole page.
+    """
+    rng = random.Random(seed)
+    checked = mismatches = 0
+    for (parser_name, _), pages in corpus.items():
+        parser = RESPONSE_PARSERS[parser_name]
+        for page in pages:
+            stream = parser.stream()
+            if stream is None:
+                break
+            checked += 1
+            pos = 0
+            while pos < len(page):
+                size = rng.randint(1, 64)
+                stream.feed(page[pos : pos + size])
+                pos += size
+            streamed = stream.finish()
+            if streamed is None or streamed == parser.parse(page):
+                continue
+            mismatches += 1
+            if mismatches <= 3:
+                logging.warning(
+                    "%s stream differs from parse on %r", parser_name, page[:200]
+                )
+    return checked, mismatches
+
+
+def time_pages(parser: PageParser, pages: list[str], repeat: int) -> list[float]:
+    best: list[float] | None = None
+    for _ in range(repeat):
+        timings = []
+        for page in pages:
+            started = time.perf_counter()
+            parser.parse(page)
+            timings.append(time.perf_counter() - started)
+        if best is None or sum(timings) < sum(best):
+            best = timings
+    assert best is not None
+    return best
+
+
+def peak_allocations(parser: PageParser, pages: list[str]) -> list[int]:
+    peaks = []
+    tracemalloc.start()
+    try:
+        for page in pages:
+            tracemalloc.reset_peak()
+            baseline = tracemalloc.get_traced_memory()[0]
+            parser.parse(page)
+            peaks.append(tracemalloc.get_traced_memory()[1] - baseline)
+    finally:
+        tracemalloc.stop()
+    return peaks
+
+
+def percentile(values: list[float], fraction: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def log_case(
+    name: str,
+    pages: list[str],
+    timings: list[float],
+    peaks: list[int] | None,
+) -> None:
+    total_seconds = sum(timings)
+    total_bytes = sum(len(page.encode("utf-8")) for page in pages)
+    allocations = (
+        f"peak_alloc_mean={statistics.fmean(peaks) / 1024:.1f}KiB "
+        f"peak_alloc_max={max(peaks) / 1024:.1f}KiB"
+        if peaks
+        else "peak_alloc=skipped"
+    )
+    logging.info(
+        "%-32s pages=%s pages/s=%.1f MB/s=%.2f p50=%.3fms p99=%.3fms max=%.3fms %s",
+        name,
+        len(pages),
+        len(pages) / total_seconds if total_seconds else float("inf"),
+        total_bytes / total_seconds / 1e6 if total_seconds else float("inf"),
+        percentile(timings, 0.5) * 1000,
+        percentile(timings, 0.99) * 1000,
+        max(timings) * 1000,
+        allocations,
+    )
+
+
+def main() -> int:
+    args = parse_args()
+    logging.basicConfig(level=logging.INFO, format=LOG_FORMAT)
+
+    parsers = args.parsers or list(RESPONSE_PARSERS)
+    started = time.perf_counter()
+    corpus = synthetic_corpus(parsers, args.pages, args.seed)
+    corpus.update(load_recorded_responses(args.inputs, parsers))
+    corpus = {key: pages for key, pages in corpus.items() if pages}
+    if not corpus:
+        logging.error("No pages to benchmark.")
+        return 1
+    logging.info(
+        "cases=%s pages=%s corpus_MB=%.2f build_time=%.2fs",
+        len(corpus),
+        sum(len(pages) for pages in corpus.values()),
+        sum(len(page.encode("utf-8")) for pages in corpus.values() for page in pages)
+        / 1e6,
+        time.perf_counter() - started,
+    )
+
+    checked, failures = check_recovery(parsers)
+    logging.info("recovery_checks=%s failures=%s", checked, failures)
+    recovery_corpus: Corpus = {}
+    for parser_name, response, _ in RECOVERY_CASES:
+        if parser_name in parsers:
+            recovery_corpus.setdefault((parser_name, "recovery"), []).append(response)
+    checked, mismatches = check_streams(corpus | recovery_corpus, args.seed)
+    logging.info("stream_checked_pages=%s mismatches=%s", checked, mismatches)
+    failures += mismatches
+
+    for (parser_name, case), pages in corpus.items():
+        parser = RESPONSE_PARSERS[parser_name]
+        timings = time_pages(parser, pages, args.repeat)
+        peaks = None if args.no_allocations else peak_allocations(parser, pages)
+        log_case(f"{parser_name}[{case}]", pages, timings, peaks)
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
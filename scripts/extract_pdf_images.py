@@ -1,34 +1,103 @@
 #!/usr/bin/env python3
 """Extract embedded PDF images without calling a VLM API.
 
+Inputs are PDF files, directories containing them, or glob patterns. Each
+document's pages are split into shards that run in a process pool, and the
+images of `raw/name.pdf` go to `md/name/` unless `--output_root` or, for a
+single PDF, `-o` says otherwise. A finished document gets a
+`manifest.json` in its image directory, and later runs skip documents
+whose manifest still matches the PDF, the page range and the extraction
+settings, and whose images are all present.
+
 Examples:
   pixi run -e default python scripts/extract_pdf_images.py raw/file_name.pdf
   pixi run -e default python scripts/extract_pdf_images.py raw/file_name.pdf -o md/file_name
   pixi run -e default python scripts/extract_pdf_images.py raw/file_name.pdf -o md/file_name --min_image_width 64 --min_image_height 64
+  pixi run -e default python scripts/extract_pdf_images.py raw --recursive --workers 16
+  pixi run -e default python scripts/extract_pdf_images.py 'raw/**/*.pdf' --output_root md --force
 """
 
 from __future__ import annotations
 
 import argparse
+import dataclasses
+import glob
+import json
 import logging
+import os
+import time
+from concurrent.futures import Future, ProcessPoolExecutor, as_completed
+from dataclasses import dataclass, field
 from pathlib import Path
+from typing import Any
 
-from paper_xyz import ImageExtractionConfig, extract_images_to_directory
+from paper_xyz import ExtractedImage, ImageExtractionConfig, extract_images_to_directory
 from paper_xyz.pdf import get_page_count, resolve_page_range
 
+HELP_EPILOG = "\n".join((__doc__ or "").strip().splitlines()[2:]).strip()
 LOG_FORMAT = "%(asctime)s\t%(levelname)s\t%(name)s: %(message)s"
+MANIFEST_NAME = "manifest.json"
+MANIFEST_VERSION = 1
+
+
+@dataclass(slots=True)
+class DocumentTask:
+    pdf_path: Path
+    output_dir: Path
+    start_page: int
+    end_page: int
+    page_count: int
+    pending_shards: int = 0
+    images_by_page: dict[int, tuple[ExtractedImage, ...]] = field(default_factory=dict)
+    error: str | None = None
 
 
 def parse_args() -> argparse.Namespace:
     parser = argparse.ArgumentParser(
-        description="Extract PDF images as page-X-image-Y.png without using a VLM."
+        description="Extract PDF images as page-X-image-Y.png without using a VLM.",
+        epilog=HELP_EPILOG or None,
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    parser.add_argument(
+        "inputs",
+        nargs="+",
+        help="PDF files, directories, or glob patterns. Example: raw/file_name.pdf.",
     )
-    parser.add_argument("input", help="Input PDF path. Example: raw/file_name.pdf.")
     parser.add_argument(
         "--output_dir",
         "-o",
         default=None,
-        help="Image output directory. Defaults to md/<input-stem>.",
+        help=(
+            "Image output directory for a single input PDF. "
+            "Defaults to <output_root>/<input-stem>."
+        ),
+    )
+    parser.add_argument(
+        "--output_root",
+        default="md",
+        help="Directory holding one <input-stem> image directory per PDF. Default: md.",
+    )
+    parser.add_argument(
+        "--recursive",
+        action="store_true",
+        help="Find PDFs recursively under input directories.",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=os.cpu_count() or 1,
+        help="Number of extraction processes. Default: CPU count.",
+    )
+    parser.add_argument(
+        "--shard_pages",
+        type=int,
+        default=16,
+        help="Pages per extraction task; larger documents are split. Default: 16.",
+    )
+    parser.add_argument(
+        "--force",
+        action="store_true",
+        help="Extract documents again even when their manifest is complete.",
     )
     parser.add_argument(
         "--start_page",
@@ -63,6 +132,23 @@ def parse_args() -> argparse.Namespace:
         default=32,
         help="Skip images shorter than this many pixels. Default: 32.",
     )
+    parser.add_argument(
+        "--native_image_format",
+        action="store_true",
+        help=(
+            "Write JPEG and JPEG 2000 images in their original encoding, as "
+            ".jpeg or .jpx, when no mask or colorspace conversion is needed."
+        ),
+    )
+    parser.add_argument(
+        "--image_store",
+        default=None,
+        help=(
+            "Content-addressed image store shared across documents. Each "
+            "distinct image is written once under <dir>/blobs/ and extracted "
+            "image files are hardlinks to it. Default: off."
+        ),
+    )
     parser.add_argument(
         "--verbose",
         "-v",
@@ -70,7 +156,10 @@ def parse_args() -> argparse.Namespace:
         default=0,
         help="Set the verbosity level. -v for info logging, -vv for debug logging.",
     )
-    return parser.parse_args()
+    args = parser.parse_args()
+    if args.workers < 1 or args.shard_pages < 1:
+        parser.error("--workers and --shard_pages must be >= 1")
+    return args
 
 
 def configure_logging(verbose: int) -> None:
@@ -78,56 +167,234 @@ def configure_logging(verbose: int) -> None:
     logging.basicConfig(level=level, format=LOG_FORMAT)
 
 
+def find_pdf_files(inputs: list[str], *, recursive: bool) -> list[Path]:
+    found: set[Path] = set()
+    for value in inputs:
+        path = Path(value).expanduser()
+        if path.is_dir():
+            matches = path.rglob("*") if recursive else path.iterdir()
+            found.update(
+                match.resolve()
+                for match in matches
+                if match.is_file() and match.suffix.lower() == ".pdf"
+            )
+        elif path.is_file():
+            found.add(path.resolve())
+        else:
+            found.update(
+                Path(match).resolve()
+                for match in glob.glob(str(path), recursive=True)
+                if match.lower().endswith(".pdf") and Path(match).is_file()
+            )
+    return sorted(found, key=lambda path: str(path).lower())
+
+
+def page_shards(
+    start_page: int, end_page: int, shard_pages: int
+) -> list[tuple[int, int]]:
+    return [
+        (shard_start, min(shard_start + shard_pages - 1, end_page))
+        for shard_start in range(start_page, end_page + 1, shard_pages)
+    ]
+
+
+def manifest_key(task: DocumentTask, config: ImageExtractionConfig) -> dict[str, Any]:
+    status = task.pdf_path.stat()
+    return {
+        "version": MANIFEST_VERSION,
+        "pdf_path": str(task.pdf_path),
+        "pdf_size": status.st_size,
+        "pdf_mtime_ns": status.st_mtime_ns,
+        "start_page": task.start_page,
+        "end_page": task.end_page,
+        "image_extraction": dataclasses.asdict(config),
+    }
+
+
+def manifest_is_complete(task: DocumentTask, config: ImageExtractionConfig) -> bool:
+    manifest_path = task.output_dir / MANIFEST_NAME
+    try:
+        manifest = json.loads(manifest_path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return False
+    if not isinstance(manifest, dict):
+        return False
+    key = manifest_key(task, config)
+    if any(manifest.get(name) != value for name, value in key.items()):
+        return False
+    files = manifest.get("files")
+    return isinstance(files, list) and all(
+        (task.output_dir / name).is_file() for name in files
+    )
+
+
+def write_manifest(task: DocumentTask, config: ImageExtractionConfig) -> None:
+    files = [
+        Path(image.relative_path).name
+        for page_index in sorted(task.images_by_page)
+        for image in task.images_by_page[page_index]
+    ]
+    manifest = {**manifest_key(task, config), "files": files}
+    task.output_dir.mkdir(parents=True, exist_ok=True)
+    manifest_path = task.output_dir / MANIFEST_NAME
+    temp_path = manifest_path.with_name(f".{MANIFEST_NAME}.tmp")
+    temp_path.write_text(json.dumps(manifest, indent=2) + "\n", encoding="utf-8")
+    os.replace(temp_path, manifest_path)
+
+
+def build_config(args: argparse.Namespace) -> ImageExtractionConfig:
+    return ImageExtractionConfig(
+        enabled=True,
+        bbox_tolerance=args.image_bbox_tolerance,
+        min_width=args.min_image_width,
+        min_height=args.min_image_height,
+        native_format=args.native_image_format,
+        store_dir=(
+            str(Path(args.image_store).expanduser().resolve())
+            if args.image_store
+            else None
+        ),
+    )
+
+
 def main() -> int:
     args = parse_args()
     configure_logging(args.verbose)
 
-    input_path = Path(args.input).expanduser().resolve()
-    if not input_path.is_file():
-        logging.error("PDF file not found: %s", input_path)
+    pdf_paths = find_pdf_files(args.inputs, recursive=args.recursive)
+    if not pdf_paths:
+        logging.error("No PDF files found: %s", " ".join(args.inputs))
+        return 1
+    if args.output_dir and len(pdf_paths) > 1:
+        logging.error("-o/--output_dir needs a single input PDF; use --output_root.")
         return 1
+    output_root = Path(args.output_root).expanduser().resolve()
+    output_dirs = {
+        pdf_path: (
+            Path(args.output_dir).expanduser().resolve()
+            if args.output_dir
+            else output_root / pdf_path.stem
+        )
+        for pdf_path in pdf_paths
+    }
 
-    output_dir = (
-        Path(args.output_dir).expanduser().resolve()
-        if args.output_dir
-        else (Path("md") / input_path.stem).resolve()
-    )
+    outputs_seen: dict[Path, Path] = {}
+    collisions: list[tuple[Path, Path, Path]] = []
+    for pdf_path, output_dir in output_dirs.items():
+        previous_pdf = outputs_seen.setdefault(output_dir, pdf_path)
+        if previous_pdf != pdf_path:
+            collisions.append((output_dir, previous_pdf, pdf_path))
+    if collisions:
+        logging.error(
+            "Multiple PDFs would write to the same image directory. Rename inputs."
+        )
+        for output_dir, first_pdf, second_pdf in collisions[:10]:
+            logging.error("  %s: %s and %s", output_dir, first_pdf, second_pdf)
+        if len(collisions) > 10:
+            logging.error("  ... and %d more", len(collisions) - 10)
+        return 1
 
     try:
-        page_count = get_page_count(input_path)
-        start_page, end_page = resolve_page_range(
-            page_count=page_count,
-            start_page=args.start_page,
-            end_page=args.end_page,
-        )
-        config = ImageExtractionConfig(
-            enabled=True,
-            bbox_tolerance=args.image_bbox_tolerance,
-            min_width=args.min_image_width,
-            min_height=args.min_image_height,
-        )
-        images_by_page = extract_images_to_directory(
-            input_path,
-            output_dir,
-            start_page=start_page,
-            end_page=end_page,
-            config=config,
-        )
-    except Exception as exc:
+        config = build_config(args)
+    except ValueError as exc:
         logging.error("%s", exc)
         return 2
 
-    extracted_images = sum(len(images) for images in images_by_page.values())
-    logging.info("[paper_xyz] input: %s", input_path)
-    logging.info("[paper_xyz] output_dir: %s", output_dir)
+    failures = 0
+    skipped = 0
+    tasks: list[DocumentTask] = []
+    for pdf_path, output_dir in output_dirs.items():
+        try:
+            page_count = get_page_count(pdf_path)
+            start_page, end_page = resolve_page_range(
+                page_count=page_count,
+                start_page=args.start_page,
+                end_page=args.end_page,
+            )
+        except Exception as exc:
+            failures += 1
+            logging.error("[paper_xyz] %s: %s", pdf_path, exc)
+            continue
+        task = DocumentTask(pdf_path, output_dir, start_page, end_page, page_count)
+        if not args.force and manifest_is_complete(task, config):
+            skipped += 1
+            logging.debug("[paper_xyz] %s: manifest complete, skipped", pdf_path)
+            continue
+        tasks.append(task)
+
+    start = time.time()
+    pages = 0
+    images = 0
+    image_bytes = 0
+    shards = [
+        (task, shard)
+        for task in tasks
+        for shard in page_shards(task.start_page, task.end_page, args.shard_pages)
+    ]
+    if shards:
+        with ProcessPoolExecutor(max_workers=min(args.workers, len(shards))) as pool:
+            futures: dict[Future[Any], tuple[DocumentTask, tuple[int, int]]] = {}
+            for task, (shard_start, shard_end) in shards:
+                task.pending_shards += 1
+                future = pool.submit(
+                    extract_images_to_directory,
+                    task.pdf_path,
+                    task.output_dir,
+                    start_page=shard_start,
+                    end_page=shard_end,
+                    config=config,
+                )
+                futures[future] = (task, (shard_start, shard_end))
+            for future in as_completed(futures):
+                task, (shard_start, shard_end) = futures[future]
+                task.pending_shards -= 1
+                try:
+                    task.images_by_page.update(future.result())
+                except Exception as exc:
+                    task.error = task.error or f"pages {shard_start}-{shard_end}: {exc}"
+                if task.pending_shards:
+                    continue
+                if task.error is not None:
+                    failures += 1
+                    logging.error("[paper_xyz] %s: %s", task.pdf_path, task.error)
+                    continue
+                write_manifest(task, config)
+                document_images = [
+                    image for page in task.images_by_page.values() for image in page
+                ]
+                document_bytes = sum(
+                    (task.output_dir / Path(image.relative_path).name).stat().st_size
+                    for image in document_images
+                )
+                pages += task.end_page - task.start_page + 1
+                images += len(document_images)
+                image_bytes += document_bytes
+                logging.info(
+                    "[paper_xyz] %s output_dir=%s page_range=%s-%s total_pages=%s "
+                    "extracted_images=%s",
+                    task.pdf_path,
+                    task.output_dir,
+                    task.start_page,
+                    task.end_page,
+                    task.page_count,
+                    len(document_images),
+                )
+
+    elapsed = time.time() - start
     logging.info(
-        "[paper_xyz] page_range=%s-%s total_pages=%s extracted_images=%s",
-        start_page,
-        end_page,
-        page_count,
-        extracted_images,
+        "[paper_xyz] documents=%s skipped=%s failed_documents=%s pages=%s "
+        "images=%s image_mb=%.2f total_time=%.2fs images_per_s=%.1f mb_per_s=%.2f",
+        len(pdf_paths),
+        skipped,
+        failures,
+        pages,
+        images,
+        image_bytes / 1e6,
+        elapsed,
+        images / elapsed if elapsed > 0 else 0.0,
+        image_bytes / 1e6 / elapsed if elapsed > 0 else 0.0,
     )
-    return 0
+    return 2 if failures else 0
 
 
 if __name__ == "__main__":
@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""Report on a shared image store and remove images no output uses anymore.
+
+Extracted images written with `--image_store` are hardlinks to blobs in the
+store, so a blob whose only link is the store's own is unreferenced. Delete
+or regenerate outputs first, then run this to reclaim their images.
+
+Examples:
+  pixi run -e default python scripts/gc_image_store.py md/.image-store --dry_run
+  pixi run -e default python scripts/gc_image_store.py md/.image-store
+"""
+
+from __future__ import annotations
+
+import argparse
+import logging
+from pathlib import Path
+
+from paper_xyz import ImageStore
+
+HELP_EPILOG = "\n".join((__doc__ or "").strip().splitlines()[2:]).strip()
+LOG_FORMAT = "%(asctime)s\t%(levelname)s\t%(name)s: %(message)s"
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Garbage-collect unreferenced images in a shared image store.",
+        epilog=HELP_EPILOG or None,
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    parser.add_argument("store", help="Image store directory given to --image_store.")
+    parser.add_argument(
+        "--dry_run",
+        action="store_true",
+        help="Only report what would be removed.",
+    )
+    return parser.parse_args()
+
+
+def main() -> int:
+    args = parse_args()
+    logging.basicConfig(level=logging.INFO, format=LOG_FORMAT)
+    store = ImageStore(Path(args.store).expanduser())
+    stats = store.stats()
+    logging.info(
+        "[paper_xyz] blobs=%s bytes=%s unreferenced_blobs=%s unreferenced_bytes=%s",
+        stats.blobs,
+        stats.bytes,
+        stats.unreferenced_blobs,
+        stats.unreferenced_bytes,
+    )
+    removed, removed_bytes = store.collect_garbage(dry_run=args.dry_run)
+    logging.info(
+        "[paper_xyz] %s blobs=%s bytes=%s",
+        "would_remove" if args.dry_run else "removed",
+        removed,
+        removed_bytes,
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,186 @@
+#!/usr/bin/env python3
+"""Rebuild Markdown from spilled raw model responses without calling a VLM.
+
+Inputs are `<output-stem>.raw.jsonl.gz` sidecars written by
+`agent/paper_xyz_ref.py --raw_responses spill`, directories containing them,
+or glob patterns. Every sidecar is re-parsed with the current
+`paper_xyz.parsing` code and written next to it as `<output-stem>.md`.
+
+Examples:
+  pixi run -e default python scripts/reparse_markdown.py md/demo.raw.jsonl.gz
+  pixi run -e default python scripts/reparse_markdown.py md --recursive --workers 16
+  pixi run -e default python scripts/reparse_markdown.py 'md/**/*.raw.jsonl.gz' --no_extract_images
+"""
+
+from __future__ import annotations
+
+import argparse
+import glob
+import logging
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+
+from paper_xyz.raw_store import RAW_RESPONSE_SUFFIX
+from paper_xyz.reparse import default_reparse_output_path, reparse_document
+
+HELP_EPILOG = "\n".join((__doc__ or "").strip().splitlines()[2:]).strip()
+LOG_FORMAT = "%(asctime)s\t%(levelname)s\t%(name)s: %(message)s"
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Re-parse spilled raw model responses into Markdown.",
+        epilog=HELP_EPILOG or None,
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    parser.add_argument(
+        "inputs",
+        nargs="+",
+        help="Raw response sidecars, directories, or glob patterns.",
+    )
+    parser.add_argument(
+        "--output_dir",
+        "-o",
+        default=None,
+        help="Write Markdown here instead of next to each sidecar.",
+    )
+    parser.add_argument(
+        "--recursive",
+        action="store_true",
+        help="Find sidecars recursively under input directories.",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=os.cpu_count() or 1,
+        help="Number of documents re-parsed in parallel. Default: CPU count.",
+    )
+    parser.add_argument(
+        "--include_page_numbers",
+        action=argparse.BooleanOptionalAction,
+        default=None,
+        help="Override the page marker setting recorded in each sidecar.",
+    )
+    parser.add_argument(
+        "--extract_images",
+        action=argparse.BooleanOptionalAction,
+        default=None,
+        help=(
+            "Override the image extraction setting recorded in each sidecar. "
+            "Image extraction re-reads the source PDF recorded in the sidecar."
+        ),
+    )
+    parser.add_argument(
+        "--svg_max_bytes",
+        type=int,
+        default=None,
+        help="Override the SVG size limit recorded in each sidecar.",
+    )
+    parser.add_argument(
+        "--svg_minify_paths",
+        action=argparse.BooleanOptionalAction,
+        default=None,
+        help="Override the SVG path minification setting recorded in each sidecar.",
+    )
+    parser.add_argument(
+        "--verbose",
+        "-v",
+        action="count",
+        default=0,
+        help="Set the verbosity level. -v for info logging, -vv for debug logging.",
+    )
+    args = parser.parse_args()
+    if args.workers < 1:
+        parser.error("--workers must be >= 1")
+    if args.svg_max_bytes is not None and args.svg_max_bytes < 1:
+        parser.error("--svg_max_bytes must be >= 1")
+    return args
+
+
+def configure_logging(verbose: int) -> None:
+    level = logging.DEBUG if verbose > 1 else logging.INFO
+    logging.basicConfig(level=level, format=LOG_FORMAT)
+
+
+def find_sidecars(inputs: list[str], *, recursive: bool) -> list[Path]:
+    pattern = f"*{RAW_RESPONSE_SUFFIX}"
+    found: set[Path] = set()
+    for value in inputs:
+        path = Path(value)
+        if path.is_dir():
+            matches = path.rglob(pattern) if recursive else path.glob(pattern)
+            found.update(match.resolve() for match in matches if match.is_file())
+        elif path.is_file():
+            found.add(path.resolve())
+        else:
+            found.update(
+                Path(match).resolve()
+                for match in glob.glob(value, recursive=True)
+                if match.endswith(RAW_RESPONSE_SUFFIX) and Path(match).is_file()
+            )
+    return sorted(found, key=lambda path: str(path).lower())
+
+
+def output_path_for(sidecar_path: Path, output_dir: Path | None) -> Path:
+    output_path = default_reparse_output_path(sidecar_path)
+    return output_dir / output_path.name if output_dir else output_path
+
+
+def main() -> int:
+    args = parse_args()
+    configure_logging(args.verbose)
+
+    sidecars = find_sidecars(args.inputs, recursive=args.recursive)
+    if not sidecars:
+        logging.error("No %s files found.", RAW_RESPONSE_SUFFIX)
+        return 1
+    output_dir = Path(args.output_dir).resolve() if args.output_dir else None
+
+    start = time.time()
+    failures = 0
+    pages = 0
+    with ProcessPoolExecutor(max_workers=min(args.workers, len(sidecars))) as pool:
+        futures = {
+            pool.submit(
+                reparse_document,
+                sidecar_path,
+                output_path_for(sidecar_path, output_dir),
+                include_page_numbers=args.include_page_numbers,
+                extract_images=args.extract_images,
+                svg_max_bytes=args.svg_max_bytes,
+                svg_minify_paths=args.svg_minify_paths,
+            ): sidecar_path
+            for sidecar_path in sidecars
+        }
+        for future in as_completed(futures):
+            sidecar_path = futures[future]
+            try:
+                stats = future.result()
+            except Exception as exc:
+                failures += 1
+                logging.error("[paper_xyz] %s: %s", sidecar_path, exc)
+                continue
+            pages += stats.pages
+            logging.info(
+                "[paper_xyz] %s pages=%s failed_pages=%s chars=%s",
+                output_path_for(sidecar_path, output_dir),
+                stats.pages,
+                stats.failed_pages,
+                stats.chars,
+            )
+
+    elapsed = time.time() - start
+    logging.info(
+        "[paper_xyz] documents=%s failed_documents=%s pages=%s total_time=%.2fs",
+        len(sidecars),
+        failures,
+        pages,
+        elapsed,
+    )
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
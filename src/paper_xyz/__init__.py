@@ -6,9 +6,16 @@ from paper_xyz.converter import (
     ConversionConfig,
     ConversionStats,
     PdfToMarkdownConverter,
+    StageTimingStats,
     build_document_markdown,
 )
-from paper_xyz.images import extract_document_images, extract_images_to_directory
+from paper_xyz.events import ConversionObserver
+from paper_xyz.image_store import ImageStore
+from paper_xyz.images import (
+    DocumentImageExtractor,
+    extract_document_images,
+    extract_images_to_directory,
+)
 from paper_xyz.model_services import (
     ModelServiceProfile,
     get_model_service_profile,
@@ -22,24 +29,34 @@ from paper_xyz.types import (
     ImageRenderProfile,
     PageMetadata,
     PageResult,
+    PageTimings,
+    RawResponseRef,
     RenderedPage,
     TokenUsage,
 )
+from paper_xyz.writer import OrderedMarkdownWriter
 
 __all__ = [
     "ConversionConfig",
+    "ConversionObserver",
     "ConversionStats",
     "DEFAULT_API",
     "DEFAULT_MARKDOWN_PROMPT",
     "DEFAULT_MODEL_SERVICE",
+    "DocumentImageExtractor",
     "ExtractedImage",
     "ImageExtractionConfig",
     "ImageRenderProfile",
+    "ImageStore",
     "ModelServiceProfile",
+    "OrderedMarkdownWriter",
     "PageMetadata",
     "PageResult",
+    "PageTimings",
     "PdfToMarkdownConverter",
+    "RawResponseRef",
     "RenderedPage",
+    "StageTimingStats",
     "TokenUsage",
     "build_document_markdown",
     "extract_document_images",
@@ -1,5 +1,9 @@
 from __future__ import annotations
 
+import dataclasses
+import json
+import time
+from collections.abc import Callable
 from dataclasses import dataclass
 from typing import Any
 
@@ -7,7 +11,7 @@ import httpx
 
 from paper_xyz.model_services import TokenParam
 from paper_xyz.parsing import extract_message_text
-from paper_xyz.types import RenderedPage, TokenUsage
+from paper_xyz.types import PageTimings, RenderedPage, TokenUsage
 
 
 class NonRetryableChatResponseError(ValueError):
@@ -18,6 +22,17 @@ class NonRetryableChatResponseError(ValueError):
         self.usage = usage or TokenUsage()
 
 
+class ChatStreamInterruptedError(ValueError):
+    """Raised when a streamed response broke off after some content arrived."""
+
+    def __init__(
+        self, message: str, *, text: str, usage: TokenUsage | None = None
+    ) -> None:
+        super().__init__(message)
+        self.text = text
+        self.usage = usage or TokenUsage()
+
+
 @dataclass(frozen=True, slots=True)
 class ChatRequestConfig:
     api_url: str
@@ -33,6 +48,7 @@ class ChatRequestConfig:
     image_first: bool = True
     text_prefix: str = ""
     accepted_finish_reasons: tuple[str | None, ...] = (None, "stop", "end_turn")
+    stream: bool = False
 
     def prompt_for_page(self, page: RenderedPage) -> str:
         return self.prompt.replace("{width}", str(page.width)).replace(
@@ -40,6 +56,51 @@ class ChatRequestConfig:
         )
 
 
+class ResponseTimer:
+    """Split one request's time into the send, first-token and read stages.
+
+    The send stage ends when the transport traces the request body as
+    written, which is also when `on_request_sent` is called; transports that
+    do not trace leave it at zero, and the upload counts towards the first
+    token instead.
+    """
+
+    def __init__(
+        self,
+        timings: PageTimings | None,
+        *,
+        on_request_sent: Callable[[], object] | None = None,
+    ) -> None:
+        self.timings = timings
+        self.on_request_sent = on_request_sent
+        self.started = time.perf_counter()
+        self.sent: float | None = None
+        self.first_token: float | None = None
+
+    def request_extensions(self) -> dict[str, Any]:
+        return {"trace": self.trace}
+
+    async def trace(self, event_name: str, info: dict[str, Any]) -> None:
+        if event_name.endswith(".send_request_body.complete"):
+            self.sent = time.perf_counter()
+            if self.on_request_sent is not None:
+                self.on_request_sent()
+
+    def mark_first_token(self) -> None:
+        if self.first_token is None:
+            self.first_token = time.perf_counter()
+
+    def finish(self) -> None:
+        if self.timings is None:
+            return
+        finished = time.perf_counter()
+        sent = self.started if self.sent is None else self.sent
+        first_token = finished if self.first_token is None else self.first_token
+        self.timings.send_seconds += sent - self.started
+        self.timings.first_token_seconds += first_token - sent
+        self.timings.read_seconds += finished - first_token
+
+
 def build_chat_payload(
     page: RenderedPage,
     config: ChatRequestConfig,
@@ -70,6 +131,9 @@ def build_chat_payload(
         payload["repetition_penalty"] = config.repetition_penalty
     if config.extra_body:
         payload.update(config.extra_body)
+    if config.stream:
+        payload["stream"] = True
+        payload["stream_options"] = {"include_usage": True}
     return payload
 
 
@@ -77,10 +141,33 @@ async def request_chat_completion(
     client: httpx.AsyncClient,
     page: RenderedPage,
     config: ChatRequestConfig,
+    *,
+    on_request_sent: Callable[[], object] | None = None,
+    on_first_token: Callable[[], object] | None = None,
+    timings: PageTimings | None = None,
 ) -> tuple[str, TokenUsage]:
-    response = await client.post(config.api_url, json=build_chat_payload(page, config))
-    response.raise_for_status()
-    data = response.json()
+    timer = (
+        ResponseTimer(timings, on_request_sent=on_request_sent)
+        if timings is not None or on_request_sent is not None
+        else None
+    )
+    try:
+        async with client.stream(
+            "POST",
+            config.api_url,
+            json=build_chat_payload(page, config),
+            extensions=timer.request_extensions() if timer else None,
+        ) as response:
+            if timer is not None:
+                timer.mark_first_token()
+            if on_first_token is not None:
+                on_first_token()
+            await response.aread()
+        response.raise_for_status()
+        data = response.json()
+    finally:
+        if timer is not None:
+            timer.finish()
 
     choices = data.get("choices")
     if not isinstance(choices, list) or not choices:
@@ -98,13 +185,144 @@ async def request_chat_completion(
     if not text.strip():
         raise ValueError(f"Page {page.page_index} response content is empty")
 
-    usage_data = data.get("usage") if isinstance(data.get("usage"), dict) else {}
-    usage = TokenUsage(
-        prompt_tokens=int(usage_data.get("prompt_tokens", 0) or 0),
-        completion_tokens=int(usage_data.get("completion_tokens", 0) or 0),
+    usage = parse_token_usage(data)
+    check_finish_reason(page, config, choice.get("finish_reason"), text, usage)
+    return text, usage
+
+
+async def stream_chat_completion(
+    client: httpx.AsyncClient,
+    page: RenderedPage,
+    config: ChatRequestConfig,
+    *,
+    on_delta: Callable[[str], object] | None = None,
+    on_request_sent: Callable[[], object] | None = None,
+    on_first_token: Callable[[], object] | None = None,
+    timings: PageTimings | None = None,
+) -> tuple[str, TokenUsage]:
+    parts: list[str] = []
+    usage = TokenUsage()
+    finish_reason: str | None = None
+    timer = (
+        ResponseTimer(timings, on_request_sent=on_request_sent)
+        if timings is not None or on_request_sent is not None
+        else None
     )
+    try:
+        async with client.stream(
+            "POST",
+            config.api_url,
+            json=build_chat_payload(page, config),
+            extensions=timer.request_extensions() if timer else None,
+        ) as response:
+            if response.is_error:
+                await response.aread()
+            response.raise_for_status()
+            async for line in response.aiter_lines():
+                data = parse_sse_data(line)
+                if data is None:
+                    continue
+                if data == "[DONE]":
+                    break
+                chunk = json.loads(data)
+                if not isinstance(chunk, dict):
+                    continue
+                if isinstance(chunk.get("error"), dict | str):
+                    raise ValueError(
+                        f"Page {page.page_index} stream error: {chunk['error']}"
+                    )
+                if isinstance(chunk.get("usage") or chunk.get("timings"), dict):
+                    usage = parse_token_usage(chunk, usage)
+
+                choices = chunk.get("choices")
+                if not isinstance(choices, list) or not choices:
+                    continue
+                choice = choices[0]
+                if not isinstance(choice, dict):
+                    continue
+                delta = choice.get("delta")
+                content = delta.get("content") if isinstance(delta, dict) else None
+                if content:
+                    if timer is not None:
+                        timer.mark_first_token()
+                    if not parts and on_first_token is not None:
+                        on_first_token()
+                    delta_text = extract_message_text(content)
+                    parts.append(delta_text)
+                    if on_delta is not None:
+                        on_delta(delta_text)
+                if choice.get("finish_reason") is not None:
+                    finish_reason = choice["finish_reason"]
+    except (httpx.HTTPError, ValueError) as exc:
+        if not parts or isinstance(exc, httpx.HTTPStatusError):
+            raise
+        raise ChatStreamInterruptedError(
+            f"Page {page.page_index} stream interrupted after "
+            f"{sum(len(part) for part in parts)} chars: {exc}",
+            text="".join(parts),
+            usage=usage,
+        ) from exc
+    finally:
+        if timer is not None:
+            timer.finish()
+
+    text = "".join(parts)
+    if not text.strip():
+        raise ValueError(f"Page {page.page_index} response content is empty")
+    check_finish_reason(page, config, finish_reason, text, usage)
+    return text, usage
+
+
+def parse_sse_data(line: str) -> str | None:
+    if not line.startswith("data:"):
+        return None
+    data = line[5:].strip()
+    return data or None
 
-    finish_reason = choice.get("finish_reason")
+
+def parse_token_usage(
+    data: dict[str, Any], previous: TokenUsage | None = None
+) -> TokenUsage:
+    """Read `usage` and llama-server `timings`, keeping `previous` for absent ones.
+
+    Streams can send the two in different chunks.
+    """
+    usage = previous or TokenUsage()
+    usage_data = data.get("usage")
+    if isinstance(usage_data, dict):
+        details = usage_data.get("prompt_tokens_details")
+        usage = dataclasses.replace(
+            usage,
+            prompt_tokens=int(usage_data.get("prompt_tokens", 0) or 0),
+            completion_tokens=int(usage_data.get("completion_tokens", 0) or 0),
+            cached_prompt_tokens=(
+                int(details.get("cached_tokens", 0) or 0)
+                if isinstance(details, dict)
+                else usage.cached_prompt_tokens
+            ),
+        )
+    timings = data.get("timings")
+    if isinstance(timings, dict):
+        usage = dataclasses.replace(
+            usage,
+            cached_prompt_tokens=(
+                usage.cached_prompt_tokens or int(timings.get("cache_n", 0) or 0)
+            ),
+            prefill_tokens=int(timings.get("prompt_n", 0) or 0),
+            prefill_seconds=float(timings.get("prompt_ms", 0) or 0) / 1000,
+            decode_tokens=int(timings.get("predicted_n", 0) or 0),
+            decode_seconds=float(timings.get("predicted_ms", 0) or 0) / 1000,
+        )
+    return usage
+
+
+def check_finish_reason(
+    page: RenderedPage,
+    config: ChatRequestConfig,
+    finish_reason: str | None,
+    text: str,
+    usage: TokenUsage,
+) -> None:
     if finish_reason not in config.accepted_finish_reasons:
         raise NonRetryableChatResponseError(
             f"Page {page.page_index} finish_reason={finish_reason} "
@@ -112,4 +330,3 @@ async def request_chat_completion(
             f"completion_tokens={usage.completion_tokens} output_chars={len(text)}",
             usage=usage,
         )
-    return text, usage
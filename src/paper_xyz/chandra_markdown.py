@@ -0,0 +1,581 @@
+from __future__ import annotations
+
+import re
+from collections.abc import Callable, Sequence
+
+from bs4 import Comment, Doctype, NavigableString, Tag
+from bs4.dammit import EntitySubstitution
+
+# A child of a rendered element: a tag, a run of adjacent text merged into
+# one plain string, or an ignored node such as a comment.
+ChandraNode = Tag | NavigableString | str
+Converter = Callable[[Tag, str, frozenset[str], Sequence[ChandraNode], int], str]
+
+DOCUMENT_NAME = "[document]"
+HEADING_TAG_RE = re.compile(r"h(\d+)")
+ALL_WHITESPACE_RE = re.compile(r"[\t \r\n]+")
+INLINE_WHITESPACE_RE = re.compile(r"[\t ]+")
+NEWLINE_WHITESPACE_RE = re.compile(r"[\t \r\n]*[\r\n][\t \r\n]*")
+EDGE_NEWLINES_RE = re.compile(r"^(\n*)((?:.*[^\n])?)(\n*)$", re.DOTALL)
+LINE_CONTENT_RE = re.compile(r"^(.*)", re.MULTILINE)
+PRE_LEADING_RE = re.compile(r"^[ \n]*\n")
+PRE_TRAILING_RE = re.compile(r"[ \n]*$")
+BACKTICK_RUN_RE = re.compile(r"`+")
+WHITESPACE_BLOCK_TAGS = frozenset(
+    {
+        "p",
+        "blockquote",
+        "article",
+        "div",
+        "section",
+        "ol",
+        "ul",
+        "li",
+        "dl",
+        "dt",
+        "dd",
+        "table",
+        "thead",
+        "tbody",
+        "tfoot",
+        "tr",
+        "td",
+        "th",
+    }
+)
+NOFORMAT_TAGS = frozenset({"pre", "code", "kbd", "samp"})
+
+
+def render_chandra_markdown(nodes: Sequence[ChandraNode]) -> str:
+    """Render Chandra HTML nodes to Markdown without a markdownify pass.
+
+    Output matches markdownify 1.x with the options the chandra_html parser
+    used (ATX headings, "-" bullets, escaped underscores and asterisks),
+    with math as `$`/`$$` and tables kept as HTML. Tags outside the Chandra
+    whitelist keep only their converted children.
+    """
+    document_tags = frozenset({DOCUMENT_NAME})
+    text = render_children(nodes, DOCUMENT_NAME, document_tags)
+    return text.strip("\n").strip()
+
+
+def child_nodes(node: Tag) -> list[ChandraNode]:
+    nodes: list[ChandraNode] = []
+    for child in node.contents:
+        if is_text_node(child):
+            append_text(nodes, str(child))
+        elif isinstance(child, Tag | NavigableString):
+            nodes.append(child)
+    return nodes
+
+
+def append_block_contents(nodes: list[ChandraNode], block: Tag) -> None:
+    """Append a block's stripped contents, separated from earlier blocks.
+
+    Matches joining each block's `decode_contents().strip()` with blank
+    lines and parsing the result again: text at block edges is stripped
+    and merges with the separator.
+    """
+    children = child_nodes(block)
+    while children and type(children[0]) is str:
+        if children[0].lstrip():
+            children[0] = children[0].lstrip()
+            break
+        children.pop(0)
+    while children and type(children[-1]) is str:
+        if children[-1].rstrip():
+            children[-1] = children[-1].rstrip()
+            break
+        children.pop()
+    if not children:
+        return
+
+    if nodes:
+        append_text(nodes, "\n\n")
+    for child in children:
+        if type(child) is str:
+            append_text(nodes, child)
+        else:
+            nodes.append(child)
+
+
+def serialize_chandra_nodes(nodes: Sequence[ChandraNode]) -> str:
+    chunks: list[str] = []
+    for node in nodes:
+        if isinstance(node, Tag):
+            chunks.append(node.decode())
+        elif isinstance(node, NavigableString):
+            chunks.append(node.output_ready())
+        else:
+            chunks.append(EntitySubstitution.substitute_xml(node))
+    return "".join(chunks)
+
+
+def is_text_node(node: object) -> bool:
+    return isinstance(node, NavigableString) and not isinstance(
+        node, (Comment, Doctype)
+    )
+
+
+def append_text(nodes: list[ChandraNode], text: str) -> None:
+    if not text:
+        return
+    if nodes and type(nodes[-1]) is str:
+        nodes[-1] += text
+    else:
+        nodes.append(text)
+
+
+def render_children(
+    nodes: Sequence[ChandraNode], name: str, child_tags: frozenset[str]
+) -> str:
+    removes_inside = removes_whitespace_inside(name)
+    strings: list[str] = []
+    last_index = len(nodes) - 1
+    for index, node in enumerate(nodes):
+        if isinstance(node, Tag):
+            rendered = render_tag(node, child_tags, nodes, index)
+        elif type(node) is str:
+            previous = nodes[index - 1] if index else None
+            following = nodes[index + 1] if index < last_index else None
+            if not node.strip() and (
+                (removes_inside and (not previous or not following))
+                or removes_whitespace_outside(previous)
+                or removes_whitespace_outside(following)
+            ):
+                continue
+            rendered = render_text(
+                node, child_tags, previous, following, removes_inside
+            )
+        else:
+            continue
+        if rendered:
+            strings.append(rendered)
+
+    if "pre" in child_tags:
+        return "".join(strings)
+
+    # Collapse newlines at child boundaries to at most one blank line.
+    collapsed = [""]
+    for string in strings:
+        edges = EDGE_NEWLINES_RE.match(string)
+        assert edges is not None  # Every part of the pattern is optional.
+        leading, content, trailing = edges.groups()
+        if collapsed[-1] and leading:
+            previous_trailing = collapsed.pop()
+            leading = "\n" * min(2, max(len(previous_trailing), len(leading)))
+        collapsed.extend((leading, content, trailing))
+    return "".join(collapsed)
+
+
+def render_tag(
+    tag: Tag,
+    parent_tags: frozenset[str],
+    siblings: Sequence[ChandraNode],
+    index: int,
+) -> str:
+    name = tag.name
+    if name == "table":
+        return f"\n\n{tag}\n\n"
+
+    child_tags = set(parent_tags)
+    child_tags.add(name)
+    is_heading = HEADING_TAG_RE.match(name) is not None
+    if is_heading or name in {"td", "th"}:
+        child_tags.add("_inline")
+    if name in NOFORMAT_TAGS:
+        child_tags.add("_noformat")
+    text = render_children(child_nodes(tag), name, frozenset(child_tags))
+
+    converter = CONVERTERS.get(name)
+    if converter is not None:
+        return converter(tag, text, parent_tags, siblings, index)
+    if is_heading:
+        return convert_heading(tag, text, parent_tags, siblings, index)
+    return text
+
+
+def render_text(
+    text: str,
+    parent_tags: frozenset[str],
+    previous: ChandraNode | None,
+    following: ChandraNode | None,
+    parent_removes_inside: bool,
+) -> str:
+    if "pre" not in parent_tags:
+        text = NEWLINE_WHITESPACE_RE.sub("\n", text)
+        text = INLINE_WHITESPACE_RE.sub(" ", text)
+    if "_noformat" not in parent_tags:
+        text = text.replace("*", r"\*").replace("_", r"\_")
+    if removes_whitespace_outside(previous) or (parent_removes_inside and not previous):
+        text = text.lstrip(" \t\r\n")
+    if removes_whitespace_outside(following) or (
+        parent_removes_inside and not following
+    ):
+        text = text.rstrip()
+    return text
+
+
+def removes_whitespace_inside(name: str | None) -> bool:
+    if not name:
+        return False
+    return name in WHITESPACE_BLOCK_TAGS or HEADING_TAG_RE.match(name) is not None
+
+
+def removes_whitespace_outside(node: ChandraNode | None) -> bool:
+    if not isinstance(node, Tag):
+        return False
+    return node.name == "pre" or removes_whitespace_inside(node.name)
+
+
+def chomp(text: str) -> tuple[str, str, str]:
+    prefix = " " if text and text[0] == " " else ""
+    suffix = " " if text and text[-1] == " " else ""
+    return prefix, suffix, text.strip()
+
+
+def inline_converter(markup: str) -> Converter:
+    def convert(
+        tag: Tag,
+        text: str,
+        parent_tags: frozenset[str],
+        siblings: Sequence[ChandraNode],
+        index: int,
+    ) -> str:
+        if "_noformat" in parent_tags:
+            return text
+        prefix, suffix, text = chomp(text)
+        if not text:
+            return ""
+        return f"{prefix}{markup}{text}{markup}{suffix}"
+
+    return convert
+
+
+def convert_math(
+    tag: Tag,
+    text: str,
+    parent_tags: frozenset[str],
+    siblings: Sequence[ChandraNode],
+    index: int,
+) -> str:
+    math = text.strip()
+    if not math:
+        return ""
+    if tag.get("display") == "block":
+        return f"\n\n$$\n{math}\n$$\n\n"
+    return f" ${math}$ "
+
+
+def convert_a(
+    tag: Tag,
+    text: str,
+    parent_tags: frozenset[str],
+    siblings: Sequence[ChandraNode],
+    index: int,
+) -> str:
+    if "_noformat" in parent_tags:
+        return text
+    prefix, suffix, text = chomp(text)
+    if not text:
+        return ""
+    href = attribute_text(tag, "href")
+    title = attribute_text(tag, "title")
+    if text.replace(r"\_", "_") == href and not title:
+        return f"<{href}>"
+    title_part = ' "{}"'.format(title.replace('"', r"\"")) if title else ""
+    return f"{prefix}[{text}]({href}{title_part}){suffix}" if href else text
+
+
+def convert_blockquote(
+    tag: Tag,
+    text: str,
+    parent_tags: frozenset[str],
+    siblings: Sequence[ChandraNode],
+    index: int,
+) -> str:
+    text = text.strip(" \t\r\n")
+    if "_inline" in parent_tags:
+        return f" {text} "
+    if not text:
+        return "\n"
+    text = LINE_CONTENT_RE.sub(
+        lambda match: f"> {match.group(1)}" if match.group(1) else ">", text
+    )
+    return f"\n{text}\n\n"
+
+
+def convert_br(
+    tag: Tag,
+    text: str,
+    parent_tags: frozenset[str],
+    siblings: Sequence[ChandraNode],
+    index: int,
+) -> str:
+    if "_inline" in parent_tags:
+        return f"{text} " if text else " "
+    return f"  \n{text}"
+
+
+def convert_code(
+    tag: Tag,
+    text: str,
+    parent_tags: frozenset[str],
+    siblings: Sequence[ChandraNode],
+    index: int,
+) -> str:
+    if "_noformat" in parent_tags:
+        return text
+    prefix, suffix, text = chomp(text)
+    if not text:
+        return ""
+    max_backticks = max(
+        (len(run) for run in BACKTICK_RUN_RE.findall(text)),
+        default=0,
+    )
+    delimiter = "`" * (max_backticks + 1)
+    if max_backticks > 0:
+        text = f" {text} "
+    return f"{prefix}{delimiter}{text}{delimiter}{suffix}"
+
+
+def convert_div(
+    tag: Tag,
+    text: str,
+    parent_tags: frozenset[str],
+    siblings: Sequence[ChandraNode],
+    index: int,
+) -> str:
+    if "_inline" in parent_tags:
+        return f" {text.strip()} "
+    text = text.strip()
+    return f"\n\n{text}\n\n" if text else ""
+
+
+def convert_heading(
+    tag: Tag,
+    text: str,
+    parent_tags: frozenset[str],
+    siblings: Sequence[ChandraNode],
+    index: int,
+) -> str:
+    if "_inline" in parent_tags:
+        return text
+    match = HEADING_TAG_RE.match(tag.name)
+    assert match is not None
+    level = max(1, min(6, int(match.group(1))))
+    text = ALL_WHITESPACE_RE.sub(" ", text.strip())
+    return f"\n\n{'#' * level} {text}\n\n"
+
+
+def convert_hr(
+    tag: Tag,
+    text: str,
+    parent_tags: frozenset[str],
+    siblings: Sequence[ChandraNode],
+    index: int,
+) -> str:
+    return "\n\n---\n\n"
+
+
+def convert_img(
+    tag: Tag,
+    text: str,
+    parent_tags: frozenset[str],
+    siblings: Sequence[ChandraNode],
+    index: int,
+) -> str:
+    alt = attribute_text(tag, "alt")
+    src = attribute_text(tag, "src")
+    title = attribute_text(tag, "title")
+    if "_inline" in parent_tags:
+        return alt
+    title_part = ' "{}"'.format(title.replace('"', r"\"")) if title else ""
+    return f"![{alt}]({src}{title_part})"
+
+
+def convert_list(
+    tag: Tag,
+    text: str,
+    parent_tags: frozenset[str],
+    siblings: Sequence[ChandraNode],
+    index: int,
+) -> str:
+    if "li" in parent_tags:
+        return f"\n{text.rstrip()}"
+    following = next(
+        (
+            node
+            for node in siblings[index + 1 :]
+            if isinstance(node, Tag) or (type(node) is str and node.strip())
+        ),
+        None,
+    )
+    before_paragraph = following is not None and (
+        not isinstance(following, Tag) or following.name not in {"ul", "ol"}
+    )
+    return f"\n\n{text}\n" if before_paragraph else f"\n\n{text}"
+
+
+def convert_li(
+    tag: Tag,
+    text: str,
+    parent_tags: frozenset[str],
+    siblings: Sequence[ChandraNode],
+    index: int,
+) -> str:
+    text = text.strip()
+    if not text:
+        return "\n"
+
+    parent = tag.parent
+    if parent is not None and parent.name == "ol":
+        start = str(parent.get("start") or "")
+        first = int(start) if start.isnumeric() else 1
+        bullet = f"{first + len(tag.find_previous_siblings('li'))}. "
+    else:
+        bullet = "- "
+    indent = " " * len(bullet)
+    text = LINE_CONTENT_RE.sub(
+        lambda match: f"{indent}{match.group(1)}" if match.group(1) else "", text
+    )
+    return f"{bullet}{text[len(bullet) :]}\n"
+
+
+def convert_p(
+    tag: Tag,
+    text: str,
+    parent_tags: frozenset[str],
+    siblings: Sequence[ChandraNode],
+    index: int,
+) -> str:
+    text = text.strip(" \t\r\n")
+    if "_inline" in parent_tags:
+        return f" {text} "
+    return f"\n\n{text}\n\n" if text else ""
+
+
+def convert_pre(
+    tag: Tag,
+    text: str,
+    parent_tags: frozenset[str],
+    siblings: Sequence[ChandraNode],
+    index: int,
+) -> str:
+    if not text:
+        return ""
+    text = PRE_TRAILING_RE.sub("", PRE_LEADING_RE.sub("", text))
+    return f"\n\n```\n{text}\n```\n\n"
+
+
+def convert_caption(
+    tag: Tag,
+    text: str,
+    parent_tags: frozenset[str],
+    siblings: Sequence[ChandraNode],
+    index: int,
+) -> str:
+    return f"{text.strip()}\n\n"
+
+
+def convert_cell(
+    tag: Tag,
+    text: str,
+    parent_tags: frozenset[str],
+    siblings: Sequence[ChandraNode],
+    index: int,
+) -> str:
+    text = text.strip().replace("\n", " ")
+    return f" {text}{' |' * colspan(tag)}"
+
+
+def convert_tr(
+    tag: Tag,
+    text: str,
+    parent_tags: frozenset[str],
+    siblings: Sequence[ChandraNode],
+    index: int,
+) -> str:
+    # Rows normally sit inside a table, which is kept as HTML; this only
+    # handles rows the model left outside one.
+    cells = tag.find_all(["td", "th"])
+    parent = tag.parent
+    parent_name = parent.name if parent is not None else None
+    grandparent = parent.parent if parent is not None else None
+    is_first_row = not any(isinstance(node, Tag) for node in siblings[:index])
+    is_head_row = all(cell.name == "th" for cell in cells) or (
+        parent is not None
+        and parent_name == "thead"
+        and len(parent.find_all("tr")) == 1
+    )
+    is_head_row_missing = is_first_row and (
+        parent_name != "tbody"
+        or grandparent is None
+        or len(grandparent.find_all(["thead"])) < 1
+    )
+    columns = sum(colspan(cell) for cell in cells)
+    overline = ""
+    underline = ""
+    if is_head_row and is_first_row:
+        underline = f"| {' | '.join(['---'] * columns)} |\n"
+    elif is_head_row_missing or (
+        is_first_row
+        and (
+            parent_name == "table"
+            or (
+                parent is not None
+                and parent_name == "tbody"
+                and not parent.find_previous_sibling()
+            )
+        )
+    ):
+        overline = (
+            f"| {' | '.join([''] * columns)} |\n| {' | '.join(['---'] * columns)} |\n"
+        )
+    return f"{overline}|{text}\n{underline}"
+
+
+def attribute_text(tag: Tag, name: str) -> str:
+    """An attribute as text; bs4 gives multi-valued ones such as class as lists."""
+    value = tag.get(name)
+    if isinstance(value, list):
+        return " ".join(value)
+    return value or ""
+
+
+def colspan(tag: Tag) -> int:
+    value = tag.attrs.get("colspan")
+    if isinstance(value, str) and value.isdigit():
+        return max(1, min(1000, int(value)))
+    return 1
+
+
+CONVERTERS: dict[str, Converter] = {
+    "a": convert_a,
+    "b": inline_converter("**"),
+    "strong": inline_converter("**"),
+    "i": inline_converter("*"),
+    "em": inline_converter("*"),
+    "del": inline_converter("~~"),
+    "s": inline_converter("~~"),
+    "sub": inline_converter(""),
+    "sup": inline_converter(""),
+    "blockquote": convert_blockquote,
+    "br": convert_br,
+    "caption": convert_caption,
+    "code": convert_code,
+    "kbd": convert_code,
+    "samp": convert_code,
+    "div": convert_div,
+    "hr": convert_hr,
+    "img": convert_img,
+    "li": convert_li,
+    "math": convert_math,
+    "ol": convert_list,
+    "ul": convert_list,
+    "p": convert_p,
+    "pre": convert_pre,
+    "td": convert_cell,
+    "th": convert_cell,
+    "tr": convert_tr,
+}
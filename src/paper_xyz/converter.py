@@ -1,30 +1,51 @@
 from __future__ import annotations
 
 import asyncio
+import contextlib
+import dataclasses
 import logging
+import math
 import re
+import time
+from collections.abc import Callable, Sequence
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
 from dataclasses import dataclass
 from pathlib import Path
+from typing import Literal
 
 import httpx
 
 from paper_xyz.api import (
     ChatRequestConfig,
+    ChatStreamInterruptedError,
     NonRetryableChatResponseError,
     request_chat_completion,
+    stream_chat_completion,
 )
-from paper_xyz.images import extract_document_images
+from paper_xyz.events import ConversionObserver
+from paper_xyz.images import DocumentImageExtractor
 from paper_xyz.model_services import get_model_service_profile
-from paper_xyz.parsing import parse_page_response
-from paper_xyz.pdf import render_page_image
+from paper_xyz.parsing import PageParser, svg_page_parser
+from paper_xyz.pdf import estimate_render_bytes, get_page_sizes, render_page_image
+from paper_xyz.raw_store import RawResponseSpillFile, raw_response_sidecar_path
+from paper_xyz.scheduling import (
+    WeightedSemaphore,
+    estimate_request_tokens,
+    weighted_permit,
+)
 from paper_xyz.types import (
+    PAGE_TIMING_STAGES,
     ImageExtractionConfig,
     ImageRenderProfile,
     PageMetadata,
     PageResult,
-    ResponseParser,
+    PageTimings,
+    ParseExecutor,
+    RawResponsePolicy,
     TokenUsage,
+    tokens_per_second,
 )
+from paper_xyz.writer import OrderedMarkdownWriter
 
 logger = logging.getLogger(__name__)
 
@@ -44,11 +65,34 @@ class ConversionConfig:
     allow_page_failures: bool = True
     include_page_numbers: bool = False
     image_extraction: ImageExtractionConfig = ImageExtractionConfig()
+    image_workers: int = 2
+    raw_response_policy: RawResponsePolicy = "keep"
+    memory_budget_bytes: int | None = None
+    token_budget: int | None = None
+    parse_executor: ParseExecutor = "inline"
+    parse_workers: int | None = None
+    stream: bool = False
+    svg_max_bytes: int | None = None
+    svg_minify_paths: bool = False
 
     def __post_init__(self) -> None:
         request_config = self.to_chat_request_config()
         if self.concurrency < 1:
             raise ValueError("concurrency must be >= 1")
+        if self.memory_budget_bytes is not None and self.memory_budget_bytes < 1:
+            raise ValueError("memory_budget_bytes must be >= 1")
+        if self.token_budget is not None and self.token_budget < 1:
+            raise ValueError("token_budget must be >= 1")
+        if self.parse_executor not in {"inline", "thread", "process"}:
+            raise ValueError("parse_executor must be one of inline, thread, or process")
+        if self.parse_workers is not None and self.parse_workers < 1:
+            raise ValueError("parse_workers must be >= 1")
+        if self.image_workers < 1:
+            raise ValueError("image_workers must be >= 1")
+        if self.svg_max_bytes is not None and self.svg_max_bytes < 1:
+            raise ValueError("svg_max_bytes must be >= 1")
+        if self.raw_response_policy not in {"keep", "drop", "spill"}:
+            raise ValueError("raw_response_policy must be one of keep, drop, or spill")
         if self.max_page_retries < 1:
             raise ValueError("max_page_retries must be >= 1")
         if request_config.max_tokens < 1:
@@ -71,15 +115,31 @@ class ConversionConfig:
             image_first=profile.image_first,
             text_prefix=profile.text_prefix,
             accepted_finish_reasons=profile.accepted_finish_reasons,
+            stream=self.stream,
         )
 
-    def response_parser(self) -> ResponseParser:
-        return get_model_service_profile(self.model_service).response_parser
+    def response_parser(self) -> PageParser:
+        parser = get_model_service_profile(self.model_service).response_parser
+        if parser.name == "svg":
+            return svg_page_parser(
+                max_bytes=self.svg_max_bytes, minify_paths=self.svg_minify_paths
+            )
+        return parser
 
     def image_render_profile(self) -> ImageRenderProfile:
         return get_model_service_profile(self.model_service).render_profile()
 
 
+@dataclass(frozen=True, slots=True)
+class StageTimingStats:
+    stage: str
+    total_seconds: float
+    p50_seconds: float
+    p90_seconds: float
+    p99_seconds: float
+    max_seconds: float
+
+
 @dataclass(frozen=True, slots=True)
 class ConversionStats:
     pages: int
@@ -88,11 +148,31 @@ class ConversionStats:
     prompt_tokens: int
     completion_tokens: int
     extracted_images: int = 0
+    stage_timings: tuple[StageTimingStats, ...] = ()
+    cached_prompt_tokens: int = 0
+    prefill_tokens: int = 0
+    prefill_seconds: float = 0.0
+    decode_tokens: int = 0
+    decode_seconds: float = 0.0
+
+    @property
+    def prefill_tokens_per_second(self) -> float:
+        return tokens_per_second(self.prefill_tokens, self.prefill_seconds)
+
+    @property
+    def decode_tokens_per_second(self) -> float:
+        return tokens_per_second(self.decode_tokens, self.decode_seconds)
 
 
 class PdfToMarkdownConverter:
-    def __init__(self, config: ConversionConfig) -> None:
+    def __init__(
+        self,
+        config: ConversionConfig,
+        *,
+        observers: Sequence[ConversionObserver] = (),
+    ) -> None:
         self.config = config
+        self.observers = tuple(observers)
 
     async def convert(
         self,
@@ -102,6 +182,109 @@ class PdfToMarkdownConverter:
         end_page: int,
         output_path: str | Path | None = None,
     ) -> tuple[str, list[PageResult]]:
+        page_results = await self.convert_pages(
+            pdf_path,
+            start_page=start_page,
+            end_page=end_page,
+            output_path=output_path,
+        )
+        return (
+            build_document_markdown(
+                page_results,
+                include_page_numbers=self.config.include_page_numbers,
+                resolve_images=self.config.image_extraction.enabled,
+            ),
+            page_results,
+        )
+
+    async def convert_to_file(
+        self,
+        pdf_path: str | Path,
+        *,
+        start_page: int,
+        end_page: int,
+        output_path: str | Path,
+    ) -> tuple[int, list[PageResult]]:
+        """Write the document Markdown to `output_path` as pages finish.
+
+        Each page's Markdown is dropped from its result once handed to the
+        writer, so only the out-of-order window is held in memory. Returns
+        the number of characters written and the results, whose `markdown`
+        is empty.
+        """
+        with OrderedMarkdownWriter(output_path, first_page_index=start_page) as writer:
+
+            def write_page(page_result: PageResult) -> None:
+                writer.add(
+                    page_result.page_index,
+                    document_page_markdown(
+                        page_result,
+                        include_page_numbers=self.config.include_page_numbers,
+                        resolve_images=self.config.image_extraction.enabled,
+                    ),
+                )
+                page_result.markdown = ""
+
+            page_results = await self.convert_pages(
+                pdf_path,
+                start_page=start_page,
+                end_page=end_page,
+                output_path=output_path,
+                on_page=write_page,
+            )
+        return writer.chars, page_results
+
+    async def convert_pages(
+        self,
+        pdf_path: str | Path,
+        *,
+        start_page: int,
+        end_page: int,
+        output_path: str | Path | None = None,
+        on_page: Callable[[PageResult], None] | None = None,
+    ) -> list[PageResult]:
+        for observer in self.observers:
+            observer.conversion_started(
+                pdf_path=Path(pdf_path),
+                start_page=start_page,
+                end_page=end_page,
+                time=time.perf_counter(),
+            )
+        try:
+            page_results = await self._convert_pages(
+                pdf_path,
+                start_page=start_page,
+                end_page=end_page,
+                output_path=output_path,
+                on_page=on_page,
+            )
+        except BaseException as exc:
+            for observer in self.observers:
+                observer.conversion_finished(
+                    pdf_path=Path(pdf_path),
+                    page_results=(),
+                    error=exc,
+                    time=time.perf_counter(),
+                )
+            raise
+        for observer in self.observers:
+            observer.conversion_finished(
+                pdf_path=Path(pdf_path),
+                page_results=page_results,
+                error=None,
+                time=time.perf_counter(),
+            )
+        return page_results
+
+    async def _convert_pages(
+        self,
+        pdf_path: str | Path,
+        *,
+        start_page: int,
+        end_page: int,
+        output_path: str | Path | None,
+        on_page: Callable[[PageResult], None] | None,
+    ) -> list[PageResult]:
         if self.config.image_extraction.enabled:
             if output_path is None:
                 raise ValueError(
@@ -109,8 +292,32 @@ class PdfToMarkdownConverter:
                 )
             if Path(output_path).suffix.lower() != ".md":
                 raise ValueError("output_path must end with .md")
+        if self.config.raw_response_policy == "spill" and output_path is None:
+            raise ValueError(
+                "output_path is required when raw_response_policy is spill"
+            )
 
-        semaphore = asyncio.Semaphore(self.config.concurrency)
+        token_budget = self.config.token_budget
+        admission = WeightedSemaphore(
+            token_budget or self.config.concurrency,
+            max_holders=self.config.concurrency,
+        )
+        memory_budget = None
+        if self.config.memory_budget_bytes is not None:
+            memory_budget = WeightedSemaphore(self.config.memory_budget_bytes)
+        page_sizes: dict[int, tuple[float, float]] = {}
+        if memory_budget is not None or token_budget is not None:
+            page_sizes = await asyncio.to_thread(
+                get_page_sizes, pdf_path, start_page=start_page, end_page=end_page
+            )
+        render_profile = self.config.image_render_profile()
+        request_config = self._request_config()
+        if token_budget is not None and request_config.max_tokens >= token_budget:
+            logger.warning(
+                "token_budget=%s does not exceed max_tokens=%s, pages will run one at a time",
+                token_budget,
+                request_config.max_tokens,
+            )
         headers = (
             {"Authorization": f"Bearer {self.config.api_key}"}
             if self.config.api_key
@@ -120,16 +327,117 @@ class PdfToMarkdownConverter:
             max_connections=self.config.concurrency,
             max_keepalive_connections=self.config.concurrency,
         )
-
-        async with httpx.AsyncClient(
-            headers=headers,
-            limits=limits,
-            timeout=httpx.Timeout(self.config.timeout),
-        ) as client:
+        async with contextlib.AsyncExitStack() as stack:
+            client = await stack.enter_async_context(
+                httpx.AsyncClient(
+                    headers=headers,
+                    limits=limits,
+                    timeout=httpx.Timeout(self.config.timeout),
+                )
+            )
+            parse_pool = self._parse_pool()
+            if parse_pool is not None:
+                stack.enter_context(parse_pool)
+            image_extractor = None
+            if self.config.image_extraction.enabled:
+                assert output_path is not None
+                image_extractor = stack.enter_context(
+                    DocumentImageExtractor(
+                        pdf_path,
+                        output_path,
+                        config=self.config.image_extraction,
+                        max_workers=self.config.image_workers,
+                    )
+                )
+            spill_file = None
+            if self.config.raw_response_policy == "spill":
+                assert output_path is not None
+                spill_file = stack.enter_context(
+                    RawResponseSpillFile(raw_response_sidecar_path(output_path))
+                )
+                spill_file.append(
+                    {
+                        "pdf_path": str(Path(pdf_path).resolve()),
+                        "start_page": start_page,
+                        "end_page": end_page,
+                        "model_service": self.config.model_service,
+                        "response_parser": self.config.response_parser().name,
+                        "svg_max_bytes": self.config.svg_max_bytes,
+                        "svg_minify_paths": self.config.svg_minify_paths,
+                        "include_page_numbers": self.config.include_page_numbers,
+                        "image_extraction": dataclasses.asdict(
+                            self.config.image_extraction
+                        ),
+                    }
+                )
 
             async def run_page(page_index: int) -> PageResult:
-                async with semaphore:
-                    return await self.convert_page(client, Path(pdf_path), page_index)
+                for observer in self.observers:
+                    observer.page_queued(
+                        page_index=page_index, time=time.perf_counter()
+                    )
+                admission_weight = 1
+                if token_budget is not None:
+                    admission_weight = estimate_request_tokens(
+                        *page_sizes[page_index], render_profile, request_config
+                    )
+                memory_weight = 0
+                if memory_budget is not None:
+                    memory_weight = memory_budget.clamp(
+                        estimate_render_bytes(*page_sizes[page_index], render_profile)
+                    )
+                timings = PageTimings()
+                # Images are extracted on their own pool while the page waits
+                # for admission and for the model. Lazy extraction has to wait
+                # for the parsed page instead.
+                image_task = (
+                    asyncio.ensure_future(
+                        image_extractor.extract(page_index, timings=timings)
+                    )
+                    if image_extractor is not None
+                    and not self.config.image_extraction.lazy
+                    else None
+                )
+                try:
+                    wait_started = time.perf_counter()
+                    async with admission.hold(admission_weight):
+                        timings.wait_seconds += time.perf_counter() - wait_started
+                        page_result = await self.convert_page(
+                            client,
+                            Path(pdf_path),
+                            page_index,
+                            memory_budget=memory_budget,
+                            memory_weight=memory_weight,
+                            parse_pool=parse_pool,
+                            timings=timings,
+                        )
+                    if image_task is not None:
+                        page_result.extracted_images = await image_task
+                    elif image_extractor is not None:
+                        page_result.extracted_images = await image_extractor.extract(
+                            page_index,
+                            wanted=page_wants_images(page_result),
+                            timings=timings,
+                        )
+                except BaseException:
+                    if image_task is not None:
+                        image_task.cancel()
+                    raise
+                if image_extractor is not None:
+                    for observer in self.observers:
+                        observer.images_extracted(
+                            page_index=page_index,
+                            images=page_result.extracted_images,
+                            time=time.perf_counter(),
+                        )
+                self._retain_raw_response(page_result, spill_file)
+                for observer in self.observers:
+                    observer.page_finished(
+                        page_result=page_result, time=time.perf_counter()
+                    )
+                if on_page is not None:
+                    on_page(page_result)
+                return page_result
 
             page_results = await asyncio.gather(
                 *[
@@ -138,37 +446,27 @@ class PdfToMarkdownConverter:
                 ]
             )
 
-        if self.config.image_extraction.enabled:
-            assert output_path is not None
-            images_by_page = await asyncio.to_thread(
-                extract_document_images,
-                pdf_path,
-                output_path,
-                start_page=start_page,
-                end_page=end_page,
-                config=self.config.image_extraction,
-            )
-            for page_result in page_results:
-                page_result.extracted_images = images_by_page.get(
-                    page_result.page_index, ()
-                )
-
-        return (
-            build_document_markdown(
-                page_results,
-                include_page_numbers=self.config.include_page_numbers,
-                resolve_images=self.config.image_extraction.enabled,
-            ),
-            page_results,
-        )
+        return page_results
 
     async def convert_page(
         self,
         client: httpx.AsyncClient,
         pdf_path: Path,
         page_index: int,
+        *,
+        memory_budget: WeightedSemaphore | None = None,
+        memory_weight: int = 0,
+        parse_pool: Executor | None = None,
+        timings: PageTimings | None = None,
     ) -> PageResult:
+        """Convert one page, retrying as configured.
+
+        Stage timings are added to `timings` when given, and the returned
+        result carries them.
+        """
+        timings = timings if timings is not None else PageTimings()
         last_result: PageResult | None = None
+        partial_result: PageResult | None = None
         last_error: Exception | None = None
         last_image_width = 0
         last_image_height = 0
@@ -177,35 +475,115 @@ class PdfToMarkdownConverter:
         cumulative_rotation = 0
         request_config = self._request_config()
         response_parser = self.config.response_parser()
+        observers = self.observers
 
         for attempt in range(1, self.config.max_page_retries + 1):
             attempts_used = attempt
+            retry_reason = ""
+            response_stream = (
+                response_parser.stream() if request_config.stream else None
+            )
             try:
-                rendered_page = await asyncio.to_thread(
-                    render_page_image,
-                    pdf_path,
-                    page_index,
-                    profile=self.config.image_render_profile(),
-                    rotation=cumulative_rotation,
-                )
-                last_image_width = rendered_page.width
-                last_image_height = rendered_page.height
-                logger.info(
-                    "page=%s attempt=%s requesting model=%s image=%sx%s mime=%s rotation=%s",
+                # The permit covers the rendered page until its request is
+                # done, so the encoded image is dropped before it is released.
+                wait_started = time.perf_counter()
+                async with weighted_permit(memory_budget, memory_weight):
+                    timings.wait_seconds += time.perf_counter() - wait_started
+                    for observer in observers:
+                        observer.render_started(
+                            page_index=page_index,
+                            attempt=attempt,
+                            rotation=cumulative_rotation,
+                            time=time.perf_counter(),
+                        )
+                    rendered_page = await asyncio.to_thread(
+                        render_page_image,
+                        pdf_path,
+                        page_index,
+                        profile=self.config.image_render_profile(),
+                        rotation=cumulative_rotation,
+                        timings=timings,
+                    )
+                    for observer in observers:
+                        observer.render_finished(
+                            page_index=page_index,
+                            attempt=attempt,
+                            page=rendered_page,
+                            time=time.perf_counter(),
+                        )
+                    last_image_width = rendered_page.width
+                    last_image_height = rendered_page.height
+                    logger.info(
+                        "page=%s attempt=%s requesting model=%s image=%sx%s mime=%s rotation=%s",
+                        page_index,
+                        attempt,
+                        request_config.model,
+                        rendered_page.width,
+                        rendered_page.height,
+                        rendered_page.image_mime_type,
+                        cumulative_rotation,
+                    )
+                    on_request_sent = on_first_token = None
+                    if observers:
+                        on_request_sent = attempt_notifier(
+                            observers, "request_sent", page_index, attempt
+                        )
+                        on_first_token = attempt_notifier(
+                            observers, "first_token", page_index, attempt
+                        )
+                    if request_config.stream:
+                        raw_response, usage = await stream_chat_completion(
+                            client,
+                            rendered_page,
+                            request_config,
+                            on_delta=(
+                                response_stream.feed if response_stream else None
+                            ),
+                            on_request_sent=on_request_sent,
+                            on_first_token=on_first_token,
+                            timings=timings,
+                        )
+                    else:
+                        raw_response, usage = await request_chat_completion(
+                            client,
+                            rendered_page,
+                            request_config,
+                            on_request_sent=on_request_sent,
+                            on_first_token=on_first_token,
+                            timings=timings,
+                        )
+                    del rendered_page
+                for observer in observers:
+                    observer.response_received(
+                        page_index=page_index,
+                        attempt=attempt,
+                        usage=usage,
+                        time=time.perf_counter(),
+                    )
+                parse_started = time.perf_counter()
+                # A streamed response is already parsed; only fall back to a
+                # full parse when the stream parser could not make sense of it.
+                parsed = response_stream.finish() if response_stream else None
+                if parsed is None:
+                    parsed = await run_parser(parse_pool, raw_response, response_parser)
+                metadata, markdown = parsed
+                parse_seconds = time.perf_counter() - parse_started
+                timings.parse_seconds += parse_seconds
+                for observer in observers:
+                    observer.parse_finished(
+                        page_index=page_index,
+                        attempt=attempt,
+                        metadata=metadata,
+                        seconds=parse_seconds,
+                        time=time.perf_counter(),
+                    )
+                logger.debug(
+                    "page=%s attempt=%s parser=%s parse_time=%.4fs output_chars=%s",
                     page_index,
                     attempt,
-                    request_config.model,
-                    rendered_page.width,
-                    rendered_page.height,
-                    rendered_page.image_mime_type,
-                    cumulative_rotation,
-                )
-                raw_response, usage = await request_chat_completion(
-                    client, rendered_page, request_config
-                )
-                metadata, markdown = parse_page_response(
-                    raw_response,
-                    response_parser=response_parser,
+                    response_parser.name,
+                    parse_seconds,
+                    len(raw_response),
                 )
                 result = PageResult(
                     page_index=page_index,
@@ -215,17 +593,19 @@ class PdfToMarkdownConverter:
                     usage=usage,
                     attempts=attempt,
                     applied_rotation=cumulative_rotation,
-                    image_width=rendered_page.width,
-                    image_height=rendered_page.height,
+                    image_width=last_image_width,
+                    image_height=last_image_height,
+                    timings=timings,
                 )
                 last_result = result
 
                 if metadata.is_rotation_valid:
                     logger.info(
-                        "page=%s attempts=%s prompt_tokens=%s completion_tokens=%s rotation=%s",
+                        "page=%s attempts=%s prompt_tokens=%s cached_prompt_tokens=%s completion_tokens=%s rotation=%s",
                         page_index,
                         attempt,
                         usage.prompt_tokens,
+                        usage.cached_prompt_tokens,
                         usage.completion_tokens,
                         cumulative_rotation,
                     )
@@ -233,6 +613,7 @@ class PdfToMarkdownConverter:
 
                 correction = metadata.rotation_correction % 360
                 cumulative_rotation = (cumulative_rotation + correction) % 360
+                retry_reason = f"rotation correction {correction}"
                 logger.info(
                     "page=%s attempt=%s requested rotation retry, correction=%s next_rotation=%s",
                     page_index,
@@ -240,6 +621,14 @@ class PdfToMarkdownConverter:
                     correction,
                     cumulative_rotation,
                 )
+                for observer in observers:
+                    observer.rotation_retry(
+                        page_index=page_index,
+                        attempt=attempt,
+                        correction=correction,
+                        next_rotation=cumulative_rotation,
+                        time=time.perf_counter(),
+                    )
             except NonRetryableChatResponseError as exc:
                 last_error = exc
                 last_usage = exc.usage
@@ -250,8 +639,44 @@ class PdfToMarkdownConverter:
                     format_exception(exc),
                 )
                 break
+            except ChatStreamInterruptedError as exc:
+                last_error = exc
+                last_usage = exc.usage
+                retry_reason = format_exception(exc)
+                partial = None
+                if response_stream is not None:
+                    # Parsed as a whole when the stream cannot vouch for its
+                    # cells, as reparse would parse the spilled text.
+                    partial = response_stream.finish() or await run_parser(
+                        parse_pool, exc.text, response_parser
+                    )
+                logger.warning(
+                    "page=%s attempt=%s failed: %s partial_chars=%s",
+                    page_index,
+                    attempt,
+                    format_exception(exc),
+                    len(partial[1]) if partial else 0,
+                )
+                if partial is not None and (
+                    partial_result is None
+                    or len(exc.text) > len(partial_result.raw_response)
+                ):
+                    partial_result = build_partial_page_result(
+                        page_index=page_index,
+                        metadata=partial[0],
+                        markdown=partial[1],
+                        raw_response=exc.text,
+                        attempts=attempt,
+                        applied_rotation=cumulative_rotation,
+                        image_width=last_image_width,
+                        image_height=last_image_height,
+                        usage=exc.usage,
+                        error=format_exception(exc),
+                        timings=timings,
+                    )
             except (httpx.HTTPError, ValueError) as exc:
                 last_error = exc
+                retry_reason = format_exception(exc)
                 logger.warning(
                     "page=%s attempt=%s failed: %s",
                     page_index,
@@ -260,7 +685,16 @@ class PdfToMarkdownConverter:
                 )
 
             if attempt < self.config.max_page_retries:
-                await asyncio.sleep(min(2 ** (attempt - 1), 8))
+                delay = min(2 ** (attempt - 1), 8)
+                for observer in observers:
+                    observer.retry_scheduled(
+                        page_index=page_index,
+                        attempt=attempt,
+                        delay=delay,
+                        reason=retry_reason,
+                        time=time.perf_counter(),
+                    )
+                await asyncio.sleep(delay)
 
         if last_result is not None:
             logger.warning(
@@ -269,8 +703,25 @@ class PdfToMarkdownConverter:
             )
             return last_result
 
+        error = format_exception(last_error)
+        for observer in observers:
+            observer.page_failed(
+                page_index=page_index,
+                attempts=attempts_used,
+                error=error,
+                time=time.perf_counter(),
+            )
+
+        if self.config.allow_page_failures and partial_result is not None:
+            logger.error(
+                "page=%s attempts=%s keeping cells received before the stream broke: %s",
+                page_index,
+                attempts_used,
+                partial_result.error,
+            )
+            return partial_result
+
         if self.config.allow_page_failures:
-            error = format_exception(last_error)
             logger.error(
                 "page=%s attempts=%s keeping failed-page placeholder: %s",
                 page_index,
@@ -285,15 +736,81 @@ class PdfToMarkdownConverter:
                 image_height=last_image_height,
                 usage=last_usage,
                 error=error,
+                timings=timings,
             )
 
-        raise RuntimeError(
-            f"conversion failed for page {page_index}: {format_exception(last_error)}"
-        )
+        raise RuntimeError(f"conversion failed for page {page_index}: {error}")
 
     def _request_config(self) -> ChatRequestConfig:
         return self.config.to_chat_request_config()
 
+    def _parse_pool(self) -> Executor | None:
+        if self.config.parse_executor == "thread":
+            return ThreadPoolExecutor(
+                max_workers=self.config.parse_workers,
+                thread_name_prefix="paper_xyz-parse",
+            )
+        if self.config.parse_executor == "process":
+            return ProcessPoolExecutor(max_workers=self.config.parse_workers)
+        return None
+
+    def _retain_raw_response(
+        self,
+        page_result: PageResult,
+        spill_file: RawResponseSpillFile | None,
+    ) -> None:
+        policy = self.config.raw_response_policy
+        if policy == "keep":
+            return
+        if policy == "spill":
+            assert spill_file is not None
+            page_result.raw_response_ref = spill_file.append(
+                {
+                    "page_index": page_result.page_index,
+                    "model_service": self.config.model_service,
+                    "response_parser": self.config.response_parser().name,
+                    "attempts": page_result.attempts,
+                    "applied_rotation": page_result.applied_rotation,
+                    "image_width": page_result.image_width,
+                    "image_height": page_result.image_height,
+                    "prompt_tokens": page_result.usage.prompt_tokens,
+                    "cached_prompt_tokens": page_result.usage.cached_prompt_tokens,
+                    "completion_tokens": page_result.usage.completion_tokens,
+                    "error": page_result.error,
+                    "raw_response": page_result.raw_response,
+                }
+            )
+        page_result.raw_response = ""
+
+
+def attempt_notifier(
+    observers: Sequence[ConversionObserver],
+    event: Literal["request_sent", "first_token"],
+    page_index: int,
+    attempt: int,
+) -> Callable[[], None]:
+    def notify() -> None:
+        for observer in observers:
+            getattr(observer, event)(
+                page_index=page_index, attempt=attempt, time=time.perf_counter()
+            )
+
+    return notify
+
+
+async def run_parser(
+    parse_pool: Executor | None,
+    raw_response: str,
+    response_parser: PageParser,
+) -> tuple[PageMetadata, str]:
+    if parse_pool is None:
+        return response_parser.parse(raw_response)
+    # The parser pickles by reference to its module-level functions, so
+    # configured parsers such as a capped svg parser reach process workers.
+    return await asyncio.get_running_loop().run_in_executor(
+        parse_pool, response_parser.parse, raw_response
+    )
+
 
 MODEL_IMAGE_PLACEHOLDER_RE = re.compile(r"!\[(?P<alt>[^\]]*)\]\((?P<target>[^)]*)\)")
 
@@ -306,15 +823,11 @@ def build_document_markdown(
 ) -> str:
     chunks = []
     for page in sorted(page_results, key=lambda result: result.page_index):
-        page_markdown = resolve_page_images(page) if resolve_images else page.markdown
-        if include_page_numbers:
-            page_marker = (
-                "<!-- "
-                f"paper_xyz: page_index={page.page_index} "
-                f"pdf_page={page.page_index + 1}"
-                " -->"
-            )
-            page_markdown = f"{page_marker}\n\n{page_markdown}".rstrip()
+        page_markdown = document_page_markdown(
+            page,
+            include_page_numbers=include_page_numbers,
+            resolve_images=resolve_images,
+        )
         if page_markdown.strip():
             chunks.append(page_markdown)
 
@@ -322,6 +835,24 @@ def build_document_markdown(
     return f"{markdown}\n" if markdown else ""
 
 
+def document_page_markdown(
+    page: PageResult,
+    *,
+    include_page_numbers: bool = False,
+    resolve_images: bool = False,
+) -> str:
+    page_markdown = resolve_page_images(page) if resolve_images else page.markdown
+    if include_page_numbers:
+        page_marker = (
+            "<!-- "
+            f"paper_xyz: page_index={page.page_index} "
+            f"pdf_page={page.page_index + 1}"
+            " -->"
+        )
+        page_markdown = f"{page_marker}\n\n{page_markdown}".rstrip()
+    return page_markdown
+
+
 def resolve_page_images(page: PageResult) -> str:
     markdown = page.markdown.rstrip()
     images = list(page.extracted_images)
@@ -365,6 +896,14 @@ def remove_model_image_placeholders(markdown: str) -> str:
     return MODEL_IMAGE_PLACEHOLDER_RE.sub(remove_placeholder, markdown).rstrip()
 
 
+def page_wants_images(page: PageResult) -> bool:
+    """Whether the parsed page has a model image placeholder or is a diagram."""
+    return page.metadata.is_diagram or any(
+        is_model_image_placeholder(match.group("target"))
+        for match in MODEL_IMAGE_PLACEHOLDER_RE.finditer(page.markdown)
+    )
+
+
 def is_model_image_placeholder(target: str) -> bool:
     normalized = target.strip()
     return (
@@ -390,6 +929,7 @@ def build_failed_page_result(
     image_height: int,
     usage: TokenUsage,
     error: str,
+    timings: PageTimings | None = None,
 ) -> PageResult:
     return PageResult(
         page_index=page_index,
@@ -412,6 +952,37 @@ def build_failed_page_result(
         image_width=image_width,
         image_height=image_height,
         error=error,
+        timings=timings or PageTimings(),
+    )
+
+
+def build_partial_page_result(
+    *,
+    page_index: int,
+    metadata: PageMetadata,
+    markdown: str,
+    raw_response: str,
+    attempts: int,
+    applied_rotation: int,
+    image_width: int,
+    image_height: int,
+    usage: TokenUsage,
+    error: str,
+    timings: PageTimings | None = None,
+) -> PageResult:
+    marker = failed_page_markdown(page_index=page_index, attempts=attempts, error=error)
+    return PageResult(
+        page_index=page_index,
+        metadata=metadata,
+        markdown=f"{marker}\n\n{markdown}".rstrip(),
+        raw_response=raw_response,
+        usage=usage,
+        attempts=attempts,
+        applied_rotation=applied_rotation,
+        image_width=image_width,
+        image_height=image_height,
+        error=error,
+        timings=timings or PageTimings(),
     )
 
 
@@ -433,11 +1004,49 @@ def format_exception(exc: Exception | None) -> str:
 
 
 def summarize_results(markdown: str, page_results: list[PageResult]) -> ConversionStats:
+    return summarize_page_results(page_results, chars=len(markdown))
+
+
+def summarize_page_results(
+    page_results: list[PageResult], *, chars: int
+) -> ConversionStats:
     return ConversionStats(
         pages=len(page_results),
         failed_pages=sum(1 for page in page_results if page.error is not None),
-        chars=len(markdown),
+        chars=chars,
         prompt_tokens=sum(page.usage.prompt_tokens for page in page_results),
         completion_tokens=sum(page.usage.completion_tokens for page in page_results),
         extracted_images=sum(len(page.extracted_images) for page in page_results),
+        cached_prompt_tokens=sum(
+            page.usage.cached_prompt_tokens for page in page_results
+        ),
+        prefill_tokens=sum(page.usage.prefill_tokens for page in page_results),
+        prefill_seconds=sum(page.usage.prefill_seconds for page in page_results),
+        decode_tokens=sum(page.usage.decode_tokens for page in page_results),
+        decode_seconds=sum(page.usage.decode_seconds for page in page_results),
+        stage_timings=tuple(
+            summarize_stage_timings(
+                stage, [page.timings.seconds(stage) for page in page_results]
+            )
+            for stage in PAGE_TIMING_STAGES
+        ),
     )
+
+
+def summarize_stage_timings(stage: str, seconds: list[float]) -> StageTimingStats:
+    ordered = sorted(seconds)
+    return StageTimingStats(
+        stage=stage,
+        total_seconds=sum(ordered),
+        p50_seconds=nearest_rank_percentile(ordered, 50),
+        p90_seconds=nearest_rank_percentile(ordered, 90),
+        p99_seconds=nearest_rank_percentile(ordered, 99),
+        max_seconds=ordered[-1] if ordered else 0.0,
+    )
+
+
+def nearest_rank_percentile(ordered: list[float], percent: float) -> float:
+    if not ordered:
+        return 0.0
+    rank = math.ceil(percent / 100 * len(ordered))
+    return ordered[max(rank, 1) - 1]
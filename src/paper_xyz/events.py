@@ -0,0 +1,110 @@
+from __future__ import annotations
+
+from collections.abc import Sequence
+from pathlib import Path
+
+from paper_xyz.types import (
+    ExtractedImage,
+    PageMetadata,
+    PageResult,
+    RenderedPage,
+    TokenUsage,
+)
+
+
+class ConversionObserver:
+    """Lifecycle callbacks of a `PdfToMarkdownConverter` run.
+
+    Every method is a no-op; subclass and override the ones you need, and
+    pass instances as `observers`. Callbacks run on the event loop thread
+    in the order observers were given, so they should return quickly. An
+    exception raised by a callback propagates into the conversion.
+
+    `attempt` counts from 1 for each page. Times are `time.perf_counter`
+    readings taken when the event happened.
+    """
+
+    def conversion_started(
+        self, *, pdf_path: Path, start_page: int, end_page: int, time: float
+    ) -> None:
+        pass
+
+    def conversion_finished(
+        self,
+        *,
+        pdf_path: Path,
+        page_results: Sequence[PageResult],
+        error: BaseException | None,
+        time: float,
+    ) -> None:
+        """Called once per run; `error` is set when the run raised."""
+
+    def page_queued(self, *, page_index: int, time: float) -> None:
+        pass
+
+    def render_started(
+        self, *, page_index: int, attempt: int, rotation: int, time: float
+    ) -> None:
+        pass
+
+    def render_finished(
+        self, *, page_index: int, attempt: int, page: RenderedPage, time: float
+    ) -> None:
+        pass
+
+    def request_sent(self, *, page_index: int, attempt: int, time: float) -> None:
+        """The body was written; transports that do not trace never report it."""
+
+    def first_token(self, *, page_index: int, attempt: int, time: float) -> None:
+        """Response headers arrived or, when streaming, the first content delta."""
+
+    def response_received(
+        self, *, page_index: int, attempt: int, usage: TokenUsage, time: float
+    ) -> None:
+        pass
+
+    def parse_finished(
+        self,
+        *,
+        page_index: int,
+        attempt: int,
+        metadata: PageMetadata,
+        seconds: float,
+        time: float,
+    ) -> None:
+        pass
+
+    def retry_scheduled(
+        self,
+        *,
+        page_index: int,
+        attempt: int,
+        delay: float,
+        reason: str,
+        time: float,
+    ) -> None:
+        """Another attempt follows after `delay` seconds."""
+
+    def rotation_retry(
+        self,
+        *,
+        page_index: int,
+        attempt: int,
+        correction: int,
+        next_rotation: int,
+        time: float,
+    ) -> None:
+        pass
+
+    def page_failed(
+        self, *, page_index: int, attempts: int, error: str, time: float
+    ) -> None:
+        """The page is kept as a placeholder or partial result, or the run fails."""
+
+    def images_extracted(
+        self, *, page_index: int, images: tuple[ExtractedImage, ...], time: float
+    ) -> None:
+        pass
+
+    def page_finished(self, *, page_result: PageResult, time: float) -> None:
+        pass
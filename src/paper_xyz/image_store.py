@@ -0,0 +1,113 @@
+from __future__ import annotations
+
+import hashlib
+import logging
+import os
+import tempfile
+from collections.abc import Iterator
+from dataclasses import dataclass
+from pathlib import Path
+
+from paper_xyz.writer import published_file_mode
+
+logger = logging.getLogger(__name__)
+
+IMAGE_STORE_BLOB_DIR = "blobs"
+
+
+@dataclass(frozen=True, slots=True)
+class ImageStoreStats:
+    blobs: int
+    bytes: int
+    unreferenced_blobs: int
+    unreferenced_bytes: int
+
+
+class ImageStore:
+    """Content-addressed image files shared across documents.
+
+    Each distinct image is written once as `blobs/<aa>/<sha256>.<ext>`
+    under `root`, and extracted image paths are hardlinks to it. The
+    hardlink count is the reference count: a blob with no other link is no
+    longer used by any output and `collect_garbage` removes it. Where a
+    hardlink cannot be made, for example across filesystems, the image is
+    written to its output path as an ordinary file instead.
+    """
+
+    def __init__(self, root: str | Path) -> None:
+        self.root = Path(root)
+
+    def blob_path(self, data: bytes, extension: str) -> Path:
+        digest = hashlib.sha256(data).hexdigest()
+        return self.root / IMAGE_STORE_BLOB_DIR / digest[:2] / f"{digest}.{extension}"
+
+    def link(self, data: bytes, output_path: Path) -> Path:
+        """Write `data` to `output_path` through the store and return its blob."""
+        blob_path = self.blob_path(data, output_path.suffix.lstrip(".") or "bin")
+        output_path.unlink(missing_ok=True)
+        # A concurrent `collect_garbage` can remove the blob between the two
+        # steps, so a link that finds no blob stores it again once.
+        for _ in range(2):
+            self._store_blob(blob_path, data)
+            try:
+                os.link(blob_path, output_path)
+            except FileNotFoundError:
+                continue
+            except OSError as exc:
+                logger.debug("image store link failed, writing a copy: %s", exc)
+                break
+            return blob_path
+        output_path.write_bytes(data)
+        return blob_path
+
+    def iter_blobs(self) -> Iterator[Path]:
+        blob_dir = self.root / IMAGE_STORE_BLOB_DIR
+        if blob_dir.is_dir():
+            for path in blob_dir.glob("*/*"):
+                if not path.name.startswith(".") and path.is_file():
+                    yield path
+
+    def stats(self) -> ImageStoreStats:
+        blobs = total_bytes = unreferenced = unreferenced_bytes = 0
+        for path in self.iter_blobs():
+            status = path.stat()
+            blobs += 1
+            total_bytes += status.st_size
+            if status.st_nlink <= 1:
+                unreferenced += 1
+                unreferenced_bytes += status.st_size
+        return ImageStoreStats(
+            blobs=blobs,
+            bytes=total_bytes,
+            unreferenced_blobs=unreferenced,
+            unreferenced_bytes=unreferenced_bytes,
+        )
+
+    def collect_garbage(self, *, dry_run: bool = False) -> tuple[int, int]:
+        """Remove blobs that no output links to; return their count and bytes."""
+        removed = removed_bytes = 0
+        for path in self.iter_blobs():
+            status = path.stat()
+            if status.st_nlink > 1:
+                continue
+            if not dry_run:
+                path.unlink(missing_ok=True)
+            removed += 1
+            removed_bytes += status.st_size
+        return removed, removed_bytes
+
+    def _store_blob(self, blob_path: Path, data: bytes) -> None:
+        if blob_path.exists():
+            return
+        blob_path.parent.mkdir(parents=True, exist_ok=True)
+        file_descriptor, temp_name = tempfile.mkstemp(
+            dir=blob_path.parent, prefix=".tmp-"
+        )
+        try:
+            with os.fdopen(file_descriptor, "wb") as file:
+                file.write(data)
+            os.chmod(temp_name, published_file_mode(blob_path))
+            os.replace(temp_name, blob_path)
+        except BaseException:
+            Path(temp_name).unlink(missing_ok=True)
+            raise
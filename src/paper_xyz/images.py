@@ -1,11 +1,28 @@
 from __future__ import annotations
 
+import asyncio
+import math
+import os
+import shutil
+import threading
+import time
+from collections.abc import Collection
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
 from pathlib import Path
+from types import TracebackType
 from typing import Any
 
 import pymupdf
+from pymupdf import mupdf
 
-from paper_xyz.types import ExtractedImage, ImageExtractionConfig
+from paper_xyz.image_store import ImageStore
+from paper_xyz.types import ExtractedImage, ImageExtractionConfig, PageTimings
+
+# Encodings written as-is with `native_format`, by `extract_image` extension.
+NATIVE_IMAGE_EXTENSIONS = frozenset({"jpeg", "jpx"})
+# Resolution of images rendered from the page when there is no usable xref.
+RENDERED_IMAGE_DPI = 200
 
 
 def extract_document_images(
@@ -15,15 +32,12 @@ def extract_document_images(
     start_page: int,
     end_page: int,
     config: ImageExtractionConfig,
+    wanted_pages: Collection[int] | None = None,
 ) -> dict[int, tuple[ExtractedImage, ...]]:
     if not config.enabled:
         return {}
 
-    markdown_path = Path(output_markdown_path)
-    if markdown_path.suffix.lower() != ".md":
-        raise ValueError("output_markdown_path must end with .md")
-    image_dir = markdown_path.with_suffix("")
-    relative_dir = image_dir.relative_to(markdown_path.parent).as_posix()
+    image_dir, relative_dir = markdown_image_dir(output_markdown_path)
     return extract_images_to_directory(
         pdf_path,
         image_dir,
@@ -31,6 +45,7 @@ def extract_document_images(
         end_page=end_page,
         config=config,
         relative_path_prefix=relative_dir,
+        wanted_pages=wanted_pages,
     )
 
 
@@ -42,7 +57,13 @@ def extract_images_to_directory(
     end_page: int,
     config: ImageExtractionConfig,
     relative_path_prefix: str | None = None,
+    wanted_pages: Collection[int] | None = None,
 ) -> dict[int, tuple[ExtractedImage, ...]]:
+    """Extract images for pages `start_page` to `end_page`.
+
+    With `config.lazy`, only pages in `wanted_pages` are extracted, plus
+    pages that list a large enough image. Otherwise every page is.
+    """
     if not config.enabled:
         return {}
 
@@ -51,99 +72,418 @@ def extract_images_to_directory(
     relative_dir = relative_path_prefix or image_dir.name
     images_by_page: dict[int, tuple[ExtractedImage, ...]] = {}
 
+    cache = DocumentImageCache()
     with pymupdf.open(pdf_path) as document:
         for page_index in range(start_page, end_page + 1):
-            page = document.load_page(page_index)
-            image_infos = filtered_image_infos(page, config)
-            extracted_images: list[ExtractedImage] = []
-
-            for image_index, image_info in enumerate(image_infos, start=1):
-                filename = f"page-{page_index + 1}-image-{image_index}.png"
-                output_path = image_dir / filename
-                save_image_as_png(document, page, image_info, output_path)
-
-                extracted_images.append(
-                    ExtractedImage(
-                        page_index=page_index,
-                        image_index=image_index,
-                        relative_path=(
-                            f"{relative_dir}/{filename}" if relative_dir else filename
-                        ),
-                        bbox=normalize_bbox(image_info["bbox"]),
-                        width=int(image_info["width"]),
-                        height=int(image_info["height"]),
-                    )
-                )
-
-            images_by_page[page_index] = tuple(extracted_images)
+            images_by_page[page_index] = extract_page_images(
+                document,
+                page_index,
+                image_dir,
+                relative_dir,
+                config,
+                cache=cache,
+                wanted=wanted_pages is None or page_index in wanted_pages,
+            )
 
     return images_by_page
 
 
+def markdown_image_dir(output_markdown_path: str | Path) -> tuple[Path, str]:
+    markdown_path = Path(output_markdown_path)
+    if markdown_path.suffix.lower() != ".md":
+        raise ValueError("output_markdown_path must end with .md")
+    image_dir = markdown_path.with_suffix("")
+    return image_dir, image_dir.relative_to(markdown_path.parent).as_posix()
+
+
+def extract_page_images(
+    document: pymupdf.Document,
+    page_index: int,
+    image_dir: Path,
+    relative_dir: str,
+    config: ImageExtractionConfig,
+    *,
+    cache: DocumentImageCache | None = None,
+    wanted: bool = True,
+) -> tuple[ExtractedImage, ...]:
+    if cache is None:
+        cache = DocumentImageCache()
+    page = document.load_page(page_index)
+    if not should_extract_page(page, config, wanted=wanted):
+        return ()
+    pixmaps: dict[int, pymupdf.Pixmap] = {}
+    image_infos = filtered_image_infos(
+        document, page, config, cache=cache, pixmaps=pixmaps
+    )
+    store = configured_image_store(config)
+    saved_paths: list[Path] = []
+    rendered: list[tuple[tuple[float, float, float, float], Path]] = []
+    for image_index, image_info in enumerate(image_infos, start=1):
+        output_path = image_dir / f"page-{page_index + 1}-image-{image_index}.png"
+        saved_path = save_xref_image(
+            document,
+            image_info,
+            output_path,
+            native_format=config.native_format,
+            cache=cache,
+            store=store,
+            pixmap=pixmaps.get(int(image_info.get("xref", 0) or 0)),
+        )
+        if saved_path is None:
+            rendered.append((normalize_bbox(image_info["bbox"]), output_path))
+            saved_path = output_path
+        saved_paths.append(saved_path)
+    if rendered:
+        render_image_crops(page, rendered, store=store)
+
+    extracted_images: list[ExtractedImage] = []
+    for image_index, (image_info, saved_path) in enumerate(
+        zip(image_infos, saved_paths, strict=True), start=1
+    ):
+        filename = saved_path.name
+        extracted_images.append(
+            ExtractedImage(
+                page_index=page_index,
+                image_index=image_index,
+                relative_path=(
+                    f"{relative_dir}/{filename}" if relative_dir else filename
+                ),
+                bbox=normalize_bbox(image_info["bbox"]),
+                width=int(image_info["width"]),
+                height=int(image_info["height"]),
+            )
+        )
+    return tuple(extracted_images)
+
+
+def configured_image_store(config: ImageExtractionConfig) -> ImageStore | None:
+    return ImageStore(config.store_dir) if config.store_dir else None
+
+
+def should_extract_page(
+    page: pymupdf.Page, config: ImageExtractionConfig, *, wanted: bool
+) -> bool:
+    if not config.lazy or wanted:
+        return True
+    if config.lazy_min_pixels is None:
+        return False
+    return any(
+        int(image[2]) * int(image[3]) >= config.lazy_min_pixels
+        for image in page.get_images()
+    )
+
+
+@dataclass(slots=True)
+class DocumentImageCache:
+    """Per-document image state shared by every page of one extraction.
+
+    `digests` maps an xref to the digest of its decoded pixmap, or None when
+    it cannot be decoded. `saved` maps an `(xref, smask)` pair to the first
+    PNG written for it, which later occurrences link to.
+    """
+
+    digests: dict[int, bytes | None] = field(default_factory=dict)
+    saved: dict[tuple[int, int], Path] = field(default_factory=dict)
+
+
+class DocumentImageExtractor:
+    """Extract a document's images page by page on a bounded thread pool.
+
+    Pages are submitted as they are needed, so extraction overlaps with
+    whatever else the caller is waiting on. Each worker thread opens its own
+    handle on the PDF and keeps it until `close`.
+    """
+
+    def __init__(
+        self,
+        pdf_path: str | Path,
+        output_markdown_path: str | Path,
+        *,
+        config: ImageExtractionConfig,
+        max_workers: int = 2,
+    ) -> None:
+        if max_workers < 1:
+            raise ValueError("max_workers must be >= 1")
+        self.pdf_path = Path(pdf_path)
+        self.config = config
+        self.image_dir, self.relative_dir = markdown_image_dir(output_markdown_path)
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="paper_xyz-images"
+        )
+        self._cache = DocumentImageCache()
+        self._local = threading.local()
+        self._documents: list[pymupdf.Document] = []
+        self._documents_lock = threading.Lock()
+        self._image_dir_ready = False
+
+    def __enter__(self) -> DocumentImageExtractor:
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        self.close()
+
+    async def extract(
+        self,
+        page_index: int,
+        *,
+        wanted: bool = True,
+        timings: PageTimings | None = None,
+    ) -> tuple[ExtractedImage, ...]:
+        """Extract the page's images; see `extract_images_to_directory`.
+
+        Time spent on the pool is added to `timings` when given.
+        """
+        return await asyncio.wrap_future(
+            self._executor.submit(self._extract_page, page_index, wanted, timings)
+        )
+
+    def close(self) -> None:
+        self._executor.shutdown(wait=True, cancel_futures=True)
+        with self._documents_lock:
+            for document in self._documents:
+                document.close()
+            self._documents.clear()
+
+    def _extract_page(
+        self, page_index: int, wanted: bool, timings: PageTimings | None
+    ) -> tuple[ExtractedImage, ...]:
+        started = time.perf_counter()
+        try:
+            if not self._image_dir_ready:
+                self.image_dir.mkdir(parents=True, exist_ok=True)
+                self._image_dir_ready = True
+            return extract_page_images(
+                self._document(),
+                page_index,
+                self.image_dir,
+                self.relative_dir,
+                self.config,
+                cache=self._cache,
+                wanted=wanted,
+            )
+        finally:
+            if timings is not None:
+                timings.images_seconds += time.perf_counter() - started
+
+    def _document(self) -> pymupdf.Document:
+        document = getattr(self._local, "document", None)
+        if document is None:
+            document = pymupdf.open(self.pdf_path)
+            self._local.document = document
+            with self._documents_lock:
+                self._documents.append(document)
+        return document
+
+
 def filtered_image_infos(
+    document: pymupdf.Document,
     page: pymupdf.Page,
     config: ImageExtractionConfig,
+    *,
+    cache: DocumentImageCache | None = None,
+    pixmaps: dict[int, pymupdf.Pixmap] | None = None,
 ) -> list[dict[str, Any]]:
+    """Return the page's image occurrences that pass `config`, in reading order.
+
+    This matches `page.get_image_info(hashes=True, xrefs=True)` followed by
+    the size filter, but only images that pass the filter are hashed, and
+    xrefs are resolved only among images large enough to pass it, each
+    decoded once per document. With `pixmaps`, the pixmaps decoded here for
+    the kept xrefs are stored in it by xref, so saving need not decode them
+    again.
+    """
+    if cache is None:
+        cache = DocumentImageCache()
+    textpage = page.get_textpage(flags=pymupdf.TEXT_PRESERVE_IMAGES)
+    sized = [
+        image_info
+        for image_info in textpage.extractIMGINFO()
+        if int(image_info.get("width", 0)) >= config.min_width
+        and int(image_info.get("height", 0)) >= config.min_height
+    ]
+    if not sized:
+        return []
+    hash_image_infos(textpage, sized)
+    del textpage
+
+    page_images = page.get_images(full=True)
     smasks_by_xref = {
         int(image[0]): int(image[1])
-        for image in page.get_images(full=True)
+        for image in page_images
         if int(image[0]) > 0 and int(image[1]) > 0
     }
+    decoded: dict[int, pymupdf.Pixmap] = {}
+    xrefs_by_digest = (
+        page_xrefs_by_digest(document, page_images, config, cache, decoded)
+        if document.is_pdf
+        else None
+    )
     candidates = []
-    for raw_image_info in page.get_image_info(hashes=True, xrefs=True):
-        if int(raw_image_info.get("width", 0)) < config.min_width:
-            continue
-        if int(raw_image_info.get("height", 0)) < config.min_height:
+    for image_info in sized:
+        if xrefs_by_digest is not None:
+            image_info["xref"] = xrefs_by_digest.get(image_info["digest"], 0)
+        image_info["smask"] = smasks_by_xref.get(int(image_info.get("xref", 0) or 0), 0)
+        candidates.append((normalize_bbox(image_info["bbox"]), image_info))
+    image_infos = unique_image_occurrences(candidates, config.bbox_tolerance)
+    if pixmaps is not None:
+        for image_info in image_infos:
+            xref = int(image_info.get("xref", 0) or 0)
+            if xref in decoded:
+                pixmaps[xref] = decoded[xref]
+    return image_infos
+
+
+def hash_image_infos(
+    textpage: pymupdf.TextPage, image_infos: list[dict[str, Any]]
+) -> None:
+    """Add to each `extractIMGINFO()` entry what `hashes=True` would add.
+
+    That is the MD5 digest of the decoded image, and its decoded size when
+    the image has no compressed buffer. Only the given entries are decoded.
+    """
+    infos_by_number = {
+        int(image_info["number"]): image_info for image_info in image_infos
+    }
+    # The mupdf bindings are generated, so their signatures are not typed.
+    for number, block in enumerate(textpage.this):  # ty:ignore[invalid-argument-type]
+        image_info = infos_by_number.get(number)
+        if image_info is None:
             continue
+        image = block.i_image()
+        pixmap, _, _ = mupdf.fz_get_pixmap_from_image(  # ty:ignore[missing-argument]
+            image,
+            mupdf.FzIrect(
+                pymupdf.FZ_MIN_INF_RECT,
+                pymupdf.FZ_MIN_INF_RECT,
+                pymupdf.FZ_MAX_INF_RECT,
+                pymupdf.FZ_MAX_INF_RECT,
+            ),
+            mupdf.FzMatrix(image.w(), 0, 0, image.h(), 0, 0),
+        )
+        image_info["digest"] = bytes(mupdf.fz_md5_pixmap2(pixmap))
+        if not image_info.get("size"):
+            image_info["size"] = image.w() * image.h() * image.n()
 
-        image_info = dict(raw_image_info)
-        image_info["smask"] = smasks_by_xref.get(int(image_info.get("xref", 0) or 0), 0)
-        candidates.append(image_info)
-    candidates.sort(key=image_reading_order)
-
-    unique: list[dict[str, Any]] = []
-    for candidate in candidates:
-        if any(
-            same_image_occurrence(candidate, previous, config.bbox_tolerance)
-            for previous in unique
-        ):
+
+def page_xrefs_by_digest(
+    document: pymupdf.Document,
+    page_images: list[Any],
+    config: ImageExtractionConfig,
+    cache: DocumentImageCache,
+    decoded: dict[int, pymupdf.Pixmap] | None = None,
+) -> dict[bytes, int]:
+    """Map decoded-pixmap digests to xrefs, as `get_image_info(xrefs=True)` does.
+
+    Pixmaps decoded here are added to `decoded` by xref when it is given.
+    """
+    xrefs_by_digest: dict[bytes, int] = {}
+    for image in page_images:
+        xref = int(image[0])
+        if int(image[2]) < config.min_width or int(image[3]) < config.min_height:
             continue
-        unique.append(candidate)
-    return unique
+        if xref in cache.digests:
+            digest = cache.digests[xref]
+        else:
+            try:
+                pixmap = pymupdf.Pixmap(document, xref)
+            except (RuntimeError, ValueError):
+                digest = None
+            else:
+                digest = pixmap.digest
+                if decoded is not None:
+                    decoded[xref] = pixmap
+            cache.digests[xref] = digest
+        if digest is not None:
+            xrefs_by_digest[digest] = xref
+    return xrefs_by_digest
 
 
-def image_reading_order(
-    image_info: dict[str, Any],
+def unique_image_occurrences(
+    candidates: list[tuple[tuple[float, float, float, float], dict[str, Any]]],
+    tolerance: float,
+) -> list[dict[str, Any]]:
+    """Sort `(bbox, image_info)` pairs into reading order and drop duplicates.
+
+    An occurrence is a duplicate of an earlier kept one when both share a
+    digest or an xref and every bbox coordinate is within `tolerance`.
+    """
+    candidates = sorted(candidates, key=bbox_reading_order)
+    index = ImageOccurrenceIndex(tolerance)
+    return [
+        image_info for bbox, image_info in candidates if index.add(bbox, image_info)
+    ]
+
+
+def bbox_reading_order(
+    candidate: tuple[tuple[float, float, float, float], dict[str, Any]],
 ) -> tuple[float, float, float, float]:
-    x0, y0, x1, y1 = normalize_bbox(image_info["bbox"])
+    x0, y0, x1, y1 = candidate[0]
     return y0, x0, y1, x1
 
 
-def same_image_occurrence(
-    left: dict[str, Any],
-    right: dict[str, Any],
-    tolerance: float,
-) -> bool:
-    left_digest = left.get("digest")
-    right_digest = right.get("digest")
-    left_xref = int(left.get("xref", 0) or 0)
-    right_xref = int(right.get("xref", 0) or 0)
-    same_source = (
-        left_digest is not None
-        and right_digest is not None
-        and left_digest == right_digest
-    ) or (left_xref > 0 and left_xref == right_xref)
-    if not same_source:
-        return False
+class ImageOccurrenceIndex:
+    """Kept image occurrences, bucketed by source and by a grid of bbox origins.
 
-    return all(
-        abs(left_coord - right_coord) <= tolerance
-        for left_coord, right_coord in zip(
-            normalize_bbox(left["bbox"]),
-            normalize_bbox(right["bbox"]),
-            strict=True,
-        )
-    )
+    Grid cells are at least `tolerance` wide, so an occurrence within
+    tolerance of a kept one lies in the same or a neighbouring cell of the
+    same source.
+    """
+
+    def __init__(self, tolerance: float) -> None:
+        self.tolerance = tolerance
+        self.cell_size = max(tolerance, 1.0)
+        self._cells: dict[tuple[Any, ...], list[tuple[float, float, float, float]]] = {}
+
+    def add(
+        self, bbox: tuple[float, float, float, float], image_info: dict[str, Any]
+    ) -> bool:
+        """Keep the occurrence and return True, or return False for a duplicate."""
+        if not self.tolerance >= 0:
+            return True
+        cell = self._cell(bbox)
+        if cell is None:
+            # No other occurrence can be within tolerance of it.
+            return True
+        column, row = cell
+        sources = image_sources(image_info)
+        for source in sources:
+            for neighbour_column in (column - 1, column, column + 1):
+                for neighbour_row in (row - 1, row, row + 1):
+                    for kept in self._cells.get(
+                        (*source, neighbour_column, neighbour_row), ()
+                    ):
+                        if all(
+                            abs(coord - kept_coord) <= self.tolerance
+                            for coord, kept_coord in zip(bbox, kept)
+                        ):
+                            return False
+        for source in sources:
+            self._cells.setdefault((*source, column, row), []).append(bbox)
+        return True
+
+    def _cell(self, bbox: tuple[float, float, float, float]) -> tuple[int, int] | None:
+        if math.isinf(self.tolerance):
+            return 0, 0
+        x0, y0 = bbox[0], bbox[1]
+        if not (math.isfinite(x0) and math.isfinite(y0)):
+            return None
+        return math.floor(x0 / self.cell_size), math.floor(y0 / self.cell_size)
+
+
+def image_sources(image_info: dict[str, Any]) -> list[tuple[str, Any]]:
+    sources: list[tuple[str, Any]] = []
+    digest = image_info.get("digest")
+    if digest is not None:
+        sources.append(("digest", digest))
+    xref = int(image_info.get("xref", 0) or 0)
+    if xref > 0:
+        sources.append(("xref", xref))
+    return sources
 
 
 def normalize_bbox(value: Any) -> tuple[float, float, float, float]:
@@ -153,27 +493,148 @@ def normalize_bbox(value: Any) -> tuple[float, float, float, float]:
     return float(x0), float(y0), float(x1), float(y1)
 
 
-def save_image_as_png(
+def save_image(
     document: pymupdf.Document,
     page: pymupdf.Page,
     image_info: dict[str, Any],
     output_path: Path,
-) -> None:
+    *,
+    native_format: bool = False,
+    cache: DocumentImageCache | None = None,
+    store: ImageStore | None = None,
+) -> Path:
+    """Write the image to `output_path`, a PNG path, and return the path used.
+
+    With `native_format`, a JPEG or JPEG 2000 stream that needs no mask or
+    colorspace conversion is written unchanged, with its own extension.
+    Without a usable xref, the image's area of the page is rendered instead.
+    With `store`, the file is a hardlink into that image store.
+    """
+    saved_path = save_xref_image(
+        document,
+        image_info,
+        output_path,
+        native_format=native_format,
+        cache=cache,
+        store=store,
+    )
+    if saved_path is not None:
+        return saved_path
+    render_image_crops(
+        page, [(normalize_bbox(image_info["bbox"]), output_path)], store=store
+    )
+    return output_path
+
+
+def save_xref_image(
+    document: pymupdf.Document,
+    image_info: dict[str, Any],
+    output_path: Path,
+    *,
+    native_format: bool = False,
+    cache: DocumentImageCache | None = None,
+    store: ImageStore | None = None,
+    pixmap: pymupdf.Pixmap | None = None,
+) -> Path | None:
+    """Write the image from its xref, or return None when it cannot be used.
+
+    `pixmap`, when given, is the xref already decoded.
+    """
     xref = int(image_info.get("xref", 0) or 0)
-    if xref > 0:
-        try:
+    if xref <= 0:
+        return None
+    smask = int(image_info.get("smask", 0) or 0)
+    saved_path = cache.saved.get((xref, smask)) if cache is not None else None
+    if saved_path is not None:
+        linked_path = output_path.with_suffix(saved_path.suffix)
+        if link_image_file(saved_path, linked_path):
+            return linked_path
+    if native_format and smask == 0:
+        native_path = save_native_image(document, xref, output_path, store=store)
+        if native_path is not None:
+            if cache is not None:
+                cache.saved[(xref, smask)] = native_path
+            return native_path
+    try:
+        if pixmap is None:
             pixmap = pymupdf.Pixmap(document, xref)
-            smask = int(image_info.get("smask", 0) or 0)
-            if smask > 0:
-                mask = pymupdf.Pixmap(document, smask)
-                pixmap = pymupdf.Pixmap(pixmap, mask)
-            if pixmap.colorspace is not None and pixmap.colorspace.n > 3:
-                pixmap = pymupdf.Pixmap(pymupdf.csRGB, pixmap)
-            pixmap.save(output_path)
-            return
-        except (RuntimeError, ValueError):
-            pass
-
-    bbox = pymupdf.Rect(normalize_bbox(image_info["bbox"]))
-    pixmap = page.get_pixmap(clip=bbox, dpi=200, alpha=False)
-    pixmap.save(output_path)
+        if smask > 0:
+            mask = pymupdf.Pixmap(document, smask)
+            pixmap = pymupdf.Pixmap(pixmap, mask)
+        if pixmap.colorspace is not None and pixmap.colorspace.n > 3:
+            pixmap = pymupdf.Pixmap(pymupdf.csRGB, pixmap)
+        data = pixmap.tobytes("png")
+    except (RuntimeError, ValueError):
+        return None
+    write_image_file(data, output_path, store)
+    if cache is not None:
+        cache.saved[(xref, smask)] = output_path
+    return output_path
+
+
+def render_image_crops(
+    page: pymupdf.Page,
+    crops: list[tuple[tuple[float, float, float, float], Path]],
+    *,
+    store: ImageStore | None = None,
+) -> None:
+    """Render each `(bbox, output_path)` area of the page to a PNG.
+
+    The page's display list is built once and shared by every crop, where
+    `page.get_pixmap` would interpret the page content again for each one.
+    """
+    display_list = page.get_displaylist()
+    matrix = pymupdf.Matrix(RENDERED_IMAGE_DPI / 72, RENDERED_IMAGE_DPI / 72)
+    for bbox, output_path in crops:
+        pixmap = display_list.get_pixmap(
+            matrix=matrix, clip=pymupdf.Rect(bbox), alpha=False
+        )
+        pixmap.set_dpi(RENDERED_IMAGE_DPI, RENDERED_IMAGE_DPI)
+        write_image_file(pixmap.tobytes("png"), output_path, store)
+
+
+def save_native_image(
+    document: pymupdf.Document,
+    xref: int,
+    output_path: Path,
+    *,
+    store: ImageStore | None = None,
+) -> Path | None:
+    try:
+        extracted = document.extract_image(xref)
+    except (RuntimeError, ValueError):
+        return None
+    if (
+        not extracted
+        or extracted.get("ext") not in NATIVE_IMAGE_EXTENSIONS
+        or int(extracted.get("smask", 0) or 0) > 0
+        or int(extracted.get("colorspace", 0) or 0) > 3
+    ):
+        return None
+    native_path = output_path.with_suffix(f".{extracted['ext']}")
+    write_image_file(extracted["image"], native_path, store)
+    return native_path
+
+
+def write_image_file(data: bytes, output_path: Path, store: ImageStore | None) -> None:
+    # A previous run may have left a hardlink here; never write through it.
+    output_path.unlink(missing_ok=True)
+    if store is None:
+        output_path.write_bytes(data)
+    else:
+        store.link(data, output_path)
+
+
+def link_image_file(source: Path, target: Path) -> bool:
+    """Hardlink `source` to `target`, or copy it where links are unsupported."""
+    if source == target:
+        return source.exists()
+    try:
+        target.unlink(missing_ok=True)
+        os.link(source, target)
+    except OSError:
+        try:
+            shutil.copyfile(source, target)
+        except OSError:
+            return False
+    return True
@@ -3,6 +3,16 @@ from __future__ import annotations
 from dataclasses import dataclass, field
 from typing import Any, Literal
 
+from paper_xyz.parsing import (
+    CHANDRA_HTML_PARSER,
+    DEEPSEEK_MARKDOWN_PARSER,
+    DOTS_LAYOUT_JSON_PARSER,
+    INFINITY_LAYOUT_JSON_PARSER,
+    MARKDOWN_PARSER,
+    SVG_PARSER,
+    UNLIMITED_OCR_PARSER,
+    PageParser,
+)
 from paper_xyz.prompts import (
     CHANDRA_OCR_LAYOUT_PROMPT,
     DEEPSEEK_OCR_MARKDOWN_PROMPT,
@@ -14,7 +24,7 @@ from paper_xyz.prompts import (
     INFINITY_PARSER2_DOC2JSON_PROMPT,
     UNLIMITED_OCR_DOCUMENT_PROMPT,
 )
-from paper_xyz.types import ImageRenderProfile, ResponseParser
+from paper_xyz.types import ImageRenderProfile
 
 TokenParam = Literal["max_tokens", "max_completion_tokens"]
 
@@ -25,7 +35,7 @@ class ModelServiceProfile:
     description: str
     model: str
     prompt: str = DEFAULT_MARKDOWN_PROMPT
-    response_parser: ResponseParser = "markdown"
+    response_parser: PageParser = MARKDOWN_PARSER
     max_tokens: int = 8000
     token_param: TokenParam = "max_tokens"
     temperature: float | None = 0.0
@@ -113,7 +123,7 @@ MODEL_SERVICE_PROFILES: dict[str, ModelServiceProfile] = {
         description="GLM-OCR OpenAI-compatible VLM service defaults.",
         model="zai-org/GLM-OCR",
         prompt=GLM_OCR_MARKDOWN_PROMPT,
-        response_parser="markdown",
+        response_parser=MARKDOWN_PARSER,
         max_tokens=16384,
         temperature=0.01,
         top_p=0.00001,
@@ -126,7 +136,7 @@ MODEL_SERVICE_PROFILES: dict[str, ModelServiceProfile] = {
         description="dots.mocr OpenAI-compatible VLM service defaults.",
         model="rednote-hilab/dots.mocr",
         prompt=DOTS_LAYOUT_JSON_PROMPT,
-        response_parser="dots_layout_json",
+        response_parser=DOTS_LAYOUT_JSON_PARSER,
         max_tokens=32768,
         token_param="max_completion_tokens",
         temperature=0.1,
@@ -141,7 +151,7 @@ MODEL_SERVICE_PROFILES: dict[str, ModelServiceProfile] = {
         ),
         model="rednote-hilab/dots.mocr-svg",
         prompt=DOTS_IMAGE_TO_SVG_PROMPT,
-        response_parser="svg",
+        response_parser=SVG_PARSER,
         max_tokens=32768,
         token_param="max_completion_tokens",
         temperature=0.9,
@@ -154,7 +164,7 @@ MODEL_SERVICE_PROFILES: dict[str, ModelServiceProfile] = {
         description="dots.ocr 1.5 OpenAI-compatible VLM service defaults.",
         model="rednote-hilab/dots.ocr-1.5",
         prompt=DOTS_LAYOUT_JSON_PROMPT,
-        response_parser="dots_layout_json",
+        response_parser=DOTS_LAYOUT_JSON_PARSER,
         max_tokens=32768,
         token_param="max_completion_tokens",
         temperature=0.1,
@@ -170,7 +180,7 @@ MODEL_SERVICE_PROFILES: dict[str, ModelServiceProfile] = {
         ),
         model="rednote-hilab/dots.ocr-1.5-svg",
         prompt=DOTS_IMAGE_TO_SVG_PROMPT,
-        response_parser="svg",
+        response_parser=SVG_PARSER,
         max_tokens=32768,
         token_param="max_completion_tokens",
         temperature=0.9,
@@ -184,7 +194,7 @@ MODEL_SERVICE_PROFILES: dict[str, ModelServiceProfile] = {
         description="dots.ocr OpenAI-compatible VLM service defaults.",
         model="rednote-hilab/dots.ocr",
         prompt=DOTS_LAYOUT_JSON_PROMPT,
-        response_parser="dots_layout_json",
+        response_parser=DOTS_LAYOUT_JSON_PARSER,
         max_tokens=32768,
         token_param="max_completion_tokens",
         temperature=0.1,
@@ -197,7 +207,7 @@ MODEL_SERVICE_PROFILES: dict[str, ModelServiceProfile] = {
         description="DeepSeek-OCR OpenAI-compatible VLM service defaults.",
         model="deepseek-ai/DeepSeek-OCR",
         prompt=DEEPSEEK_OCR_MARKDOWN_PROMPT,
-        response_parser="deepseek_markdown",
+        response_parser=DEEPSEEK_MARKDOWN_PARSER,
         max_tokens=8192,
         temperature=0.0,
         extra_body={
@@ -216,7 +226,7 @@ MODEL_SERVICE_PROFILES: dict[str, ModelServiceProfile] = {
         ),
         model="Unlimited-OCR",
         prompt=UNLIMITED_OCR_DOCUMENT_PROMPT,
-        response_parser="unlimited_ocr",
+        response_parser=UNLIMITED_OCR_PARSER,
         max_tokens=4096,
         temperature=0.0,
         extra_body={
@@ -238,7 +248,7 @@ MODEL_SERVICE_PROFILES: dict[str, ModelServiceProfile] = {
         description="FireRed-OCR OpenAI-compatible VLM service defaults.",
         model="FireRedTeam/FireRed-OCR-2B",
         prompt=FIRERED_OCR_MARKDOWN_PROMPT,
-        response_parser="markdown",
+        response_parser=MARKDOWN_PARSER,
         max_tokens=8192,
         temperature=0.0,
         image_render_profile=FIRERED_RENDER_PROFILE,
@@ -251,7 +261,7 @@ MODEL_SERVICE_PROFILES: dict[str, ModelServiceProfile] = {
         ),
         model="infly/Infinity-Parser2-Pro",
         prompt=INFINITY_PARSER2_DOC2JSON_PROMPT,
-        response_parser="infinity_layout_json",
+        response_parser=INFINITY_LAYOUT_JSON_PARSER,
         max_tokens=32768,
         temperature=0.0,
         top_p=1.0,
@@ -267,7 +277,7 @@ MODEL_SERVICE_PROFILES: dict[str, ModelServiceProfile] = {
         ),
         model="infly/Infinity-Parser2-Flash",
         prompt=INFINITY_PARSER2_DOC2JSON_PROMPT,
-        response_parser="infinity_layout_json",
+        response_parser=INFINITY_LAYOUT_JSON_PARSER,
         max_tokens=32768,
         temperature=0.0,
         top_p=1.0,
@@ -283,7 +293,7 @@ MODEL_SERVICE_PROFILES: dict[str, ModelServiceProfile] = {
         ),
         model="datalab-to/chandra-ocr-2",
         prompt=CHANDRA_OCR_LAYOUT_PROMPT,
-        response_parser="chandra_html",
+        response_parser=CHANDRA_HTML_PARSER,
         max_tokens=12384,
         temperature=0.0,
         top_p=0.1,
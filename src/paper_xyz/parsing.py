@@ -1,12 +1,34 @@
 from __future__ import annotations
 
+import functools
+import importlib.util
+import itertools
 import json
+import logging
 import re
-from typing import Any
+import sys
+from collections.abc import Callable, Iterable, Sequence
+from dataclasses import dataclass
+from typing import Any, Protocol
 
 from bs4 import BeautifulSoup
 
-from paper_xyz.types import PageMetadata, ResponseParser
+from paper_xyz.chandra_markdown import (
+    ChandraNode,
+    append_block_contents,
+    child_nodes,
+    render_chandra_markdown,
+    serialize_chandra_nodes,
+)
+from paper_xyz.svg import SvgScanner, extract_svg_document
+from paper_xyz.types import (
+    ChandraHtmlBackend,
+    LayoutCell,
+    PageMetadata,
+    ResponseParser,
+)
+
+logger = logging.getLogger(__name__)
 
 FRONT_MATTER_RE = re.compile(
     r"\A\s*---[ \t]*\r?\n(.*?)\r?\n---[ \t]*(?:\r?\n|\Z)(.*)\Z", re.DOTALL
@@ -19,6 +41,22 @@ UNLIMITED_LLAMA_DET_RE = re.compile(
     r"^([^\s\[]+)\s+\[[^\]]*\]\s*;?\s*(.*)$",
     re.DOTALL,
 )
+DEEPSEEK_REF_RE = re.compile(
+    r"<\|ref\|>(.*?)<\|/ref\|><\|det\|>(.*?)<\|/det\|>", re.DOTALL
+)
+DEEPSEEK_END_OF_SENTENCE = "<\uff5cend\u2581of\u2581sentence\uff5c>"
+EXTRA_BLANK_LINES_RE = re.compile(r"\n{3,}")
+JSON_FENCE_RE = re.compile(r"```(?:json)?\s*\n(.*?)\n```", re.DOTALL | re.I)
+JSON_OPEN_FENCE_RE = re.compile(r"```(?:json)?\s*\n(.*)", re.DOTALL | re.I)
+INLINE_MATH_RE = re.compile(r"\$[^$\n]+?\$|\\\(.*?\\\)")
+DIGITS_RE = re.compile(r"\d+")
+JSON_STRUCTURAL_RE = re.compile(r'[\[\]{}",]')
+JSON_STRING_BODY_RE = re.compile(r'[^"\\]*(?:\\.[^"\\]*)*', re.DOTALL)
+JSON_DECODER = json.JSONDecoder()
+CHANDRA_HTML_BACKENDS: tuple[ChandraHtmlBackend, ...] = ("lxml", "html.parser")
+DOTS_PAGE_FURNITURE = frozenset({"Page-header", "Page-footer"})
+INFINITY_PAGE_FURNITURE = frozenset({"header", "footer", "page_footnote"})
+SALVAGEABLE_LAYOUT_TEXT_KEYS = frozenset({"text", "content"})
 
 
 def extract_message_text(content: Any) -> str:
@@ -38,26 +76,44 @@ def extract_message_text(content: Any) -> str:
     raise ValueError(f"Unsupported message content type: {type(content).__name__}")
 
 
+class ResponseStream(Protocol):
+    def feed(self, text: str) -> None: ...
+
+    def finish(self) -> tuple[PageMetadata, str] | None: ...
+
+
+@dataclass(frozen=True, slots=True)
+class PageParser:
+    """A response format's parser, registered in RESPONSE_PARSERS by name.
+
+    `new_stream`, when set, builds an incremental parser whose `feed` takes
+    streamed response text and whose `finish` returns the parsed page, or
+    None to fall back to `parse` on the whole response.
+    """
+
+    name: ResponseParser
+    parse: Callable[[str], tuple[PageMetadata, str]]
+    new_stream: Callable[[], ResponseStream] | None = None
+
+    def stream(self) -> ResponseStream | None:
+        return self.new_stream() if self.new_stream is not None else None
+
+
+def get_response_parser(response_parser: ResponseParser | PageParser) -> PageParser:
+    if isinstance(response_parser, PageParser):
+        return response_parser
+    try:
+        return RESPONSE_PARSERS[response_parser]
+    except KeyError:
+        raise ValueError(f"Unsupported response_parser: {response_parser}") from None
+
+
 def parse_page_response(
     text: str,
     *,
-    response_parser: ResponseParser = "markdown",
+    response_parser: ResponseParser | PageParser = "markdown",
 ) -> tuple[PageMetadata, str]:
-    if response_parser == "markdown":
-        return parse_markdown_response(text)
-    if response_parser == "dots_layout_json":
-        return parse_dots_layout_json_response(text)
-    if response_parser == "infinity_layout_json":
-        return parse_infinity_layout_json_response(text)
-    if response_parser == "chandra_html":
-        return parse_chandra_html_response(text)
-    if response_parser == "deepseek_markdown":
-        return parse_deepseek_markdown_response(text)
-    if response_parser == "unlimited_ocr":
-        return parse_unlimited_ocr_response(text)
-    if response_parser == "svg":
-        return parse_svg_response(text)
-    raise ValueError(f"Unsupported response_parser: {response_parser}")
+    return get_response_parser(response_parser).parse(text)
 
 
 def parse_markdown_response(text: str) -> tuple[PageMetadata, str]:
@@ -89,7 +145,8 @@ def parse_dots_layout_json_response(text: str) -> tuple[PageMetadata, str]:
 
 def parse_infinity_layout_json_response(text: str) -> tuple[PageMetadata, str]:
     payload = extract_infinity_json_payload(text)
-    cells = layout_cells_from_json(payload) if payload is not None else None
+    values = layout_cells_from_json(payload) if payload is not None else None
+    cells = [layout_cell_from_json(value, extract_svg=False) for value in values or ()]
     if not cells:
         body = normalize_markdown_body(text)
         return default_metadata(body), body
@@ -98,24 +155,26 @@ def parse_infinity_layout_json_response(text: str) -> tuple[PageMetadata, str]:
     return infinity_layout_metadata(cells), markdown
 
 
-def parse_chandra_html_response(text: str) -> tuple[PageMetadata, str]:
+def parse_chandra_html_response(
+    text: str, *, backend: ChandraHtmlBackend | None = None
+) -> tuple[PageMetadata, str]:
     html = strip_outer_code_fence(text).strip()
     if not html:
         return default_metadata(""), ""
 
-    soup = BeautifulSoup(html, "html.parser")
-    metadata = chandra_html_metadata(soup)
-    content_html = chandra_content_html(soup)
-    if not content_html:
+    root = parse_chandra_html(html, backend=backend)
+    metadata = chandra_html_metadata(root)
+    nodes = chandra_content_nodes(root)
+    if not nodes:
         return metadata, ""
 
     try:
-        markdown = chandra_html_to_markdown(content_html)
+        markdown = render_chandra_markdown(nodes)
     except Exception:
-        markdown = normalize_markdown_body(content_html)
+        markdown = normalize_markdown_body(serialize_chandra_nodes(nodes))
 
     if not markdown.strip():
-        markdown = normalize_markdown_body(content_html)
+        markdown = normalize_markdown_body(serialize_chandra_nodes(nodes))
     return metadata, normalize_markdown_body(markdown)
 
 
@@ -129,22 +188,19 @@ def parse_unlimited_ocr_response(text: str) -> tuple[PageMetadata, str]:
     return default_metadata(body), normalize_markdown_body(body)
 
 
-def parse_svg_response(text: str) -> tuple[PageMetadata, str]:
-    svg = extract_svg_fragment(text)
-    body = svg if svg else normalize_markdown_body(text)
+def parse_svg_response(
+    text: str, *, max_bytes: int | None = None, minify_paths: bool = False
+) -> tuple[PageMetadata, str]:
+    svg = extract_svg_document(text, max_bytes=max_bytes, minify_paths=minify_paths)
+    body = svg if svg is not None else normalize_markdown_body(text)
     return default_metadata(body), body
 
 
 def clean_deepseek_markdown(text: str) -> str:
-    body = text.replace("<\uff5cend\u2581of\u2581sentence\uff5c>", "")
-    body = re.sub(
-        r"<\|ref\|>(.*?)<\|/ref\|><\|det\|>(.*?)<\|/det\|>",
-        replace_deepseek_ref,
-        body,
-        flags=re.DOTALL,
-    )
+    body = text.replace(DEEPSEEK_END_OF_SENTENCE, "")
+    body = DEEPSEEK_REF_RE.sub(replace_deepseek_ref, body)
     body = body.replace("\\coloneqq", ":=").replace("\\eqqcolon", "=:")
-    body = re.sub(r"\n{3,}", "\n\n", body)
+    body = EXTRA_BLANK_LINES_RE.sub("\n\n", body)
     return body.strip()
 
 
@@ -185,21 +241,42 @@ def clean_unlimited_ocr_markdown(text: str) -> str:
         blocks.append(current)
 
     body = "\n\n".join("\n".join(block) for block in blocks if block).strip()
-    body = body.replace("<｜end▁of▁sentence｜>", "")
-    return re.sub(r"\n{3,}", "\n\n", body).strip()
+    body = body.replace(DEEPSEEK_END_OF_SENTENCE, "")
+    return EXTRA_BLANK_LINES_RE.sub("\n\n", body).strip()
+
 
+@functools.cache
+def chandra_html_backend() -> ChandraHtmlBackend:
+    """Pick the fastest available BeautifulSoup tree builder, once per process."""
+    backend: ChandraHtmlBackend = "html.parser"
+    if importlib.util.find_spec("lxml") is not None:
+        backend = "lxml"
+    logger.info("chandra_html parser backend=%s", backend)
+    return backend
 
-def chandra_content_html(
-    soup: Any,
+
+def parse_chandra_html(html: str, *, backend: ChandraHtmlBackend | None = None) -> Any:
+    backend = backend or chandra_html_backend()
+    if backend not in CHANDRA_HTML_BACKENDS:
+        raise ValueError(f"Unsupported chandra_html backend: {backend}")
+    soup = BeautifulSoup(html, backend)
+    if backend == "html.parser":
+        return soup
+    # lxml wraps fragments in <html><body>; layout blocks sit under body.
+    return soup.body or soup
+
+
+def chandra_content_nodes(
+    root: Any,
     *,
     include_headers_footers: bool = False,
     include_images: bool = True,
-) -> str:
-    top_level_divs = soup.find_all("div", recursive=False)
+) -> list[ChandraNode]:
+    top_level_divs = root.find_all("div", recursive=False)
     if not top_level_divs:
-        return str(soup)
+        return child_nodes(root)
 
-    chunks: list[str] = []
+    nodes: list[ChandraNode] = []
     for div in top_level_divs:
         label = str(div.get("data-label", "") or "").strip()
 
@@ -210,60 +287,40 @@ def chandra_content_html(
         if not include_images and label in {"Image", "Figure"}:
             continue
 
-        if label in {"Image", "Figure"}:
-            for img in div.find_all("img"):
-                if not img.get("src"):
-                    img["src"] = ""
-        else:
-            for img in div.find_all("img"):
-                if not img.get("src"):
-                    img.decompose()
-
-        strip_chandra_layout_attrs(div)
-        chunk = str(div.decode_contents()).strip()
-        if chunk:
-            chunks.append(chunk)
-
-    return "\n\n".join(chunks)
-
-
-def strip_chandra_layout_attrs(node: Any) -> None:
-    for attr in ("data-bbox", "data-label"):
-        node.attrs.pop(attr, None)
-    for tag in node.find_all(True):
-        for attr in ("data-bbox", "data-label"):
-            tag.attrs.pop(attr, None)
-
-
-def chandra_html_to_markdown(html: str) -> str:
-    from markdownify import MarkdownConverter
-
-    class ChandraMarkdownConverter(MarkdownConverter):
-        def convert_math(self, el: Any, text: str, parent_tags: Any) -> str:
-            math = text.strip()
-            if not math:
-                return ""
-            if el.has_attr("display") and el["display"] == "block":
-                return f"\n\n$$\n{math}\n$$\n\n"
-            return f" ${math}$ "
-
-        def convert_table(self, el: Any, text: str, parent_tags: Any) -> str:
-            return f"\n\n{el}\n\n"
-
-    converter = ChandraMarkdownConverter(
-        heading_style="ATX",
-        bullets="-",
-        escape_misc=False,
-        escape_underscores=True,
-        escape_asterisks=True,
+        prepare_chandra_block(div, keep_empty_images=label in {"Image", "Figure"})
+        append_block_contents(nodes, div)
+    return nodes
+
+
+def prepare_chandra_block(block: Any, *, keep_empty_images: bool) -> None:
+    """Drop layout attributes and src-less images in one pass over a block."""
+    empty_images = []
+    for tag in itertools.chain((block,), block.find_all(True)):
+        attrs = tag.attrs
+        if attrs:
+            attrs.pop("data-bbox", None)
+            attrs.pop("data-label", None)
+        if tag.name == "img" and not attrs.get("src"):
+            if keep_empty_images:
+                attrs["src"] = ""
+            else:
+                empty_images.append(tag)
+    for img in empty_images:
+        img.decompose()
+
+
+def chandra_html_to_markdown(
+    html: str, *, backend: ChandraHtmlBackend | None = None
+) -> str:
+    return render_chandra_markdown(
+        child_nodes(parse_chandra_html(html, backend=backend))
     )
-    return converter.convert(html).strip()
 
 
-def chandra_html_metadata(soup: Any) -> PageMetadata:
+def chandra_html_metadata(root: Any) -> PageMetadata:
     labels = [
         str(div.get("data-label", "") or "").strip()
-        for div in soup.find_all("div", recursive=False)
+        for div in root.find_all("div", recursive=False)
     ]
     content_labels = [
         label
@@ -286,10 +343,10 @@ def chandra_html_metadata(soup: Any) -> PageMetadata:
     )
 
 
-def extract_layout_cells(text: str) -> list[dict[str, Any]] | None:
+def extract_layout_cells(text: str) -> list[LayoutCell] | None:
     payload = extract_json_payload(text)
-    cells = layout_cells_from_json(payload) if payload is not None else None
-    return cells if cells else None
+    values = layout_cells_from_json(payload) if payload is not None else None
+    return [layout_cell_from_json(value) for value in values] if values else None
 
 
 def extract_json_payload(text: str) -> Any | None:
@@ -301,17 +358,7 @@ def extract_json_payload(text: str) -> Any | None:
         return json.loads(candidate)
     except json.JSONDecodeError:
         pass
-
-    decoder = json.JSONDecoder()
-    for index, char in enumerate(candidate):
-        if char not in "[{":
-            continue
-        try:
-            value, _ = decoder.raw_decode(candidate[index:])
-        except json.JSONDecodeError:
-            continue
-        return value
-    return None
+    return recover_json_payload(candidate)
 
 
 def extract_infinity_json_payload(text: str) -> Any | None:
@@ -323,45 +370,326 @@ def extract_infinity_json_payload(text: str) -> Any | None:
         return json.loads(candidate)
     except json.JSONDecodeError:
         pass
-
-    truncated, was_truncated = truncate_last_incomplete_layout_element(candidate)
-    if was_truncated:
-        try:
-            return json.loads(truncated)
-        except json.JSONDecodeError:
-            pass
-
-    return extract_json_payload(candidate)
+    return recover_json_payload(candidate)
 
 
 def extract_json_code_content(text: str) -> str:
-    match = re.search(r"```(?:json)?\s*\n(.*?)\n```", text, re.DOTALL | re.I)
+    match = JSON_FENCE_RE.search(text)
     if match:
         return match.group(1).strip()
 
-    partial = re.search(r"```(?:json)?\s*\n(.*)", text, re.DOTALL | re.I)
+    partial = JSON_OPEN_FENCE_RE.search(text)
     if partial:
         return partial.group(1).strip()
 
     return text.strip()
 
 
-def truncate_last_incomplete_layout_element(text: str) -> tuple[str, bool]:
-    candidate = text.strip()
-    if not candidate:
-        return candidate, False
-    if len(candidate) <= 65536 and candidate.rstrip().endswith("]"):
-        return candidate, False
-
-    bbox_matches = list(re.finditer(r'\{\s*"bbox"\s*:', candidate))
-    if len(bbox_matches) <= 1:
-        return candidate, False
-
-    truncated = candidate[: bbox_matches[-1].start()].rstrip()
-    if not truncated.endswith(","):
-        return candidate, False
+def recover_json_payload(text: str) -> Any | None:
+    scanner = LayoutJsonScanner()
+    scanner.feed(text)
+    cells = scanner.finish()
+    # Cells decoded before a later top-level value are the better recovery.
+    if scanner.payload is not None and not cells:
+        return scanner.payload
+    return cells or None
+
+
+class LayoutJsonScanner:
+    """Single-pass, error-tolerant scanner for layout JSON.
+
+    Text can be fed in chunks. Every complete object in the first array of
+    objects is decoded as soon as its closing brace arrives; an object that
+    fails to decode is skipped. `finish` salvages a truncated final object
+    by closing its open strings and containers, or by cutting it back to its
+    last complete member. A closer that does not match the innermost opener
+    never closes the cells array, so a stray one costs at most its cell.
+    Each character is visited at most once outside
+    the C decoder, so cost is linear in the input.
+
+    With `decode_payload`, the whole input is kept: top-level values and
+    cells are first tried with the C decoder, and scanning stops at the first
+    top-level value that decodes, kept as `payload`. Without it, text before
+    the open cell is dropped, so streamed input is held one cell at a time.
+    Each chunk is then scanned on its own and the scanned part of the open
+    cell is kept as a list, joined once when the cell is decoded. Decoded
+    cells are not kept either: `feed` and `finish` return each cell once.
+    """
+
+    def __init__(self, *, decode_payload: bool = True) -> None:
+        self.cells: list[dict[str, Any]] = []
+        self.payload: Any | None = None
+        self._decode_payload = decode_payload
+        self._text = ""
+        self._offset = 0
+        self._retained: list[str] = []
+        self._retained_start = 0
+        self._pos = 0
+        self._in_string = False
+        self._stack: list[tuple[str, int]] = []
+        # Open "{" and "[" on the stack, so a closer with no opener is
+        # rejected without scanning the stack.
+        self._open_counts = {"{": 0, "[": 0}
+        # Counts of the openers holding the cells array, once it is found.
+        self._cells_base_counts = {"{": 0, "[": 0}
+        self._cells_depth: int | None = None
+        self._cells_closed = False
+        self._damaged = False
+        self._element_start: int | None = None
+        self._element_last_comma: int | None = None
+
+    @property
+    def done(self) -> bool:
+        return self.payload is not None
+
+    @property
+    def cells_at_root(self) -> bool:
+        return self._cells_depth == 1
+
+    @property
+    def cells_intact(self) -> bool:
+        """The cells array closed, with no stray closer or undecodable cell."""
+        return self._cells_closed and not self._damaged
+
+    def feed(self, text: str) -> list[dict[str, Any]]:
+        if self.done:
+            return []
+        if self._decode_payload:
+            self._text += text
+        else:
+            self._retain_open_cell()
+            self._text = self._text[self._pos - self._offset :] + text
+            self._offset = self._pos
+        first_new_cell = len(self.cells)
+        self._scan()
+        if not self._decode_payload:
+            cells, self.cells = self.cells, []
+            return cells
+        return self.cells[first_new_cell:]
+
+    def finish(self) -> list[dict[str, Any]]:
+        if not self.done and self._element_start is not None:
+            cell = self._salvage_element()
+            if cell is not None:
+                self.cells.append(cell)
+            self._element_start = None
+        return self.cells
+
+    def _retain_open_cell(self) -> None:
+        """Keep the scanned text of the open cell before the next chunk."""
+        start = self._element_start
+        scanned_end = self._pos - self._offset
+        if start is None:
+            self._retained.clear()
+        elif start >= self._offset:
+            self._retained = [self._text[start - self._offset : scanned_end]]
+            self._retained_start = start
+        else:
+            self._retained.append(self._text[:scanned_end])
+
+    def _slice(self, start: int, end: int | None = None) -> str:
+        text, base = self._text, self._offset
+        if start < base:
+            # The open cell began in an earlier chunk.
+            text, base = "".join(self._retained) + text, self._retained_start
+        if end is None:
+            return text[start - base :]
+        return text[start - base : end - base]
+
+    def _scan(self) -> None:
+        text = self._text
+        offset = self._offset
+        stack = self._stack
+        pos = self._pos - offset
+        end = len(text)
+        while pos < end and not self.done:
+            if self._in_string:
+                body = JSON_STRING_BODY_RE.match(text, pos)
+                assert body is not None  # The pattern matches the empty string.
+                pos = body.end()
+                if pos >= end or text[pos] != '"':
+                    # Unterminated, possibly ending in a lone backslash.
+                    break
+                self._in_string = False
+                pos += 1
+                continue
 
-    return f"{truncated[:-1]}]", True
+            match = JSON_STRUCTURAL_RE.search(text, pos)
+            if match is None:
+                pos = end
+                break
+            index = match.start()
+            char = match.group()
+            pos = index + 1
+
+            if char == '"':
+                self._in_string = bool(stack)
+            elif char in "[{":
+                pos = self._open_container(char, index + offset) - offset
+            elif char == ",":
+                if (
+                    self._element_start is not None
+                    and len(stack) == (self._cells_depth or 0) + 1
+                ):
+                    self._element_last_comma = index + offset
+            else:
+                self._close_container(char, index + offset)
+        self._pos = pos + offset
+
+    def _open_container(self, char: str, index: int) -> int:
+        stack = self._stack
+        if self._decode_payload and not stack:
+            value, end = self._raw_decode(index)
+            if end is not None:
+                self.payload = value
+                return end
+
+        stack.append((char, index))
+        self._open_counts[char] += 1
+        depth = len(stack)
+        if char != "{" or depth < 2 or stack[-2][0] != "[" or self._cells_closed:
+            return index + 1
+        if self._cells_depth is None:
+            self._cells_depth = depth - 1
+            for open_char, _ in stack[: self._cells_depth]:
+                self._cells_base_counts[open_char] += 1
+        if depth != self._cells_depth + 1:
+            return index + 1
+
+        if self._decode_payload:
+            value, end = self._raw_decode(index)
+            if end is not None:
+                stack.pop()
+                self._open_counts[char] -= 1
+                if isinstance(value, dict):
+                    self.cells.append(value)
+                return end
+        self._element_start = index
+        self._element_last_comma = None
+        return index + 1
+
+    def _close_container(self, char: str, index: int) -> None:
+        stack = self._stack
+        open_counts = self._open_counts
+        opener = "{" if char == "}" else "["
+        if not open_counts[opener] or stack[-1][0] != opener:
+            self._damaged = True
+        if not open_counts[opener]:
+            return
+        if (
+            stack[-1][0] != opener
+            and not self._cells_closed
+            and open_counts[opener] == self._cells_base_counts[opener]
+        ):
+            # A stray closer never closes the cells array.
+            return
+        while stack[-1][0] != opener:
+            open_counts[stack.pop()[0]] -= 1
+        _, start = stack.pop()
+        open_counts[opener] -= 1
+
+        if self._cells_depth is None or self._cells_closed:
+            return
+        if char == "}" and start == self._element_start:
+            self._element_start = None
+            cell = decode_json_object(self._slice(start, index + 1))
+            if cell is not None:
+                self.cells.append(cell)
+            else:
+                self._damaged = True
+        elif len(stack) < self._cells_depth:
+            self._cells_closed = True
+            self._element_start = None
+
+    def _raw_decode(self, index: int) -> tuple[Any, int | None]:
+        try:
+            value, end = JSON_DECODER.raw_decode(self._text, index - self._offset)
+        except json.JSONDecodeError:
+            return None, None
+        return value, end + self._offset
+
+    def _salvage_element(self) -> dict[str, Any] | None:
+        assert self._element_start is not None and self._cells_depth is not None
+        if self._in_string:
+            # Keep a cut-off text value; any other partial member is dropped.
+            tail = self._slice(self._element_start, self._pos)
+            closing = '"' + "".join(
+                "}" if open_char == "{" else "]"
+                for open_char, _ in reversed(self._stack[self._cells_depth :])
+            )
+            cell = decode_json_object(f"{tail}{closing}")
+            if cell and list(cell)[-1] in SALVAGEABLE_LAYOUT_TEXT_KEYS:
+                return cell
+        if self._element_last_comma is None:
+            return None
+        return decode_json_object(
+            f"{self._slice(self._element_start, self._element_last_comma)}}}"
+        )
+
+
+def decode_json_object(text: str) -> dict[str, Any] | None:
+    try:
+        value = json.loads(text)
+    except json.JSONDecodeError:
+        return None
+    return value if isinstance(value, dict) else None
+
+
+class LayoutCellStream:
+    """Turn streamed layout JSON into Markdown one completed cell at a time.
+
+    `finish` returns None unless the stream held a well-formed top-level
+    array of cells, so the caller parses the whole response instead and a
+    damaged or truncated response is recovered exactly as `parse` would.
+    """
+
+    def __init__(
+        self,
+        cell_markdown: Callable[[LayoutCell], str],
+        metadata: Callable[[Sequence[LayoutCell]], PageMetadata],
+        *,
+        extract_svg: bool = True,
+    ) -> None:
+        self.cells: list[LayoutCell] = []
+        self._cell_markdown = cell_markdown
+        self._metadata = metadata
+        self._extract_svg = extract_svg
+        self._scanner = LayoutJsonScanner(decode_payload=False)
+        self._chunks: list[str] = []
+
+    def feed(self, text: str) -> None:
+        self._add_cells(self._scanner.feed(text))
+
+    def finish(self) -> tuple[PageMetadata, str] | None:
+        self._add_cells(self._scanner.finish())
+        scanner = self._scanner
+        if not self.cells or not scanner.cells_at_root or not scanner.cells_intact:
+            return None
+        return self._metadata(self.cells), join_cell_markdown(self._chunks)
+
+    def _add_cells(self, values: list[dict[str, Any]]) -> None:
+        for value in values:
+            cell = layout_cell_from_json(value, extract_svg=self._extract_svg)
+            self.cells.append(cell)
+            self._chunks.append(self._cell_markdown(cell))
+
+
+class SvgResponseStream:
+    """Recover the SVG document of a streamed svg response as it arrives."""
+
+    def __init__(
+        self, *, max_bytes: int | None = None, minify_paths: bool = False
+    ) -> None:
+        self._scanner = SvgScanner(max_bytes=max_bytes, minify_paths=minify_paths)
+
+    def feed(self, text: str) -> None:
+        self._scanner.feed(text)
+
+    def finish(self) -> tuple[PageMetadata, str] | None:
+        svg = self._scanner.finish()
+        if svg is None:
+            return None
+        return default_metadata(svg), svg
 
 
 def layout_cells_from_json(value: Any) -> list[dict[str, Any]] | None:
@@ -399,52 +727,58 @@ def is_layout_cell(value: dict[str, Any]) -> bool:
     return "category" in value or "bbox" in value or "text" in value
 
 
-def layout_cells_to_markdown(cells: list[dict[str, Any]]) -> str:
-    chunks: list[str] = []
-    for cell in cells:
-        category = str(cell.get("category", "") or "").strip()
-        text = clean_cell_text(cell.get("text", cell.get("content", "")))
+def layout_cell_from_json(
+    value: dict[str, Any], *, extract_svg: bool = True
+) -> LayoutCell:
+    category = value.get("category")
+    category, category_key = layout_category(
+        category if type(category) is str else str(category or "")
+    )
+    text = value["text"] if "text" in value else value.get("content")
+    svg = None
+    if extract_svg and category == "Picture":
+        svg = extract_svg_from_cell(value)
+    return LayoutCell(
+        category,
+        category_key,
+        clean_cell_text(text),
+        parse_bbox(value.get("bbox")),
+        svg,
+    )
 
-        if category == "Picture":
-            svg = extract_svg_from_cell(cell)
-            if svg:
-                chunks.append(svg)
-                continue
 
-            placeholder = picture_placeholder(cell)
-            if placeholder:
-                chunks.append(placeholder)
-            continue
+@functools.lru_cache(maxsize=1024)
+def layout_category(value: str) -> tuple[str, str]:
+    category = sys.intern(value.strip())
+    return category, sys.intern(category.lower())
 
-        if category == "Formula" and text:
-            chunks.append(format_formula_markdown(text))
-            continue
 
-        if text:
-            chunks.append(text)
+def layout_cells_to_markdown(cells: Iterable[LayoutCell]) -> str:
+    return join_cell_markdown(layout_cell_markdown(cell) for cell in cells)
 
-    return "\n\n".join(chunks).strip()
 
+def layout_cell_markdown(cell: LayoutCell) -> str:
+    if cell.category == "Picture":
+        return cell.svg or picture_placeholder(cell.bbox)
+    if cell.category == "Formula" and cell.text:
+        return format_formula_markdown(cell.text)
+    return cell.text
 
-def infinity_layout_cells_to_markdown(cells: list[dict[str, Any]]) -> str:
-    chunks: list[str] = []
-    for cell in cells:
-        category = str(cell.get("category", "") or "").strip().lower()
-        if category in {"header", "footer", "page_footnote"}:
-            continue
 
-        text = clean_cell_text(cell.get("text", cell.get("content", "")))
-        if category == "figure" and not text:
-            continue
+def infinity_layout_cells_to_markdown(cells: Iterable[LayoutCell]) -> str:
+    return join_cell_markdown(infinity_layout_cell_markdown(cell) for cell in cells)
 
-        if category == "formula" and text:
-            chunks.append(format_formula_markdown(text))
-            continue
 
-        if text:
-            chunks.append(text)
+def infinity_layout_cell_markdown(cell: LayoutCell) -> str:
+    if cell.category_key in INFINITY_PAGE_FURNITURE:
+        return ""
+    if cell.category_key == "formula" and cell.text:
+        return format_formula_markdown(cell.text)
+    return cell.text
+
 
-    return "\n\n".join(chunks).strip()
+def join_cell_markdown(chunks: Iterable[str]) -> str:
+    return "\n\n".join(chunk for chunk in chunks if chunk).strip()
 
 
 def extract_svg_from_cell(cell: dict[str, Any]) -> str | None:
@@ -466,7 +800,7 @@ def extract_svg_from_cell(cell: dict[str, Any]) -> str | None:
 
 def extract_svg_from_value(value: Any) -> str | None:
     if isinstance(value, str):
-        return extract_svg_fragment(value)
+        return extract_svg_document(value)
     if isinstance(value, dict):
         for nested in value.values():
             svg = extract_svg_from_value(nested)
@@ -480,51 +814,19 @@ def extract_svg_from_value(value: Any) -> str | None:
     return None
 
 
-def extract_svg_fragment(text: str) -> str | None:
-    candidate = strip_outer_code_fence(text).strip()
-    if candidate.lower().startswith("svg:"):
-        candidate = candidate[4:].strip()
-
-    full_match = re.search(r"<svg\b[^>]*>.*?</svg>", candidate, re.DOTALL | re.I)
-    if full_match:
-        return full_match.group(0).strip()
-
-    partial_match = re.search(r"<svg\b[^>]*>.*", candidate, re.DOTALL | re.I)
-    if partial_match:
-        return close_svg_fragment(partial_match.group(0)).strip()
-    return None
-
-
-def close_svg_fragment(svg: str) -> str:
-    tag_names = re.findall(r"<([a-zA-Z][\w:-]*)\b[^>/]*>", svg)
-    closed_names = re.findall(r"</([a-zA-Z][\w:-]*)\s*>", svg)
-    if not tag_names or tag_names[0].lower() != "svg":
-        return svg
-
-    open_stack = [name for name in tag_names]
-    for name in closed_names:
-        lower_name = name.lower()
-        while open_stack and open_stack[-1].lower() != lower_name:
-            open_stack.pop()
-        if open_stack:
-            open_stack.pop()
-
-    while open_stack:
-        svg += f"</{open_stack.pop()}>"
-    return svg
-
-
 def clean_cell_text(value: Any) -> str:
-    if value is None:
+    if type(value) is str:
+        text = value.strip()
+    elif value is None:
         return ""
-    text = str(value).strip()
+    else:
+        text = str(value).strip()
     if text.startswith("`$") and text.endswith("$`"):
         text = text[1:-1]
     return text
 
 
-def picture_placeholder(cell: dict[str, Any]) -> str | None:
-    bbox = parse_bbox(cell.get("bbox"))
+def picture_placeholder(bbox: tuple[int, int, int, int] | None) -> str:
     if bbox is None:
         return "![Picture](image.png)"
 
@@ -537,6 +839,9 @@ def picture_placeholder(cell: dict[str, Any]) -> str | None:
 def parse_bbox(value: Any) -> tuple[int, int, int, int] | None:
     if not isinstance(value, list) or len(value) != 4:
         return None
+    x1, y1, x2, y2 = value
+    if type(x1) is int and type(y1) is int and type(x2) is int and type(y2) is int:
+        return x1, y1, x2, y2
     try:
         x1, y1, x2, y2 = (int(float(coord)) for coord in value)
     except (TypeError, ValueError):
@@ -552,54 +857,48 @@ def format_formula_markdown(text: str) -> str:
         return stripped
     if stripped.startswith("\\[") and stripped.endswith("\\]"):
         return f"$$\n{stripped[2:-2].strip()}\n$$"
-    if re.search(r"\$[^$\n]+?\$", stripped) or re.search(r"\\\(.*?\\\)", stripped):
+    if INLINE_MATH_RE.search(stripped):
         return stripped
     if "\\" in stripped:
         return f"$$\n{stripped}\n$$"
     return stripped
 
 
-def layout_metadata(cells: list[dict[str, Any]]) -> PageMetadata:
-    categories = [
-        str(cell.get("category", "") or "").strip()
-        for cell in cells
-        if isinstance(cell, dict)
-    ]
-    content_categories = [
-        category
-        for category in categories
-        if category and category not in {"Page-header", "Page-footer"}
-    ]
-    table_count = sum(category == "Table" for category in content_categories)
-    picture_count = sum(category == "Picture" for category in content_categories)
-    content_count = len(content_categories)
-    is_table = table_count > 0 and table_count >= max(1, content_count // 2)
-    is_diagram = picture_count > 0 and picture_count >= max(1, content_count // 2)
-    return PageMetadata(
-        primary_language=None,
-        is_rotation_valid=True,
-        rotation_correction=0,
-        is_table=is_table,
-        is_diagram=is_diagram,
+def layout_metadata(cells: Sequence[LayoutCell]) -> PageMetadata:
+    return layout_category_metadata(
+        [cell.category for cell in cells],
+        page_furniture=DOTS_PAGE_FURNITURE,
+        table="Table",
+        diagram="Picture",
     )
 
 
-def infinity_layout_metadata(cells: list[dict[str, Any]]) -> PageMetadata:
-    categories = [
-        str(cell.get("category", "") or "").strip().lower()
-        for cell in cells
-        if isinstance(cell, dict)
-    ]
+def infinity_layout_metadata(cells: Sequence[LayoutCell]) -> PageMetadata:
+    return layout_category_metadata(
+        [cell.category_key for cell in cells],
+        page_furniture=INFINITY_PAGE_FURNITURE,
+        table="table",
+        diagram="figure",
+    )
+
+
+def layout_category_metadata(
+    categories: list[str],
+    *,
+    page_furniture: frozenset[str],
+    table: str,
+    diagram: str,
+) -> PageMetadata:
     content_categories = [
         category
         for category in categories
-        if category and category not in {"header", "footer", "page_footnote"}
+        if category and category not in page_furniture
     ]
-    table_count = sum(category == "table" for category in content_categories)
-    figure_count = sum(category == "figure" for category in content_categories)
+    table_count = content_categories.count(table)
+    diagram_count = content_categories.count(diagram)
     content_count = len(content_categories)
     is_table = table_count > 0 and table_count >= max(1, content_count // 2)
-    is_diagram = figure_count > 0 and figure_count >= max(1, content_count // 2)
+    is_diagram = diagram_count > 0 and diagram_count >= max(1, content_count // 2)
     return PageMetadata(
         primary_language=None,
         is_rotation_valid=True,
@@ -652,7 +951,7 @@ def parse_bool(value: str | None, *, default: bool) -> bool:
 def parse_rotation(value: str | None) -> int:
     if value is None:
         return 0
-    match = re.search(r"\d+", value)
+    match = DIGITS_RE.search(value)
     if not match:
         return 0
     rotation = int(match.group(0)) % 360
@@ -683,3 +982,54 @@ def default_metadata(markdown: str) -> PageMetadata:
         is_table=False,
         is_diagram=False,
     )
+
+
+def svg_page_parser(
+    *, max_bytes: int | None = None, minify_paths: bool = False
+) -> PageParser:
+    return PageParser(
+        "svg",
+        functools.partial(
+            parse_svg_response, max_bytes=max_bytes, minify_paths=minify_paths
+        ),
+        functools.partial(
+            SvgResponseStream, max_bytes=max_bytes, minify_paths=minify_paths
+        ),
+    )
+
+
+MARKDOWN_PARSER = PageParser("markdown", parse_markdown_response)
+DOTS_LAYOUT_JSON_PARSER = PageParser(
+    "dots_layout_json",
+    parse_dots_layout_json_response,
+    functools.partial(LayoutCellStream, layout_cell_markdown, layout_metadata),
+)
+INFINITY_LAYOUT_JSON_PARSER = PageParser(
+    "infinity_layout_json",
+    parse_infinity_layout_json_response,
+    functools.partial(
+        LayoutCellStream,
+        infinity_layout_cell_markdown,
+        infinity_layout_metadata,
+        extract_svg=False,
+    ),
+)
+CHANDRA_HTML_PARSER = PageParser("chandra_html", parse_chandra_html_response)
+DEEPSEEK_MARKDOWN_PARSER = PageParser(
+    "deepseek_markdown", parse_deepseek_markdown_response
+)
+UNLIMITED_OCR_PARSER = PageParser("unlimited_ocr", parse_unlimited_ocr_response)
+SVG_PARSER = svg_page_parser()
+
+RESPONSE_PARSERS: dict[str, PageParser] = {
+    parser.name: parser
+    for parser in (
+        MARKDOWN_PARSER,
+        DOTS_LAYOUT_JSON_PARSER,
+        INFINITY_LAYOUT_JSON_PARSER,
+        CHANDRA_HTML_PARSER,
+        DEEPSEEK_MARKDOWN_PARSER,
+        UNLIMITED_OCR_PARSER,
+        SVG_PARSER,
+    )
+}
@@ -3,12 +3,13 @@ from __future__ import annotations
 import base64
 import io
 import math
+import time
 from pathlib import Path
 
 import pymupdf
 from PIL import Image
 
-from paper_xyz.types import ImageRenderProfile, RenderedPage
+from paper_xyz.types import ImageRenderProfile, PageTimings, RenderedPage
 
 RESAMPLE_BY_NAME = {
     "bicubic": Image.Resampling.BICUBIC,
@@ -19,6 +20,12 @@ MIME_TYPE_BY_IMAGE_FORMAT = {
     "JPEG": "image/jpeg",
     "WEBP": "image/webp",
 }
+# Rough upper bounds for encoded page images, in bytes per RGB pixel.
+ENCODED_BYTES_PER_PIXEL = {
+    "PNG": 1.5,
+    "JPEG": 0.5,
+    "WEBP": 0.5,
+}
 
 
 def get_page_count(pdf_path: str | Path) -> int:
@@ -29,6 +36,23 @@ def get_page_count(pdf_path: str | Path) -> int:
         document.close()
 
 
+def get_page_sizes(
+    pdf_path: str | Path,
+    *,
+    start_page: int,
+    end_page: int,
+) -> dict[int, tuple[float, float]]:
+    document = pymupdf.open(pdf_path)
+    try:
+        sizes: dict[int, tuple[float, float]] = {}
+        for page_index in range(start_page, end_page + 1):
+            rect = document.load_page(page_index).rect
+            sizes[page_index] = (rect.width, rect.height)
+        return sizes
+    finally:
+        document.close()
+
+
 def resolve_page_range(
     *,
     page_count: int,
@@ -79,10 +103,12 @@ def render_page_image(
     *,
     profile: ImageRenderProfile,
     rotation: int = 0,
+    timings: PageTimings | None = None,
 ) -> RenderedPage:
     if rotation not in {0, 90, 180, 270}:
         raise ValueError("rotation must be one of 0, 90, 180, or 270")
 
+    started = time.perf_counter()
     document = pymupdf.open(pdf_path)
     try:
         page = document.load_page(page_index)
@@ -91,10 +117,14 @@ def render_page_image(
         pixmap = page.get_pixmap(matrix=matrix, alpha=False)
         image = Image.frombytes("RGB", (pixmap.width, pixmap.height), pixmap.samples)
         image = resize_image_for_profile(image, profile)
-        image_bytes = encode_image(image, profile)
+        encode_started = time.perf_counter()
+        image_base64 = base64.b64encode(encode_image(image, profile)).decode("ascii")
+        if timings is not None:
+            timings.render_seconds += encode_started - started
+            timings.encode_seconds += time.perf_counter() - encode_started
         return RenderedPage(
             page_index=page_index,
-            image_base64=base64.b64encode(image_bytes).decode("ascii"),
+            image_base64=image_base64,
             width=image.width,
             height=image.height,
             rotation=rotation,
@@ -105,8 +135,12 @@ def render_page_image(
 
 
 def page_render_scale(page: pymupdf.Page, profile: ImageRenderProfile) -> float:
-    page_width = page.rect.width
-    page_height = page.rect.height
+    return render_scale(page.rect.width, page.rect.height, profile)
+
+
+def render_scale(
+    page_width: float, page_height: float, profile: ImageRenderProfile
+) -> float:
     if page_width <= 0 or page_height <= 0:
         raise ValueError("PDF page has invalid dimensions")
 
@@ -142,24 +176,64 @@ def resize_image_for_profile(
     if profile.resize_factor is None:
         raise ValueError("resize_factor must be set when pixel bounds are used")
 
-    if profile.resize_strategy == "chandra":
-        width, height = chandra_resize_size(image, profile)
-    else:
-        width, height = smart_resize_size(image, profile)
-
+    width, height = resized_image_size(image.size, profile)
     if (width, height) == image.size:
         return image
     return image.resize((width, height), RESAMPLE_BY_NAME[profile.resample])
 
 
+def resized_image_size(
+    size: tuple[int, int], profile: ImageRenderProfile
+) -> tuple[int, int]:
+    if (
+        profile.resize_factor is None
+        and profile.min_pixels is None
+        and profile.max_pixels is None
+    ):
+        return size
+    if profile.resize_strategy == "chandra":
+        return chandra_resize_size(size, profile)
+    return smart_resize_size(size, profile)
+
+
+def estimate_page_image_size(
+    page_width: float,
+    page_height: float,
+    profile: ImageRenderProfile,
+) -> tuple[tuple[int, int], tuple[int, int]]:
+    scale = render_scale(page_width, page_height, profile)
+    rendered_size = (
+        max(1, math.ceil(page_width * scale)),
+        max(1, math.ceil(page_height * scale)),
+    )
+    return rendered_size, resized_image_size(rendered_size, profile)
+
+
+def estimate_render_bytes(
+    page_width: float,
+    page_height: float,
+    profile: ImageRenderProfile,
+) -> int:
+    (rendered_width, rendered_height), (width, height) = estimate_page_image_size(
+        page_width, page_height, profile
+    )
+    # Pixmap samples plus the PIL copy made from them.
+    decoded = 2 * rendered_width * rendered_height * 3
+    if (width, height) != (rendered_width, rendered_height):
+        decoded += width * height * 3
+    encoded = width * height * ENCODED_BYTES_PER_PIXEL[profile.image_format]
+    # Encoded bytes, their base64 copy, and the base64 copy in the JSON body.
+    return int(decoded + encoded * (1 + 2 * 4 / 3))
+
+
 def smart_resize_size(
-    image: Image.Image, profile: ImageRenderProfile
+    size: tuple[int, int], profile: ImageRenderProfile
 ) -> tuple[int, int]:
     factor = profile.resize_factor
     if factor is None:
-        return image.size
+        return size
 
-    width, height = image.size
+    width, height = size
     width_bar = max(factor, round_by_factor(width, factor))
     height_bar = max(factor, round_by_factor(height, factor))
 
@@ -196,15 +270,15 @@ def smart_resize_size(
 
 
 def chandra_resize_size(
-    image: Image.Image, profile: ImageRenderProfile
+    size: tuple[int, int], profile: ImageRenderProfile
 ) -> tuple[int, int]:
     factor = profile.resize_factor
     if factor is None:
-        return image.size
+        return size
 
-    width, height = image.size
+    width, height = size
     if width <= 0 or height <= 0:
-        return image.size
+        return size
 
     current_pixels = width * height
     scale = 1.0
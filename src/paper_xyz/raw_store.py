@@ -0,0 +1,129 @@
+from __future__ import annotations
+
+import gzip
+import json
+import os
+import tempfile
+from collections.abc import Iterator
+from pathlib import Path
+from types import TracebackType
+from typing import Any, BinaryIO
+
+from paper_xyz.types import RawResponseRef
+from paper_xyz.writer import published_file_mode
+
+RAW_RESPONSE_SUFFIX = ".raw.jsonl.gz"
+
+
+def raw_response_sidecar_path(output_markdown_path: str | Path) -> Path:
+    markdown_path = Path(output_markdown_path)
+    return markdown_path.with_name(f"{markdown_path.stem}{RAW_RESPONSE_SUFFIX}")
+
+
+class RawResponseSpillFile:
+    """Append-only sidecar of raw model responses.
+
+    Every record is one JSON line compressed as its own gzip member, so a
+    single record can be read back from its offset, and the whole file is
+    still a valid `.jsonl.gz` that `gzip.open` reads line by line. The first
+    record describes the conversion; page records carry a `page_index`.
+
+    Records go to a temporary file that replaces `path` only on `close`, so
+    a failed run keeps the previous sidecar. Returned refs point at `path`.
+    """
+
+    def __init__(self, path: str | Path, *, compresslevel: int = 6) -> None:
+        self.path = Path(path)
+        self.compresslevel = compresslevel
+        self._file: BinaryIO | None = None
+        self._temp_path: Path | None = None
+        self._offset = 0
+
+    def __enter__(self) -> RawResponseSpillFile:
+        self.open()
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+    def open(self) -> None:
+        if self._file is not None:
+            raise RuntimeError("spill file is already open")
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        fd, temp_name = tempfile.mkstemp(
+            prefix=f".{self.path.name}.", suffix=".tmp", dir=self.path.parent
+        )
+        self._temp_path = Path(temp_name)
+        self._file = os.fdopen(fd, "wb")
+        self._offset = 0
+
+    def close(self) -> None:
+        if self._file is None or self._temp_path is None:
+            return
+        self._file.close()
+        os.chmod(self._temp_path, published_file_mode(self.path))
+        os.replace(self._temp_path, self.path)
+        self._file = None
+        self._temp_path = None
+
+    def abort(self) -> None:
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        if self._temp_path is not None:
+            self._temp_path.unlink(missing_ok=True)
+            self._temp_path = None
+
+    def append(self, record: dict[str, Any]) -> RawResponseRef:
+        if self._file is None:
+            raise RuntimeError("spill file is not open")
+        line = json.dumps(record, ensure_ascii=False) + "\n"
+        member = gzip.compress(line.encode("utf-8"), compresslevel=self.compresslevel)
+        self._file.write(member)
+        self._file.flush()
+        ref = RawResponseRef(
+            path=str(self.path), offset=self._offset, length=len(member)
+        )
+        self._offset += len(member)
+        return ref
+
+
+def read_raw_response_record(ref: RawResponseRef) -> dict[str, Any]:
+    with open(ref.path, "rb") as file:
+        file.seek(ref.offset)
+        member = file.read(ref.length)
+    if len(member) != ref.length:
+        raise ValueError(f"Truncated raw response record in {ref.path}")
+    return json.loads(gzip.decompress(member))
+
+
+def read_raw_response(ref: RawResponseRef) -> str:
+    return str(read_raw_response_record(ref).get("raw_response", ""))
+
+
+def iter_raw_response_records(path: str | Path) -> Iterator[dict[str, Any]]:
+    with gzip.open(path, "rt", encoding="utf-8") as file:
+        for line in file:
+            if line.strip():
+                yield json.loads(line)
+
+
+def load_raw_response_sidecar(
+    path: str | Path,
+) -> tuple[dict[str, Any], dict[int, dict[str, Any]]]:
+    header: dict[str, Any] = {}
+    pages: dict[int, dict[str, Any]] = {}
+    for record in iter_raw_response_records(path):
+        if "page_index" in record:
+            pages[int(record["page_index"])] = record
+        elif not header:
+            header = record
+    return header, pages
@@ -0,0 +1,209 @@
+from __future__ import annotations
+
+import dataclasses
+import logging
+from pathlib import Path
+from typing import Any
+
+from paper_xyz.converter import (
+    ConversionStats,
+    build_failed_page_result,
+    build_partial_page_result,
+    document_page_markdown,
+    format_exception,
+    page_wants_images,
+    summarize_page_results,
+)
+from paper_xyz.images import extract_document_images
+from paper_xyz.parsing import PageParser, parse_page_response, svg_page_parser
+from paper_xyz.raw_store import RAW_RESPONSE_SUFFIX, load_raw_response_sidecar
+from paper_xyz.types import (
+    ImageExtractionConfig,
+    PageResult,
+    ResponseParser,
+    TokenUsage,
+)
+from paper_xyz.writer import OrderedMarkdownWriter
+
+logger = logging.getLogger(__name__)
+
+
+def default_reparse_output_path(sidecar_path: str | Path) -> Path:
+    path = Path(sidecar_path)
+    if not path.name.endswith(RAW_RESPONSE_SUFFIX):
+        raise ValueError(f"Raw response sidecar must end with {RAW_RESPONSE_SUFFIX}")
+    return path.with_name(f"{path.name.removesuffix(RAW_RESPONSE_SUFFIX)}.md")
+
+
+def sidecar_response_parser(
+    name: ResponseParser,
+    header: dict[str, Any],
+    *,
+    svg_max_bytes: int | None = None,
+    svg_minify_paths: bool | None = None,
+) -> ResponseParser | PageParser:
+    if name != "svg":
+        return name
+    return svg_page_parser(
+        max_bytes=(
+            header.get("svg_max_bytes") if svg_max_bytes is None else svg_max_bytes
+        ),
+        minify_paths=bool(
+            header.get("svg_minify_paths", False)
+            if svg_minify_paths is None
+            else svg_minify_paths
+        ),
+    )
+
+
+def reparse_page_record(
+    record: dict[str, Any],
+    *,
+    response_parser: ResponseParser | PageParser,
+) -> PageResult:
+    page_index = int(record["page_index"])
+    attempts = int(record.get("attempts", 1) or 1)
+    applied_rotation = int(record.get("applied_rotation", 0) or 0)
+    image_width = int(record.get("image_width", 0) or 0)
+    image_height = int(record.get("image_height", 0) or 0)
+    usage = TokenUsage(
+        prompt_tokens=int(record.get("prompt_tokens", 0) or 0),
+        cached_prompt_tokens=int(record.get("cached_prompt_tokens", 0) or 0),
+        completion_tokens=int(record.get("completion_tokens", 0) or 0),
+    )
+    raw_response = str(record.get("raw_response") or "")
+    error = record.get("error")
+    if error is not None and not raw_response:
+        return build_failed_page_result(
+            page_index=page_index,
+            attempts=attempts,
+            applied_rotation=applied_rotation,
+            image_width=image_width,
+            image_height=image_height,
+            usage=usage,
+            error=str(error),
+        )
+
+    metadata, markdown = parse_page_response(
+        raw_response, response_parser=response_parser
+    )
+    if error is not None:
+        # Partial output of an interrupted stream, kept as convert kept it.
+        return build_partial_page_result(
+            page_index=page_index,
+            metadata=metadata,
+            markdown=markdown,
+            raw_response="",
+            attempts=attempts,
+            applied_rotation=applied_rotation,
+            image_width=image_width,
+            image_height=image_height,
+            usage=usage,
+            error=str(error),
+        )
+    return PageResult(
+        page_index=page_index,
+        metadata=metadata,
+        markdown=markdown,
+        raw_response="",
+        usage=usage,
+        attempts=attempts,
+        applied_rotation=applied_rotation,
+        image_width=image_width,
+        image_height=image_height,
+    )
+
+
+def reparse_document(
+    sidecar_path: str | Path,
+    output_path: str | Path | None = None,
+    *,
+    response_parser: ResponseParser | None = None,
+    include_page_numbers: bool | None = None,
+    extract_images: bool | None = None,
+    pdf_path: str | Path | None = None,
+    svg_max_bytes: int | None = None,
+    svg_minify_paths: bool | None = None,
+) -> ConversionStats:
+    header, records = load_raw_response_sidecar(sidecar_path)
+    if not records:
+        raise ValueError(f"No page records in {sidecar_path}")
+
+    markdown_path = (
+        Path(output_path)
+        if output_path is not None
+        else default_reparse_output_path(sidecar_path)
+    )
+    include_page_numbers = (
+        bool(header.get("include_page_numbers", False))
+        if include_page_numbers is None
+        else include_page_numbers
+    )
+    image_config = ImageExtractionConfig(**header.get("image_extraction", {}))
+    if extract_images is not None:
+        image_config = dataclasses.replace(image_config, enabled=extract_images)
+
+    page_results: list[PageResult] = []
+    for page_index in sorted(records):
+        record = records[page_index]
+        parser = sidecar_response_parser(
+            response_parser
+            or record.get("response_parser")
+            or header.get("response_parser")
+            or "markdown",
+            header,
+            svg_max_bytes=svg_max_bytes,
+            svg_minify_paths=svg_minify_paths,
+        )
+        try:
+            page_results.append(reparse_page_record(record, response_parser=parser))
+        except ValueError as exc:
+            logger.warning("page=%s reparse failed: %s", page_index, exc)
+            page_results.append(
+                build_failed_page_result(
+                    page_index=page_index,
+                    attempts=int(record.get("attempts", 1) or 1),
+                    applied_rotation=int(record.get("applied_rotation", 0) or 0),
+                    image_width=int(record.get("image_width", 0) or 0),
+                    image_height=int(record.get("image_height", 0) or 0),
+                    usage=TokenUsage(),
+                    error=format_exception(exc),
+                )
+            )
+
+    start_page = int(header.get("start_page", page_results[0].page_index))
+    end_page = int(header.get("end_page", page_results[-1].page_index))
+    if image_config.enabled:
+        source_pdf = pdf_path or header.get("pdf_path")
+        if not source_pdf or not Path(source_pdf).is_file():
+            raise ValueError(
+                f"Image extraction needs the source PDF, not found: {source_pdf}"
+            )
+        images_by_page = extract_document_images(
+            source_pdf,
+            markdown_path,
+            start_page=start_page,
+            end_page=end_page,
+            config=image_config,
+            wanted_pages={
+                page_result.page_index
+                for page_result in page_results
+                if page_wants_images(page_result)
+            },
+        )
+        for page_result in page_results:
+            page_result.extracted_images = images_by_page.get(
+                page_result.page_index, ()
+            )
+
+    with OrderedMarkdownWriter(markdown_path, first_page_index=start_page) as writer:
+        for page_result in page_results:
+            writer.add(
+                page_result.page_index,
+                document_page_markdown(
+                    page_result,
+                    include_page_numbers=include_page_numbers,
+                    resolve_images=image_config.enabled,
+                ),
+            )
+    return summarize_page_results(page_results, chars=writer.chars)
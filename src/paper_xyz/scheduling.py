@@ -0,0 +1,129 @@
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import math
+from collections import deque
+from collections.abc import AsyncIterator
+from typing import Any
+
+from paper_xyz.api import ChatRequestConfig
+from paper_xyz.pdf import estimate_page_image_size
+from paper_xyz.types import ImageRenderProfile
+
+# Patch size assumed when a profile does not pin one, as in Qwen2-VL style
+# encoders: 14px patches merged 2x2 into one token.
+DEFAULT_IMAGE_TOKEN_PATCH = 28
+# Rough characters per prompt text token.
+PROMPT_CHARS_PER_TOKEN = 4
+
+
+class WeightedSemaphore:
+    """Admit work by weight against a fixed capacity, in FIFO order.
+
+    A request heavier than the whole capacity is clamped to it, so it still
+    runs, but alone. FIFO admission keeps heavy requests from starving behind
+    a stream of light ones. `max_holders` optionally also caps how many
+    requests are admitted at once, whatever their weight.
+    """
+
+    def __init__(self, capacity: int, *, max_holders: int | None = None) -> None:
+        if capacity < 1:
+            raise ValueError("capacity must be >= 1")
+        if max_holders is not None and max_holders < 1:
+            raise ValueError("max_holders must be >= 1")
+        self.capacity = capacity
+        self.max_holders = max_holders
+        self.in_use = 0
+        self.holders = 0
+        self._waiters: deque[tuple[int, asyncio.Future[None]]] = deque()
+
+    def clamp(self, weight: int) -> int:
+        return min(max(weight, 0), self.capacity)
+
+    async def acquire(self, weight: int) -> int:
+        weight = self.clamp(weight)
+        if not self._waiters and self._fits(weight):
+            self._take(weight)
+            return weight
+
+        future: asyncio.Future[None] = asyncio.get_running_loop().create_future()
+        waiter = (weight, future)
+        self._waiters.append(waiter)
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                self.release(weight)
+            else:
+                # A release may already have dropped the cancelled waiter.
+                with contextlib.suppress(ValueError):
+                    self._waiters.remove(waiter)
+                self._wake_waiters()
+            raise
+        return weight
+
+    def release(self, weight: int) -> None:
+        self.in_use -= weight
+        self.holders -= 1
+        if self.in_use < 0 or self.holders < 0:
+            raise RuntimeError("WeightedSemaphore released more than acquired")
+        self._wake_waiters()
+
+    @contextlib.asynccontextmanager
+    async def hold(self, weight: int) -> AsyncIterator[int]:
+        acquired = await self.acquire(weight)
+        try:
+            yield acquired
+        finally:
+            self.release(acquired)
+
+    def _fits(self, weight: int) -> bool:
+        if self.max_holders is not None and self.holders >= self.max_holders:
+            return False
+        return self.in_use + weight <= self.capacity
+
+    def _take(self, weight: int) -> None:
+        self.in_use += weight
+        self.holders += 1
+
+    def _wake_waiters(self) -> None:
+        while self._waiters and self._fits(self._waiters[0][0]):
+            weight, future = self._waiters.popleft()
+            if future.done():
+                continue
+            self._take(weight)
+            future.set_result(None)
+
+
+def weighted_permit(
+    semaphore: WeightedSemaphore | None, weight: int
+) -> contextlib.AbstractAsyncContextManager[Any]:
+    if semaphore is None:
+        return contextlib.nullcontext()
+    return semaphore.hold(weight)
+
+
+def estimate_prompt_tokens(
+    page_width: float,
+    page_height: float,
+    profile: ImageRenderProfile,
+    request_config: ChatRequestConfig,
+) -> int:
+    _, (width, height) = estimate_page_image_size(page_width, page_height, profile)
+    patch = profile.resize_factor or DEFAULT_IMAGE_TOKEN_PATCH
+    image_tokens = math.ceil(width / patch) * math.ceil(height / patch)
+    text = f"{request_config.text_prefix}{request_config.prompt}"
+    return image_tokens + math.ceil(len(text) / PROMPT_CHARS_PER_TOKEN)
+
+
+def estimate_request_tokens(
+    page_width: float,
+    page_height: float,
+    profile: ImageRenderProfile,
+    request_config: ChatRequestConfig,
+) -> int:
+    return (
+        estimate_prompt_tokens(page_width, page_height, profile, request_config)
+        + request_config.max_tokens
+    )
@@ -0,0 +1,253 @@
+from __future__ import annotations
+
+import logging
+import re
+
+logger = logging.getLogger(__name__)
+
+SVG_START_RE = re.compile(r"<svg(?=[\s/>])", re.I)
+# Element tags come first since they are the common case; the other
+# alternatives are comments, CDATA, declarations and processing
+# instructions. A token that does not end in ">" is incomplete: the bare
+# "!--" and "![CDATA[" alternatives only match while the closing delimiter
+# has not arrived.
+SVG_TOKEN_RE = re.compile(
+    r"<(?:(/?)([A-Za-z][\w:.-]*)(?:[^>\"']+|\"[^\"]*\"|'[^']*')*(>)?"
+    r"|!--.*?-->|!\[CDATA\[.*?\]\]>|!--|!\[CDATA\[|[!?][^>]*>?)",
+    re.DOTALL,
+)
+TRAILING_ENTITY_RE = re.compile(r"&#?\w*\Z")
+PATH_DATA_ATTR_RE = re.compile(r"(\sd\s*=\s*)([\"'])(.*?)\2", re.DOTALL)
+PATH_DATA_TOKEN_RE = re.compile(
+    r"[MmZzLlHhVvCcSsQqTtAa]|[-+]?(?:\d+\.?\d*|\.\d+)(?:[eE][-+]?\d+)?"
+)
+PATH_DATA_SEPARATOR_RE = re.compile(r"[\s,]+")
+TAG_QUOTE_OR_END_RE = re.compile(r"[\"'>]")
+# Any "<svg" start could be split across chunks; this much tail is kept.
+SVG_START_TAIL = 4
+
+
+class SvgScanner:
+    """Single-pass scanner that recovers an SVG document from model output.
+
+    Text can be fed in chunks. Text before the first `<svg` start tag is
+    dropped, and input after that element closes is ignored. The scanner
+    tracks the stack of open elements, so `finish` can close a truncated
+    document without rescanning it. An incomplete trailing tag or entity is
+    dropped.
+
+    With `max_bytes`, the document is cut at the last token boundary where
+    it still fits in that many UTF-8 bytes together with its closing tags,
+    and later input is ignored. With `minify_paths`, path data is rewritten
+    losslessly with minimal separators before it is counted.
+    """
+
+    def __init__(
+        self, *, max_bytes: int | None = None, minify_paths: bool = False
+    ) -> None:
+        if max_bytes is not None and max_bytes < 1:
+            raise ValueError("max_bytes must be >= 1")
+        self.max_bytes = max_bytes
+        self.minify_paths = minify_paths
+        self.closed = False
+        self.truncated = False
+        self._started = False
+        self._pending: list[str] = []
+        self._pending_until = ">"
+        self._parts: list[str] = []
+        self._size = 0
+        self._stack: list[str] = []
+        self._closers_size = 0
+
+    @property
+    def done(self) -> bool:
+        return self.closed or self.truncated
+
+    def feed(self, text: str) -> None:
+        if self.done or not text:
+            return
+        if self._started and self._pending and self._tag_continues(text):
+            # Only an incomplete tag is pending, and it cannot end yet.
+            self._pending.append(text)
+            return
+        self._pending.append(text)
+        pending = "".join(self._pending)
+        if not self._started:
+            match = SVG_START_RE.search(pending)
+            if match is None:
+                self._pending = [pending[-SVG_START_TAIL:]]
+                return
+            self._started = True
+            pending = pending[match.start() :]
+        tail = self._scan(pending)
+        self._pending = [tail] if tail else []
+
+    def finish(self) -> str | None:
+        """Return the document scanned so far with open elements closed."""
+        if not self._started or (not self._parts and not self.truncated):
+            return None
+        svg = "".join(self._parts)
+        if self.closed:
+            return svg
+        svg = TRAILING_ENTITY_RE.sub("", svg.rstrip())
+        if svg.endswith("\n```"):
+            svg = svg[:-4].rstrip()
+        if self.truncated:
+            logger.warning(
+                "svg cut to %s bytes (max_bytes=%s)", self._size, self.max_bytes
+            )
+        return svg + "".join(f"</{name}>" for name in reversed(self._stack))
+
+    def _tag_continues(self, text: str) -> bool:
+        """Return whether the pending tag is still incomplete after `text`.
+
+        Only `text` is searched. Inside a quoted value the quotes of the
+        following values are followed too, so a tag with many attributes is
+        not rescanned at every closing quote.
+        """
+        until = self._pending_until
+        index = text.find(until)
+        if index < 0:
+            return True
+        if until == ">":
+            return False
+        while (match := TAG_QUOTE_OR_END_RE.search(text, index + 1)) is not None:
+            quote = match.group()
+            if quote == ">":
+                return False
+            index = text.find(quote, match.end())
+            if index < 0:
+                self._pending_until = quote
+                return True
+        self._pending_until = ">"
+        return True
+
+    def _scan(self, text: str) -> str:
+        """Consume complete tokens and return the incomplete tail to keep.
+
+        Accepted text is copied in slices from `region`. Only a byte cap or
+        path minification makes each token be counted or rewritten alone.
+        """
+        stack = self._stack
+        per_token = self.max_bytes is not None or self.minify_paths
+        region = 0
+        end = 0
+        for match in SVG_TOKEN_RE.finditer(text):
+            is_end_tag, name, close = match.groups()
+            start, end = match.span()
+            closers_size = self._closers_size
+            depth = None
+            if name is None:
+                # Comments, CDATA, declarations and processing instructions.
+                if text[end - 1] != ">":
+                    return self._hold(text, region, start, ">")
+            elif close is None:
+                # The tag runs to the end of the text, or into a quoted
+                # value that is not closed yet.
+                until = ">" if end == len(text) else text[end]
+                return self._hold(text, region, start, until)
+            elif is_end_tag:
+                if stack and stack[-1] == name:
+                    depth = len(stack) - 1
+                    closers_size -= len(name) + 3
+                else:
+                    depth = open_element_depth(stack, name)
+                    if depth is not None:
+                        closers_size -= sum(len(tag) + 3 for tag in stack[depth:])
+            elif text[end - 2] != "/":
+                closers_size += len(name) + 3
+
+            if per_token:
+                token = text[start:end]
+                if self.minify_paths and name is not None and not is_end_tag:
+                    token = PATH_DATA_ATTR_RE.sub(minify_path_attr, token)
+                if not self._emit(text[region:start], self._closers_size):
+                    return ""
+                if not self._emit(token, closers_size):
+                    return ""
+                region = end
+
+            if name is not None:
+                if depth is not None:
+                    del stack[depth:]
+                    if not stack:
+                        self.closed = True
+                        self._emit(text[region:end], 0)
+                        return ""
+                elif not is_end_tag and text[end - 2] != "/":
+                    stack.append(name)
+                self._closers_size = closers_size
+
+        tag_start = text.find("<", end)
+        if tag_start >= 0 and ">" not in text[tag_start:]:
+            return self._hold(text, region, tag_start, ">")
+        return self._hold(text, region, len(text), ">")
+
+    def _hold(self, text: str, region: int, stop: int, until: str) -> str:
+        """Accept text up to `stop` and keep the rest until `until` arrives."""
+        if not self._emit(text[region:stop], self._closers_size):
+            return ""
+        self._pending_until = until
+        return text[stop:]
+
+    def _emit(self, chunk: str, closers_size: int) -> bool:
+        if not chunk:
+            return True
+        if self.max_bytes is not None:
+            size = len(chunk) if chunk.isascii() else len(chunk.encode("utf-8"))
+            if self._size + size + closers_size > self.max_bytes:
+                self.truncated = True
+                return False
+            self._size += size
+        self._parts.append(chunk)
+        return True
+
+
+def open_element_depth(stack: list[str], name: str) -> int | None:
+    lower_name = name.lower()
+    for depth in range(len(stack) - 1, -1, -1):
+        if stack[depth].lower() == lower_name:
+            return depth
+    return None
+
+
+def extract_svg_document(
+    text: str, *, max_bytes: int | None = None, minify_paths: bool = False
+) -> str | None:
+    scanner = SvgScanner(max_bytes=max_bytes, minify_paths=minify_paths)
+    scanner.feed(text)
+    return scanner.finish()
+
+
+def minify_path_attr(match: re.Match[str]) -> str:
+    prefix, quote, data = match.groups()
+    return f"{prefix}{quote}{minify_path_data(data)}{quote}"
+
+
+def minify_path_data(data: str) -> str:
+    """Drop redundant separators and trailing decimal zeros from path data.
+
+    Data that does not tokenize cleanly is returned unchanged.
+    """
+    tokens = PATH_DATA_TOKEN_RE.findall(data)
+    if "".join(tokens) != PATH_DATA_SEPARATOR_RE.sub("", data):
+        return data
+
+    parts: list[str] = []
+    previous_is_number = False
+    for token in tokens:
+        is_number = not token.isalpha()
+        if is_number:
+            token = trim_path_number(token)
+            if previous_is_number and not token.startswith(("-", "+")):
+                parts.append(" ")
+        parts.append(token)
+        previous_is_number = is_number
+    return "".join(parts)
+
+
+def trim_path_number(token: str) -> str:
+    if "." not in token or "e" in token or "E" in token:
+        return token
+    token = token.rstrip("0").removesuffix(".")
+    return token if token.lstrip("+-") else "0"
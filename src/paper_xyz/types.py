@@ -1,6 +1,6 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from typing import Literal
 
 ImageFormat = Literal["PNG", "JPEG", "WEBP"]
@@ -15,6 +15,23 @@ ResponseParser = Literal[
     "unlimited_ocr",
     "svg",
 ]
+RawResponsePolicy = Literal["keep", "drop", "spill"]
+ParseExecutor = Literal["inline", "thread", "process"]
+ChandraHtmlBackend = Literal["lxml", "html.parser"]
+PAGE_TIMING_STAGES = (
+    "render",
+    "encode",
+    "wait",
+    "send",
+    "first_token",
+    "read",
+    "parse",
+    "images",
+)
+
+
+def tokens_per_second(tokens: int, seconds: float) -> float:
+    return tokens / seconds if seconds > 0 else 0.0
 
 
 @dataclass(frozen=True, slots=True)
@@ -65,10 +82,16 @@ class ImageExtractionConfig:
     bbox_tolerance: float = 1.0
     min_width: int = 32
     min_height: int = 32
+    native_format: bool = False
+    lazy: bool = False
+    lazy_min_pixels: int | None = None
+    store_dir: str | None = None
 
     def __post_init__(self) -> None:
         if self.bbox_tolerance < 0:
             raise ValueError("bbox_tolerance must be >= 0")
+        if self.lazy_min_pixels is not None and self.lazy_min_pixels < 1:
+            raise ValueError("lazy_min_pixels must be >= 1")
         if self.min_width < 1:
             raise ValueError("min_width must be >= 1")
         if self.min_height < 1:
@@ -85,10 +108,71 @@ class ExtractedImage:
     height: int
 
 
+@dataclass(slots=True)
+class LayoutCell:
+    category: str
+    category_key: str
+    text: str
+    bbox: tuple[int, int, int, int] | None = None
+    svg: str | None = None
+
+
+@dataclass(frozen=True, slots=True)
+class RawResponseRef:
+    path: str
+    offset: int
+    length: int
+
+
 @dataclass(frozen=True, slots=True)
 class TokenUsage:
+    """Token counts for one response, with server timings when reported.
+
+    `cached_prompt_tokens` comes from `prompt_tokens_details.cached_tokens`
+    or, from llama-server, `timings.cache_n`. The prefill and decode fields
+    are llama-server's `timings`: tokens evaluated and the server-side time
+    spent on them.
+    """
+
     prompt_tokens: int = 0
     completion_tokens: int = 0
+    cached_prompt_tokens: int = 0
+    prefill_tokens: int = 0
+    prefill_seconds: float = 0.0
+    decode_tokens: int = 0
+    decode_seconds: float = 0.0
+
+    @property
+    def prefill_tokens_per_second(self) -> float:
+        return tokens_per_second(self.prefill_tokens, self.prefill_seconds)
+
+    @property
+    def decode_tokens_per_second(self) -> float:
+        return tokens_per_second(self.decode_tokens, self.decode_seconds)
+
+
+@dataclass(slots=True)
+class PageTimings:
+    """Monotonic seconds one page spent in each stage, summed over attempts.
+
+    `wait` is time queued for admission and the memory budget. `send` runs
+    until the request body is written, when the transport reports it, and
+    `first_token` until the response headers arrive or, when streaming, the
+    first content delta; `read` is the rest of the response. `images` is
+    extraction work on the image pool, which can overlap the other stages.
+    """
+
+    render_seconds: float = 0.0
+    encode_seconds: float = 0.0
+    wait_seconds: float = 0.0
+    send_seconds: float = 0.0
+    first_token_seconds: float = 0.0
+    read_seconds: float = 0.0
+    parse_seconds: float = 0.0
+    images_seconds: float = 0.0
+
+    def seconds(self, stage: str) -> float:
+        return getattr(self, f"{stage}_seconds")
 
 
 @dataclass(frozen=True, slots=True)
@@ -131,3 +215,5 @@ class PageResult:
     image_height: int
     error: str | None = None
     extracted_images: tuple[ExtractedImage, ...] = ()
+    raw_response_ref: RawResponseRef | None = None
+    timings: PageTimings = field(default_factory=PageTimings)
@@ -0,0 +1,122 @@
+from __future__ import annotations
+
+import os
+import stat
+import tempfile
+from pathlib import Path
+from types import TracebackType
+from typing import TextIO
+
+
+class OrderedMarkdownWriter:
+    """Stream page Markdown to disk in page order, then atomically publish it.
+
+    Pages may be added in any order. A page is written as soon as every
+    lower-indexed page has been written, so only the out-of-order window is
+    held in memory. The bytes on disk match `build_document_markdown`.
+    """
+
+    def __init__(self, output_path: str | Path, *, first_page_index: int = 0) -> None:
+        self.output_path = Path(output_path)
+        self.next_page_index = first_page_index
+        self.chars = 0
+        self._pending: dict[int, str] = {}
+        self._trailing_whitespace = ""
+        self._started = False
+        self._file: TextIO | None = None
+        self._temp_path: Path | None = None
+
+    def __enter__(self) -> OrderedMarkdownWriter:
+        self.open()
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+    @property
+    def pending_pages(self) -> int:
+        return len(self._pending)
+
+    def open(self) -> None:
+        if self._file is not None:
+            raise RuntimeError("writer is already open")
+        self.output_path.parent.mkdir(parents=True, exist_ok=True)
+        fd, temp_name = tempfile.mkstemp(
+            prefix=f".{self.output_path.name}.",
+            suffix=".tmp",
+            dir=self.output_path.parent,
+        )
+        self._temp_path = Path(temp_name)
+        self._file = os.fdopen(fd, "w", encoding="utf-8")
+
+    def add(self, page_index: int, markdown: str) -> None:
+        if self._file is None:
+            raise RuntimeError("writer is not open")
+        if page_index < self.next_page_index or page_index in self._pending:
+            raise ValueError(f"page_index={page_index} was already added")
+
+        self._pending[page_index] = markdown
+        while self.next_page_index in self._pending:
+            self._write_chunk(self._pending.pop(self.next_page_index))
+            self.next_page_index += 1
+
+    def close(self) -> None:
+        if self._file is None or self._temp_path is None:
+            raise RuntimeError("writer is not open")
+        for page_index in sorted(self._pending):
+            self._write_chunk(self._pending.pop(page_index))
+        if self._started:
+            self._write("\n")
+
+        self._file.close()
+        # mkstemp creates the file owner-only; publish it with the mode a
+        # plain write would have given it.
+        os.chmod(self._temp_path, published_file_mode(self.output_path))
+        os.replace(self._temp_path, self.output_path)
+        self._file = None
+        self._temp_path = None
+
+    def abort(self) -> None:
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        if self._temp_path is not None:
+            self._temp_path.unlink(missing_ok=True)
+            self._temp_path = None
+        self._pending.clear()
+
+    def _write_chunk(self, markdown: str) -> None:
+        if not markdown.strip():
+            return
+        if self._started:
+            self._write(f"{self._trailing_whitespace}\n\n")
+        else:
+            markdown = markdown.lstrip()
+            self._started = True
+
+        content = markdown.rstrip()
+        self._trailing_whitespace = markdown[len(content) :]
+        self._write(content)
+
+    def _write(self, text: str) -> None:
+        assert self._file is not None
+        self._file.write(text)
+        self.chars += len(text)
+
+
+def published_file_mode(path: Path) -> int:
+    """Mode for a file replacing `path`: the existing file's, else umask's."""
+    try:
+        return stat.S_IMODE(path.stat().st_mode)
+    except FileNotFoundError:
+        umask = os.umask(0o022)
+        os.umask(umask)
+        return 0o666 & ~umask